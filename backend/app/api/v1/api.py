@@ -0,0 +1,12 @@
+"""
+API v1 router
+"""
+
+from fastapi import APIRouter
+
+from .endpoints import auth, wellness
+
+api_router = APIRouter()
+
+api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
+api_router.include_router(wellness.router, prefix="/wellness", tags=["wellness"])
@@ -0,0 +1,179 @@
+"""
+Authentication and user account endpoints
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ....core.config import settings
+from ....core.database import get_db, commit
+from ....core.security import create_access_token, create_refresh_token
+from ....core.password_hasher import password_hasher, PasswordHasherBusy, DUMMY_HASH
+from ....models.user import User
+from ....schemas.user import (
+    User as UserSchema,
+    UserCreate,
+    UserUpdate,
+    UserLogin,
+    Token,
+    TokenRefresh
+)
+from ....services.auth_cache import auth_cache, CREDENTIALS_ERROR
+from ....services.user_service import UserService
+
+router = APIRouter()
+
+security = HTTPBearer(auto_error=False)
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> User:
+    """Active user for the bearer token (verified token and user served from memory when cached)"""
+    if not credentials:
+        raise CREDENTIALS_ERROR
+
+    return await auth_cache.current_user(credentials.credentials)
+
+async def get_current_user_optional(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Optional[User]:
+    """Like get_current_user, but anonymous requests get None instead of a 401"""
+    if not credentials:
+        return None
+
+    return await auth_cache.current_user(credentials.credentials)
+
+def hasher_busy(e: PasswordHasherBusy) -> HTTPException:
+    """503 for a shed login/registration, so clients back off instead of retrying at once"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"}
+    )
+
+def issue_tokens(user_id: int) -> Token:
+    """Access and refresh token pair for a user"""
+    return Token(
+        access_token=create_access_token(user_id),
+        refresh_token=create_refresh_token(user_id),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+@router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
+async def register(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Register a new user"""
+    user_service = UserService(db)
+
+    if await user_service.is_taken(user_data.username, user_data.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
+
+    try:
+        user = await user_service.create_user(user_data)
+    except PasswordHasherBusy as e:
+        raise hasher_busy(e)
+    await commit(db)
+    
+    return user
+
+@router.post("/login", response_model=Token)
+async def login(
+    credentials: UserLogin,
+    db: AsyncSession = Depends(get_db)
+):
+    """Log in with username (or email) and password"""
+    user_service = UserService(db)
+
+    user = await user_service.get_by_login(credentials.username)
+    try:
+        # Verified even for an unknown user, so response times do not reveal which accounts exist
+        valid = await password_hasher.verify(
+            credentials.password, user.hashed_password if user is not None else DUMMY_HASH
+        ) and user is not None
+    except PasswordHasherBusy as e:
+        raise hasher_busy(e)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+
+    await user_service.record_login(user)
+    await commit(db)
+    return issue_tokens(user.id)
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    token_data: TokenRefresh,
+    db: AsyncSession = Depends(get_db)
+):
+    """Exchange a refresh token for a new token pair"""
+    payload = await auth_cache.payload(token_data.refresh_token)
+    subject = payload.get("sub")
+    if payload.get("type") != "refresh" or not subject or not subject.isdigit():
+        raise CREDENTIALS_ERROR
+
+    user = await UserService(db).get_by_id(int(subject))
+    if not user or not user.is_active:
+        raise CREDENTIALS_ERROR
+
+    # The old refresh token cannot be used again
+    await auth_cache.revoke(token_data.refresh_token)
+    return issue_tokens(user.id)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_data: Optional[TokenRefresh] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: User = Depends(get_current_user)
+):
+    """Revoke the current access token (and the refresh token, if given)"""
+    await auth_cache.revoke(credentials.credentials)
+    if token_data:
+        await auth_cache.revoke(token_data.refresh_token)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/me", response_model=UserSchema)
+async def read_current_user(
+    current_user: User = Depends(get_current_user)
+):
+    """Get current user profile"""
+    return current_user
+
+@router.put("/me", response_model=UserSchema)
+async def update_current_user(
+    user_update: UserUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update current user profile"""
+    user = await UserService(db).update_user(current_user.id, user_update)
+    await commit(db)
+    return user
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Deactivate the current account; its tokens stop working immediately"""
+    await UserService(db).set_active(current_user.id, False)
+    await commit(db)
+    await auth_cache.revoke(credentials.credentials)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -2,12 +2,16 @@
 Wellness content and tips management endpoints
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, status, Query, Request, Response
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 
-from ....core.database import get_db
+from ....core.config import settings
+from ....core.database import get_db, get_read_db, commit
 from ....models.wellness import WellnessTip, UserActivity, WellnessCategoryEnum
 from ....models.user import User
 from ....schemas.wellness import (
@@ -16,37 +20,103 @@ from ....schemas.wellness import (
     WellnessTipUpdate,
     WellnessTipWithAuthor,
     UserActivityCreate,
-    CategoryInsights
+    CategoryInsights,
+    TipBatchGet,
+    TipBatchResult,
+    TipUniqueViewers,
+    ActivityBatchResult
 )
 from ....services.wellness_service import WellnessService
 from ....services.recommendation_engine import RecommendationEngine
-from .auth import get_current_user
+from ....services.tip_list_cache import tip_list_cache
+from .auth import get_current_user, get_current_user_optional
 
 router = APIRouter()
 
+def get_recommendation_engine(request: Request) -> RecommendationEngine:
+    """Shared recommendation engine created in the application lifespan"""
+    return request.app.state.recommendation_engine
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated sparse fieldset (None means every field)"""
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()] or None
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, e.g. id,title,excerpt")
+
+def check_batch_size(size: int, limit: int, name: str) -> None:
+    """413 for a batch over its configured limit, 400 for an empty one"""
+    if size > limit:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many {name}: at most {limit} per request"
+        )
+    if size == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No {name} given"
+        )
+
 @router.get("/tips", response_model=List[WellnessTipWithAuthor])
 async def get_wellness_tips(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     category: Optional[WellnessCategoryEnum] = None,
     search: Optional[str] = None,
-    sort_by: str = Query("created_at", regex="^(created_at|likes_count|views_count)$"),
+    sort_by: str = Query("created_at", regex="^(created_at|likes_count|views_count|relevance|trending)$"),
     order: str = Query("desc", regex="^(asc|desc)$"),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces skip"),
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get wellness tips with filtering and pagination"""
-    wellness_service = WellnessService(db)
+    """Get wellness tips with filtering and pagination.
     
-    tips = await wellness_service.get_tips(
-        skip=skip,
-        limit=limit,
-        category=category,
-        search=search,
-        sort_by=sort_by,
-        order=order
-    )
+    When another page may exist, its cursor is returned in the X-Next-Cursor header.
+    With `fields`, only those fields are selected and returned.
+    The page is serialized directly from the selected columns, so the response
+    model documents the shape but is not re-validated.
+    
+    Pages are cached per normalized query and tagged with an ETag that changes
+    whenever a tip in the listed category is written; a matching If-None-Match
+    gets a 304 without touching the database while the page is still cached.
+    """
+    field_names = parse_fields(fields)
+    cache_key = tip_list_cache.key(category, search, sort_by, order, skip, cursor, limit, field_names)
+    etag = tip_list_cache.etag(cache_key)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    cached = tip_list_cache.get(cache_key)
+    # Only a live entry vouches for the ETag: versions are per process, the TTL bounds other workers' writes
+    if cached is not None and tip_list_cache.not_modified_for(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    if cached is not None:
+        body, next_cursor = cached
+    else:
+        wellness_service = WellnessService(db)
+        
+        try:
+            body, next_cursor = await wellness_service.get_tips_page_json(
+                skip=skip,
+                limit=limit,
+                category=category,
+                search=search,
+                sort_by=sort_by,
+                order=order,
+                cursor=cursor,
+                fields=field_names
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        tip_list_cache.set(cache_key, body, next_cursor)
     
-    return tips
+    if next_cursor:
+        cache_headers["X-Next-Cursor"] = next_cursor
+    return Response(content=body, media_type="application/json", headers=cache_headers)
 
 @router.post("/tips", response_model=WellnessTipSchema, status_code=status.HTTP_201_CREATED)
 async def create_wellness_tip(
@@ -58,6 +128,7 @@ async def create_wellness_tip(
     wellness_service = WellnessService(db)
     
     tip = await wellness_service.create_tip(tip_data, current_user.id)
+    await commit(db)
     
     # Track user activity
     await wellness_service.track_activity(
@@ -69,10 +140,41 @@ async def create_wellness_tip(
     
     return tip
 
+@router.post("/tips/batch-get", response_model=TipBatchResult)
+async def batch_get_wellness_tips(
+    batch: TipBatchGet,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get many tips with their authors in one query.
+    
+    `tips` follows the order of `ids` (duplicates included); an id that does not
+    exist gets null there and an entry in `errors` with its index.
+    """
+    check_batch_size(len(batch.ids), settings.TIP_BATCH_GET_MAX_IDS, "ids")
+    wellness_service = WellnessService(db)
+    
+    try:
+        tips = await wellness_service.get_tip_rows_in_order(batch.ids, batch.fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    errors = [
+        {"index": index, "detail": "Wellness tip not found"}
+        for index, tip in enumerate(tips)
+        if tip is None
+    ]
+    
+    return Response(
+        content=orjson.dumps({"tips": tips, "errors": errors}, option=orjson.OPT_UTC_Z),
+        media_type="application/json"
+    )
+
 @router.get("/tips/{tip_id}", response_model=WellnessTipWithAuthor)
 async def get_wellness_tip(
     tip_id: int,
-    current_user: Optional[User] = Depends(get_current_user),
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db)
 ):
     """Get specific wellness tip by ID"""
@@ -85,20 +187,73 @@ async def get_wellness_tip(
             detail="Wellness tip not found"
         )
     
-    # Track view activity if user is authenticated
+    # Count the view if user is authenticated
     if current_user:
-        await wellness_service.track_activity(
-            user_id=current_user.id,
-            activity_type="view_content",
-            category=tip.category,
-            content_id=str(tip_id)
-        )
-        
-        # Increment view count
-        await wellness_service.increment_views(tip_id)
+        await wellness_service.record_engagement(current_user.id, tip_id, "view_content")
+        await commit(db)
     
     return tip
 
+@router.get("/tips/{tip_id}/similar", response_model=List[WellnessTipWithAuthor])
+async def get_similar_wellness_tips(
+    tip_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get tips with similar title, content and tags (only `fields` when given)"""
+    wellness_service = WellnessService(db)
+    
+    try:
+        tips = await wellness_service.get_similar_tips(tip_id, limit, parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if tips is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wellness tip not found"
+        )
+    
+    return Response(content=orjson.dumps(tips, option=orjson.OPT_UTC_Z), media_type="application/json")
+
+@router.get("/tips/{tip_id}/also-liked", response_model=List[dict])
+async def get_also_liked_wellness_tips(
+    tip_id: int,
+    limit: int = Query(6, ge=1, le=20),
+    recommendation_engine: RecommendationEngine = Depends(get_recommendation_engine),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get tips that members who engaged with this tip also engaged with"""
+    return await recommendation_engine.get_also_liked(db, tip_id, limit)
+
+@router.get("/tips/{tip_id}/unique-viewers", response_model=TipUniqueViewers)
+async def get_wellness_tip_unique_viewers(
+    tip_id: int,
+    start: Optional[date] = Query(None, description="First UTC day (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last UTC day (default: today)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the estimated number of distinct members who viewed a tip between two days"""
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days >= settings.UNIQUE_VIEWERS_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"start must not be after end, and the range is limited to {settings.UNIQUE_VIEWERS_MAX_RANGE_DAYS} days"
+        )
+    
+    viewers = await WellnessService(db).get_unique_viewers(tip_id, start, end)
+    if viewers is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wellness tip not found"
+        )
+    
+    return TipUniqueViewers(tip_id=tip_id, start=start, end=end, unique_viewers=viewers)
+
 @router.put("/tips/{tip_id}", response_model=WellnessTipSchema)
 async def update_wellness_tip(
     tip_id: int,
@@ -124,6 +279,7 @@ async def update_wellness_tip(
         )
     
     updated_tip = await wellness_service.update_tip(tip_id, tip_update)
+    await commit(db)
     return updated_tip
 
 @router.delete("/tips/{tip_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -150,6 +306,7 @@ async def delete_wellness_tip(
         )
     
     await wellness_service.delete_tip(tip_id)
+    await commit(db)
 
 @router.post("/tips/{tip_id}/like", status_code=status.HTTP_200_OK)
 async def like_wellness_tip(
@@ -157,37 +314,53 @@ async def like_wellness_tip(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Like a wellness tip"""
+    """Like a wellness tip (counter and activity are written in one transaction)"""
     wellness_service = WellnessService(db)
     
-    # Check if tip exists
-    tip = await wellness_service.get_tip_by_id(tip_id)
+    tip = await wellness_service.record_engagement(current_user.id, tip_id, "like_tip")
     if not tip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wellness tip not found"
         )
+    await commit(db)
     
-    # Track like activity
-    await wellness_service.track_activity(
-        user_id=current_user.id,
-        activity_type="like_tip",
-        category=tip.category,
-        content_id=str(tip_id)
-    )
+    return {"message": "Tip liked successfully", "likes_count": tip["likes_count"]}
+
+@router.post("/tips/{tip_id}/share", status_code=status.HTTP_200_OK)
+async def share_wellness_tip(
+    tip_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Record a share of a wellness tip"""
+    wellness_service = WellnessService(db)
     
-    # Increment like count
-    await wellness_service.increment_likes(tip_id)
+    tip = await wellness_service.record_engagement(current_user.id, tip_id, "share_tip")
+    if not tip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wellness tip not found"
+        )
+    await commit(db)
     
-    return {"message": "Tip liked successfully"}
+    return {"message": "Tip shared successfully", "shares_count": tip["shares_count"]}
+
+@router.get("/categories/insights", response_model=List[CategoryInsights])
+async def get_all_category_insights(
+    recommendation_engine: RecommendationEngine = Depends(get_recommendation_engine),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get analytics insights for every wellness category"""
+    return await recommendation_engine.get_all_category_insights(db)
 
 @router.get("/categories/{category}/insights", response_model=CategoryInsights)
 async def get_category_insights(
     category: WellnessCategoryEnum,
-    db: AsyncSession = Depends(get_db)
+    recommendation_engine: RecommendationEngine = Depends(get_recommendation_engine),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get analytics insights for a wellness category"""
-    recommendation_engine = RecommendationEngine()
     insights = await recommendation_engine.get_category_insights(db, category)
     return insights
 
@@ -196,11 +369,10 @@ async def get_personalized_recommendations(
     category: Optional[WellnessCategoryEnum] = None,
     limit: int = Query(6, ge=1, le=20),
     current_user: User = Depends(get_current_user),
+    recommendation_engine: RecommendationEngine = Depends(get_recommendation_engine),
     db: AsyncSession = Depends(get_db)
 ):
     """Get personalized content recommendations"""
-    recommendation_engine = RecommendationEngine()
-    
     recommendations = await recommendation_engine.get_personalized_recommendations(
         db=db,
         user_id=current_user.id,
@@ -219,7 +391,7 @@ async def get_personalized_recommendations(
     
     return recommendations
 
-@router.post("/activity", status_code=status.HTTP_201_CREATED)
+@router.post("/activity", status_code=status.HTTP_202_ACCEPTED)
 async def track_user_activity(
     activity_data: UserActivityCreate,
     current_user: User = Depends(get_current_user),
@@ -228,7 +400,7 @@ async def track_user_activity(
     """Track user activity for analytics"""
     wellness_service = WellnessService(db)
     
-    activity = await wellness_service.track_activity(
+    accepted = await wellness_service.track_activity(
         user_id=current_user.id,
         activity_type=activity_data.activity_type,
         category=activity_data.category,
@@ -237,4 +409,48 @@ async def track_user_activity(
         session_id=activity_data.session_id
     )
     
-    return {"message": "Activity tracked successfully", "activity_id": activity.id}
\ No newline at end of file
+    if not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Activity ingestion is overloaded, please retry"
+        )
+    
+    return {"message": "Activity accepted for processing"}
+
+@router.post("/activity/batch", response_model=ActivityBatchResult, status_code=status.HTTP_202_ACCEPTED)
+async def track_user_activity_batch(
+    events: List[Dict[str, Any]] = Body(..., description="UserActivityCreate objects"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Track many activity events at once.
+    
+    Each event is validated on its own: invalid ones are reported in `errors`
+    by index and the rest are queued together for the bulk writer. If ingestion
+    is overloaded, the events that did not fit are reported as well.
+    """
+    check_batch_size(len(events), settings.ACTIVITY_BATCH_MAX_EVENTS, "events")
+    
+    valid: List[Tuple[int, UserActivityCreate]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, event in enumerate(events):
+        try:
+            valid.append((index, UserActivityCreate.model_validate(event)))
+        except ValidationError as e:
+            errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+    
+    wellness_service = WellnessService(db)
+    accepted = await wellness_service.track_activities(current_user.id, [activity for _, activity in valid])
+    
+    if valid and not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Activity ingestion is overloaded, please retry"
+        )
+    errors.extend(
+        {"index": index, "detail": "Activity ingestion is overloaded, please retry"}
+        for index, _ in valid[accepted:]
+    )
+    errors.sort(key=lambda error: error["index"])
+    
+    return {"accepted": accepted, "errors": errors}
\ No newline at end of file
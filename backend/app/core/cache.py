@@ -0,0 +1,117 @@
+"""
+In-process caching primitives
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+class TTLCache:
+    """Size-bounded LRU cache with per-entry expiry.
+
+    With `max_bytes` and a `size_of` function, least recently used entries are
+    also evicted once the summed sizes exceed the byte budget.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Optional[Callable[[Any], int]] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, record=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, record: bool = True) -> Any:
+        """Return a live entry and mark it recently used"""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            if record:
+                self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            if record:
+                self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        if record:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries past the size caps"""
+
+        replaced = self._entries.pop(key, None)
+        if replaced is not None and self.size_of:
+            self.bytes -= self.size_of(replaced[1])
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        if self.size_of:
+            self.bytes += self.size_of(value)
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove an entry, returns True if it existed"""
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        if self.size_of:
+            self.bytes -= self.size_of(value)
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters"""
+
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+        if self.size_of:
+            stats.update(bytes=self.bytes, max_bytes=self.max_bytes)
+        return stats
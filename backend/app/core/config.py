@@ -35,10 +35,113 @@ class Settings(BaseSettings):
     # Redis (for caching and sessions)
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     
+    # Two-tier cache: in-process LRU (L1) over Redis (L2) with pub/sub invalidation
+    CACHE_L2_BACKEND: str = os.getenv("CACHE_L2_BACKEND", "redis")  # "redis", "memory" (in-process fake) or "none"
+    CACHE_KEY_PREFIX: str = "wellspire"
+    CACHE_L1_MAX_ENTRIES: int = 10000  # per namespace
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # XFetch aggressiveness; 0 disables early refresh
+    CACHE_L2_RETRY_SECONDS: float = 5.0
+    INSIGHTS_CACHE_TTL_SECONDS: int = 30
+    
     # AI Service Configuration
     AI_MODEL: str = "gpt-4o"
     MAX_TOKENS: int = 500
     TEMPERATURE: float = 0.7
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    LLM_RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    LLM_RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    # Latency budget for /recommendations: the AI call races the algorithmic ranking and,
+    # if it misses the deadline, finishes in the background to fill the cache for the next request
+    RECOMMENDATION_DEADLINE_SECONDS: float = 2.0
+    
+    # Engagement counters: "transactional" (counter UPDATE and activity INSERT commit with the request)
+    # or "buffered" (write-behind aggregation; activity goes through the ingestion queue)
+    ENGAGEMENT_WRITE_MODE: str = os.getenv("ENGAGEMENT_WRITE_MODE", "transactional")
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = 5.0
+    COUNTER_FLUSH_MAX_PENDING: int = 1000
+    
+    # Activity ingestion (batched background writer)
+    ACTIVITY_QUEUE_MAX_SIZE: int = 10000
+    ACTIVITY_BATCH_SIZE: int = 500
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 1.0
+    ACTIVITY_OVERFLOW_POLICY: str = "block"  # block, drop or spill
+    ACTIVITY_ENQUEUE_TIMEOUT_SECONDS: float = 0.05
+    ACTIVITY_SPILL_PATH: str = "activity_spill.jsonl"
+    
+    # Batch endpoints (POST /tips/batch-get, POST /activity/batch)
+    TIP_BATCH_GET_MAX_IDS: int = 100
+    ACTIVITY_BATCH_MAX_EVENTS: int = 500
+    
+    # Search: "ilike", or "fulltext" to rank sort_by=relevance searches with tsvector/GIN (Postgres) or FTS5 (SQLite)
+    SEARCH_BACKEND: str = "ilike"
+    
+    # Recommendation cache
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 900
+    RECOMMENDATION_CACHE_MAX_ENTRIES: int = 10000
+    RECOMMENDATION_CACHE_ACTIVITY_THRESHOLD: int = 20  # new events before a user's entries are recomputed
+    
+    # /tips listing cache (per-category version counters, ETags)
+    TIP_LIST_CACHE_TTL_SECONDS: int = 60  # bounds staleness of entries other workers' writes did not invalidate
+    TIP_LIST_CACHE_MAX_ENTRIES: int = 20000
+    TIP_LIST_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    
+    # Password hashing (bcrypt on a bounded thread pool)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # outstanding hash/verify calls before new ones get a 503
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 5.0
+    
+    # Auth caches (verified token payloads until exp, resolved users)
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 100000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 50000
+    
+    # Read-through cache of tip and user rows
+    ENTITY_CACHE_TTL_SECONDS: int = 30
+    ENTITY_CACHE_MAX_ENTRIES: int = 50000
+    
+    # Startup: "auto" sets up the schema only when the models' DDL changed, "always" on every start,
+    # "migrate" only through `python main.py migrate`
+    SCHEMA_SETUP: str = os.getenv("SCHEMA_SETUP", "auto")
+    
+    # Production server (prefork workers, warmup before ready, graceful drain)
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    WARMUP_CACHES: bool = True
+    SHUTDOWN_DRAIN_DELAY_SECONDS: float = 0.0  # keep serving, reported not ready, so load balancers move traffic first
+    GRACEFUL_SHUTDOWN_SECONDS: float = 30.0  # in-flight requests get this long before they are cancelled
+
+    # Rolling user behavior profiles
+    BEHAVIOR_PROFILE_RECONCILE_AFTER_SECONDS: int = 6 * 3600  # profile age before it is rebuilt from the table
+    BEHAVIOR_PROFILE_RECONCILE_POLL_SECONDS: float = 60.0
+    BEHAVIOR_PROFILE_RECONCILE_BATCH: int = 200
+    
+    # In-memory tip catalog for algorithmic recommendations
+    TIP_CATALOG_REFRESH_SECONDS: float = 300.0
+    
+    # Unique viewers per tip (HyperLogLog sketches per day, merged into the database periodically)
+    UNIQUE_VIEWERS_PRECISION: int = 13
+    UNIQUE_VIEWERS_FLUSH_SECONDS: float = 30.0
+    UNIQUE_VIEWERS_FLUSH_MAX_PENDING: int = 500
+    UNIQUE_VIEWERS_MAX_RANGE_DAYS: int = 366
+    
+    # Trending scores (exponentially decayed activity, recomputed in the background)
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    TRENDING_REFRESH_SECONDS: float = 60.0
+    TRENDING_INGEST_LAG_SECONDS: float = 30.0  # activity younger than this waits for the next run
+    
+    # Item-item co-engagement ("members also liked")
+    CO_ENGAGEMENT_NEIGHBOURS: int = 20  # precomputed neighbours per tip
+    CO_ENGAGEMENT_USER_HISTORY: int = 20  # recent distinct tips per user that new engagement pairs with
+    CO_ENGAGEMENT_WINDOW_DAYS: int = 30  # activity loaded at startup
+    CO_ENGAGEMENT_POLL_SECONDS: float = 15.0
+    CO_ENGAGEMENT_COMPACT_AFTER: int = 200_000  # pending pair updates before a full merge
+    
+    # Similar tips index (hashed TF-IDF top terms per tip, refreshed from the database, saved by one worker)
+    SIMILAR_TIPS_DIMENSIONS: int = 16384
+    SIMILAR_TIPS_TOP_TERMS: int = 64
+    SIMILAR_TIPS_INDEX_PATH: str = "similar_tips_index.npz"
+    SIMILAR_TIPS_REFRESH_SECONDS: float = 60.0
+    SIMILAR_TIPS_SAVE_INTERVAL_SECONDS: float = 300.0
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
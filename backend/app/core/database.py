@@ -6,7 +6,8 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable
+import inspect
 import os
 
 from .config import settings
@@ -28,27 +29,69 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
-# Session factory
+# Read-only requests: never flush, and on Postgres run in READ ONLY transactions
+read_engine = (
+    engine.execution_options(postgresql_readonly=True)
+    if engine.dialect.name == "postgresql" else engine
+)
+
+# Session factories
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
+
+AFTER_COMMIT = "after_commit"
 
 # Base class for models
 Base = declarative_base()
 
+def after_commit(session: AsyncSession, callback: Callable[[], Any]) -> None:
+    """Run `callback` (sync or async) once `session` commits; discarded on rollback"""
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+async def commit(session: AsyncSession) -> None:
+    """Commit a request's unit of work, then run the callbacks its services registered.
+
+    Services stage writes on the session and never commit themselves, so an
+    endpoint's writes land in one transaction. Endpoints call this before
+    responding; get_db's own commit only runs after the response is sent.
+    """
+    await session.commit()
+    for callback in session.info.pop(AFTER_COMMIT, []):
+        result = callback()
+        if inspect.isawaitable(result):
+            await result
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            await commit(session)
         except Exception:
+            session.info.pop(AFTER_COMMIT, None)
             await session.rollback()
             raise
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for read-only endpoints: a session that is never flushed or committed"""
+    async with ReadSessionLocal() as session:
+        yield session
+
 async def create_tables():
     """Create all database tables"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+
+def upsert_insert(table):
+    """INSERT construct with ON CONFLICT support for the configured dialect"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
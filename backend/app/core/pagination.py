@@ -0,0 +1,24 @@
+"""
+Opaque cursor encoding for keyset pagination
+"""
+
+import base64
+import json
+from typing import Any, Dict
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a cursor payload as URL-safe base64 JSON"""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor, raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
@@ -0,0 +1,120 @@
+"""
+Password hashing off the event loop on a bounded thread pool
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+from .security import get_password_hash, verify_password
+
+SAMPLE_WINDOW = 1000  # recent timings kept for percentiles
+
+# bcrypt hash (default cost) of a random secret, checked when a login names no
+# user so unknown and known usernames take the same time to refuse
+DUMMY_HASH = "$2b$12$AJknHMkfBqDmc7vacNSy1.QIxyH.NXMtGrMATeU1.Ak53prgVHyAy"
+
+class PasswordHasherBusy(Exception):
+    """The hashing queue is full or a hash did not finish in time"""
+
+def _percentiles(samples: deque) -> Dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+class PasswordHasher:
+    """bcrypt hash/verify on a small thread pool with a bounded queue.
+
+    bcrypt releases the GIL while hashing, so threads run hashes in parallel
+    and the event loop keeps serving other requests. Work beyond `max_queue`
+    outstanding calls is refused immediately, and a call that waits longer
+    than `timeout` (queue plus hashing) fails, so a login storm sheds load
+    instead of piling up behind the pool.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE,
+        timeout: float = settings.PASSWORD_HASH_TIMEOUT_SECONDS
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.outstanding = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._queue_waits: deque = deque(maxlen=SAMPLE_WINDOW)
+        self._hash_times: deque = deque(maxlen=SAMPLE_WINDOW)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.outstanding >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        submitted = time.perf_counter()
+
+        def timed() -> Any:
+            started = time.perf_counter()
+            self._queue_waits.append(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self._hash_times.append(time.perf_counter() - started)
+
+        self.outstanding += 1
+        future = self._pool().submit(timed)
+        try:
+            # A timed-out call that has not started yet is cancelled in the pool too
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PasswordHasherBusy("Password hashing timed out")
+        finally:
+            self.outstanding -= 1
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        """bcrypt hash of a password"""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against its bcrypt hash"""
+        return await self._run(verify_password, password, hashed_password)
+
+    def stop(self) -> None:
+        """Shut the pool down, dropping queued work"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, outcome counters, and queue-wait / hash-time percentiles"""
+        return {
+            "workers": self.workers,
+            "outstanding": self.outstanding,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "queue_wait": _percentiles(self._queue_waits),
+            "hash_time": _percentiles(self._hash_times)
+        }
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,104 @@
+"""
+Worker readiness: warmup progress, startup timings and shutdown drain state
+"""
+
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+def _since(started: float) -> float:
+    return round(time.perf_counter() - started, 3)
+
+class Readiness:
+    """Tracks a worker from startup through warmup to draining.
+
+    Each warmup step records its status and duration. The worker is ready
+    once mark_ready() is called and stops being ready as soon as shutdown
+    starts, so a load balancer polling /health/ready moves traffic away
+    before in-flight requests are drained.
+
+    Startup timings are measured from the start of the application imports:
+    how long the imports took, when the worker became ready and when it
+    finished its first request (its time-to-first-request).
+    """
+
+    def __init__(self):
+        self.state = "starting"
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self.import_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+        self.first_request_seconds: Optional[float] = None
+
+    def record_imports(self, started: float) -> None:
+        """Application modules finished importing; `started` is perf_counter() before the first import"""
+        self._started = started
+        self.import_seconds = _since(started)
+
+    @asynccontextmanager
+    async def step(self, name: str) -> AsyncIterator[None]:
+        """Time a warmup step and record whether it finished"""
+
+        self.state = "warming"
+        self.steps[name] = {"status": "running"}
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.steps[name] = {"status": "failed", "seconds": _since(started)}
+            raise
+        self.steps[name] = {"status": "done", "seconds": _since(started)}
+
+    def skip(self, name: str) -> None:
+        """Record a step that had nothing to do"""
+        self.steps[name] = {"status": "skipped"}
+
+    def mark_ready(self) -> None:
+        """Warmup finished; accept traffic (unless shutdown already started)"""
+        if self.state != "draining":
+            self.state = "ready"
+        self.ready_seconds = _since(self._started)
+
+    def mark_draining(self) -> None:
+        """Shutdown started; finish in-flight requests but take no new ones"""
+        self.state = "draining"
+
+    def record_first_request(self) -> None:
+        if self.first_request_seconds is None:
+            self.first_request_seconds = _since(self._started)
+            print(f"⏱️ First request served {self.first_request_seconds}s after start")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def report(self) -> Dict[str, Any]:
+        """State, per-step warmup progress and startup timings"""
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "import_seconds": self.import_seconds,
+            "ready_seconds": self.ready_seconds,
+            "first_request_seconds": self.first_request_seconds,
+            "steps": self.steps
+        }
+
+class FirstRequestTimer:
+    """ASGI middleware that records when the worker finished its first non-health request"""
+
+    def __init__(self, app, readiness: Readiness):
+        self.app = app
+        self.readiness = readiness
+
+    async def __call__(self, scope, receive, send):
+        if (
+            self.readiness.first_request_seconds is not None
+            or scope["type"] != "http"
+            or scope["path"].startswith("/health")
+        ):
+            return await self.app(scope, receive, send)
+
+        await self.app(scope, receive, send)
+        self.readiness.record_first_request()
+
+readiness = Readiness()
@@ -0,0 +1,87 @@
+"""
+Schema setup gated by a fingerprint of the models' DDL
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import Column, DateTime, Integer, String, Table, select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .config import settings
+from .database import Base, engine, upsert_insert
+
+STATE_ID = 1
+
+schema_state = Table(
+    "schema_state",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False)
+)
+
+class SchemaOutOfDate(RuntimeError):
+    """The database was not migrated to the models this code expects"""
+
+def schema_fingerprint(extra: Iterable[str] = ()) -> str:
+    """Hash of the CREATE TABLE/INDEX statements for every model, plus any extra DDL"""
+
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    for statement in extra:
+        digest.update(statement.encode())
+    return digest.hexdigest()
+
+async def applied_fingerprint() -> Optional[str]:
+    """Fingerprint recorded by the last schema setup, or None if there was none"""
+
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(
+                select(schema_state.c.fingerprint).where(schema_state.c.id == STATE_ID)
+            )
+    except Exception:
+        # No schema_state table yet
+        return None
+
+async def record_fingerprint(fingerprint: str) -> None:
+    """Remember that the schema for `fingerprint` is in place"""
+
+    stmt = upsert_insert(schema_state).values(
+        id=STATE_ID, fingerprint=fingerprint, applied_at=datetime.now(timezone.utc)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[schema_state.c.id],
+        set_={"fingerprint": stmt.excluded.fingerprint, "applied_at": stmt.excluded.applied_at}
+    )
+    async with engine.begin() as conn:
+        await conn.execute(stmt)
+
+async def ensure_schema(
+    setup: Callable[[], Awaitable[None]],
+    extra: Iterable[str] = (),
+    mode: str = settings.SCHEMA_SETUP
+) -> bool:
+    """Run `setup` according to SCHEMA_SETUP and return whether it ran.
+
+    "always" runs it on every start. "auto" runs it only when the models' DDL
+    differs from what was last applied, so a restart against an unchanged
+    database skips create_all and the index checks. "migrate" never runs it
+    and refuses to start against an out-of-date database; the schema is then
+    applied with `python main.py migrate`.
+    """
+
+    fingerprint = schema_fingerprint(extra)
+    if mode != "always" and await applied_fingerprint() == fingerprint:
+        return False
+    if mode == "migrate":
+        raise SchemaOutOfDate("Database schema is out of date; run `python main.py migrate`")
+
+    await setup()
+    await record_fingerprint(fingerprint)
+    return True
@@ -2,6 +2,7 @@
 Security utilities for authentication and authorization
 """
 
+import secrets
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 from jose import JWTError, jwt
@@ -24,7 +25,8 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # jti keeps tokens issued in the same second distinct, so revoking one leaves the others valid
+    to_encode = {"exp": expire, "sub": str(subject), "jti": secrets.token_hex(8)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -53,6 +55,6 @@ def get_password_hash(password: str) -> str:
 def create_refresh_token(subject: Union[str, Any]) -> str:
     """Create refresh token with longer expiration"""
     expire = datetime.utcnow() + timedelta(days=7)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh", "jti": secrets.token_hex(8)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
\ No newline at end of file
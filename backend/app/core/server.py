@@ -0,0 +1,86 @@
+"""
+Production server: prefork uvicorn workers with graceful drain
+"""
+
+import asyncio
+from types import FrameType
+from typing import Awaitable, Callable, Optional
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from .config import settings
+from .database import engine
+from .readiness import readiness
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that reports not ready as soon as it is asked to stop.
+
+    With SHUTDOWN_DRAIN_DELAY_SECONDS set, the worker keeps accepting requests
+    for that long (while /health/ready answers 503) so load balancers stop
+    routing to it before its listener closes. After that uvicorn waits up to
+    GRACEFUL_SHUTDOWN_SECONDS for in-flight requests, and the lifespan shutdown
+    flushes queued activity events and engagement counters.
+    """
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self.should_exit or readiness.state == "draining" or settings.SHUTDOWN_DRAIN_DELAY_SECONDS <= 0:
+            readiness.mark_draining()
+            super().handle_exit(sig, frame)
+            return
+
+        readiness.mark_draining()
+        print(f"⏳ Draining for {settings.SHUTDOWN_DRAIN_DELAY_SECONDS}s before shutdown")
+        asyncio.get_running_loop().call_later(
+            settings.SHUTDOWN_DRAIN_DELAY_SECONDS, super().handle_exit, sig, frame
+        )
+
+class DrainingSupervisor(Multiprocess):
+    """Signals every worker before waiting on any, so they drain in parallel
+    (uvicorn's supervisor terminates and joins them one at a time)"""
+
+    def shutdown(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        print(f"🛑 Stopped {len(self.processes)} workers")
+
+async def _prepare(prepare: Callable[[], Awaitable[None]]) -> None:
+    try:
+        await prepare()
+    finally:
+        await engine.dispose()
+
+def serve(
+    app: str,
+    host: str,
+    port: int,
+    workers: int,
+    prepare: Optional[Callable[[], Awaitable[None]]] = None
+) -> None:
+    """Run the app in `workers` prefork processes sharing one listening socket.
+
+    `prepare` runs once in the supervisor before any worker starts, so schema
+    setup does not race between workers.
+    """
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        workers=workers,
+        log_level=settings.LOG_LEVEL.lower(),
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True
+    )
+    server = DrainingServer(config)
+
+    if config.workers > 1:
+        if prepare is not None:
+            asyncio.run(_prepare(prepare))
+        # Each worker runs the lifespan (and so its own warmup) before serving
+        sock = config.bind_socket()
+        DrainingSupervisor(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
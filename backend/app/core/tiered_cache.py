@@ -0,0 +1,381 @@
+"""
+Two-tier cache: in-process LRU (L1) over a shared Redis-protocol store (L2)
+"""
+
+import asyncio
+import math
+import random
+import secrets
+import struct
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Protocol
+
+import orjson
+
+from .cache import TTLCache
+from .config import settings
+from .singleflight import SingleFlight
+
+# L2 values are HEADER (expires_at, compute seconds) + serialized payload
+HEADER = struct.Struct("!dd")
+MAX_LISTENER_BACKOFF = 60.0
+
+class Serializer(Protocol):
+    """Turns cached values into bytes for L2 and back"""
+
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+class JsonSerializer:
+    """orjson; for plain JSON-shaped values (dicts, lists, strings, numbers)"""
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+SERIALIZERS: Dict[str, Serializer] = {
+    "json": JsonSerializer()
+}
+
+class RedisL2:
+    """L2 on a Redis server (or anything speaking its protocol)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, keys: List[str]) -> None:
+        await self._redis.delete(*keys)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._redis.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+class MemoryL2:
+    """In-process stand-in for Redis: keys with expiry plus pub/sub.
+
+    Several CacheBus instances sharing one MemoryL2 behave like workers sharing
+    a Redis server, which is how the invalidation path is exercised without one.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._subscribers[channel]:
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[channel].append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].remove(queue)
+
+    async def aclose(self) -> None:
+        pass
+
+def create_l2(backend: str = settings.CACHE_L2_BACKEND, url: str = settings.REDIS_URL):
+    """L2 for the configured backend: "redis", "memory" (in-process fake) or "none" """
+    if backend == "redis":
+        return RedisL2(url)
+    if backend == "memory":
+        return MemoryL2()
+    return None
+
+class CacheBus:
+    """One per process: the shared L2 connection and the invalidation channel.
+
+    Invalidations are published as {"o": origin, "n": namespace, "k": keys};
+    every other process drops those keys from its L1. L2 errors take L2 out of
+    use for CACHE_L2_RETRY_SECONDS, during which caches run on L1 alone.
+    """
+
+    def __init__(
+        self,
+        l2=None,
+        prefix: str = settings.CACHE_KEY_PREFIX,
+        retry_after: float = settings.CACHE_L2_RETRY_SECONDS
+    ):
+        self.l2 = l2
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.retry_after = retry_after
+        self.origin = secrets.token_hex(8)
+        self.caches: Dict[str, "TieredCache"] = {}
+        self._down_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.l2_errors = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+
+    def register(self, cache: "TieredCache") -> None:
+        """Route invalidations for the cache's namespace to it (a newer cache replaces an older one)"""
+        self.caches[cache.namespace] = cache
+
+    @property
+    def l2_available(self) -> bool:
+        return self.l2 is not None and time.monotonic() >= self._down_until
+
+    async def call_l2(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an L2 operation, returning None (and backing off) if L2 fails"""
+
+        if not self.l2_available:
+            return None
+        try:
+            return await operation()
+        except Exception as e:
+            self.l2_errors += 1
+            if time.monotonic() >= self._down_until:
+                print(f"Cache L2 unavailable, using L1 only for {self.retry_after}s: {e}")
+            self._down_until = time.monotonic() + self.retry_after
+            return None
+
+    async def publish_invalidation(self, namespace: str, keys: List[str]) -> None:
+        message = orjson.dumps({"o": self.origin, "n": namespace, "k": keys})
+        await self.call_l2(lambda: self.l2.publish(self.channel, message))
+        self.invalidations_sent += 1
+
+    def _apply(self, raw: bytes) -> None:
+        message = orjson.loads(raw)
+        if message.get("o") == self.origin:
+            return
+        cache = self.caches.get(message.get("n"))
+        if cache is not None:
+            cache.drop_local(message.get("k") or [])
+            self.invalidations_received += 1
+
+    async def _listen(self) -> None:
+        backoff = self.retry_after
+        while True:
+            try:
+                async for raw in self.l2.subscribe(self.channel):
+                    backoff = self.retry_after
+                    self._apply(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.l2_errors += 1
+                print(f"Cache invalidation listener error (retrying in {backoff:.0f}s): {e}")
+            # Anything published while disconnected was missed
+            for cache in self.caches.values():
+                cache.drop_local(None)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_LISTENER_BACKOFF)
+
+    def start(self) -> None:
+        """Start listening for invalidations from other processes"""
+        if self.l2 is not None and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening and close the L2 connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.l2 is not None:
+            await self.l2.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """L2 health, invalidation traffic and per-namespace cache counters"""
+        return {
+            "l2": type(self.l2).__name__ if self.l2 is not None else None,
+            "l2_available": self.l2_available,
+            "l2_errors": self.l2_errors,
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+            "namespaces": {name: cache.stats() for name, cache in self.caches.items()}
+        }
+
+class TieredCache:
+    """A namespace of cached values in L1 (this process) and L2 (shared).
+
+    Keys are stringified, so 42 and "42" name the same entry.
+
+    get_or_load is read-through with a per-key single-flight, and refreshes
+    entries early with probability rising towards expiry (XFetch: recompute
+    when now - delta * beta * ln(rand) >= expiry, delta being how long the
+    value took to compute), so a hot key is rebuilt by one caller before it
+    expires instead of by every caller after.
+
+    invalidate() deletes from both tiers and tells every other process to
+    drop the keys from its L1. A load that overlapped an invalidation is
+    returned to its callers but not stored.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        bus: CacheBus,
+        serializer: str = "json",
+        max_entries: int = settings.CACHE_L1_MAX_ENTRIES,
+        beta: float = settings.CACHE_EARLY_REFRESH_BETA
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.bus = bus
+        self.serializer = SERIALIZERS[serializer]
+        self.beta = beta
+        self._l1 = TTLCache(max_entries, ttl)
+        self._loads = SingleFlight()
+        self._generation = 0
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.early_refreshes = 0
+        bus.register(self)
+
+    def _l2_key(self, key: str) -> str:
+        return f"{self.bus.prefix}:{self.namespace}:{key}"
+
+    async def _l2_entry(self, key: str):
+        """(value, expires_at, delta) from L2, filling L1, or None"""
+
+        if not self.bus.l2_available:
+            return None
+        raw = await self.bus.call_l2(lambda: self.bus.l2.get(self._l2_key(key)))
+        if raw is None:
+            if self.bus.l2_available:
+                self.l2_misses += 1
+            return None
+        expires_at, delta = HEADER.unpack_from(raw)
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        entry = (self.serializer.loads(raw[HEADER.size:]), expires_at, delta)
+        self._l1.set(key, entry, ttl=remaining)
+        return entry
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value from either tier"""
+        key = str(key)
+        entry = self._l1.get(key) or await self._l2_entry(key)
+        return entry[0] if entry is not None else default
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, delta: float = 0.0) -> None:
+        """Store a value in both tiers"""
+
+        key = str(key)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl
+        self._l1.set(key, (value, expires_at, delta), ttl=ttl)
+        if self.bus.l2_available:
+            raw = HEADER.pack(expires_at, delta) + self.serializer.dumps(value)
+            await self.bus.call_l2(lambda: self.bus.l2.set(self._l2_key(key), raw, ttl))
+
+    def _refresh_early(self, expires_at: float, delta: float) -> bool:
+        return time.time() - delta * self.beta * math.log(random.random() or 1e-12) >= expires_at
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Cached value, or loader() stored in both tiers (None results are not cached)"""
+
+        key = str(key)
+        entry = self._l1.get(key)
+        if entry is not None:
+            value, expires_at, delta = entry
+            if not self._refresh_early(expires_at, delta):
+                return value
+            self.early_refreshes += 1
+
+        generation = self._generation
+
+        async def load() -> Any:
+            # L2 is read once per key however many callers missed L1
+            shared = await self._l2_entry(key) if entry is None else None
+            if shared is not None:
+                value, expires_at, delta = shared
+                if not self._refresh_early(expires_at, delta):
+                    return value
+                self.early_refreshes += 1
+            started = time.perf_counter()
+            value = await loader()
+            if value is not None and generation == self._generation:
+                await self.set(key, value, ttl, delta=time.perf_counter() - started)
+            return value
+
+        return await self._loads.do(key, load)
+
+    async def invalidate(self, *keys: Hashable) -> None:
+        """Drop keys from both tiers here and from L1 in every other process"""
+
+        names = [str(key) for key in keys]
+        self.drop_local(names)
+        if self.bus.l2_available:
+            await self.bus.call_l2(lambda: self.bus.l2.delete([self._l2_key(name) for name in names]))
+            await self.bus.publish_invalidation(self.namespace, names)
+
+    def drop_local(self, keys: Optional[List[str]]) -> None:
+        """Forget keys in L1 only (None: everything); in-flight loads will not be stored"""
+
+        self._generation += 1
+        if keys is None:
+            self._l1.clear()
+            return
+        for key in keys:
+            self._l1.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """L1 counters plus L2 hit/miss and early refresh counts"""
+        return {
+            "l1": self._l1.stats(),
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+            "early_refreshes": self.early_refreshes,
+            "loads": self._loads.stats()
+        }
+
+cache_bus = CacheBus(create_l2())
@@ -3,7 +3,7 @@ Database models
 """
 
 from .user import User
-from .wellness import WellnessTip, UserActivity, WellnessCategory
+from .wellness import WellnessTip, UserActivity, WellnessCategory, CategoryRollup, CategoryTagCount, UserBehaviorProfile, TipTrendingScore, TrendingState
 from .recommendation import UserPreference, ContentRecommendation
 
 __all__ = [
@@ -11,6 +11,11 @@ __all__ = [
     "WellnessTip", 
     "UserActivity",
     "WellnessCategory",
+    "CategoryRollup",
+    "CategoryTagCount",
+    "UserBehaviorProfile",
+    "TipTrendingScore",
+    "TrendingState",
     "UserPreference",
     "ContentRecommendation"
 ]
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+Recommendation models: per-user preference weights and stored recommendations
+"""
+
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..core.database import Base
+from .wellness import WellnessCategoryEnum
+
+class UserPreference(Base):
+    __tablename__ = "user_preferences"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # How strongly recommendations should lean towards a category
+    category = Column(Enum(WellnessCategoryEnum), nullable=False)
+    weight = Column(Float, default=1.0)
+    preferred_difficulty = Column(String, default="beginner")
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="preferences")
+
+class ContentRecommendation(Base):
+    __tablename__ = "content_recommendations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    tip_id = Column(Integer, ForeignKey("wellness_tips.id", ondelete="CASCADE"), nullable=False)
+
+    # Recommendation details
+    score = Column(Float, default=0.0)
+    reason = Column(String)  # Why the tip was recommended
+    source = Column(String, default="algorithmic")  # "ai" or "algorithmic"
+    is_viewed = Column(Boolean, default=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
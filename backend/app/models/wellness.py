@@ -2,9 +2,10 @@
 Wellness-related models for tips, activities, and categories
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Float, String, Text, Date, DateTime, JSON, LargeBinary, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from datetime import date
 import enum
 from ..core.database import Base
 
@@ -22,12 +23,27 @@ class ActivityTypeEnum(str, enum.Enum):
     VIEW_CATEGORY = "view_category"
     CHAT_INTERACTION = "chat_interaction"
 
+# List views show the first EXCERPT_LENGTH characters of a tip
+EXCERPT_LENGTH = 200
+
+# TipViewerSketch day holding a tip's all-time viewer sketch
+ALL_DAYS = date.min
+
+def make_excerpt(content: str) -> str:
+    """Excerpt stored alongside a tip's content"""
+    content = content or ""
+    return content[:EXCERPT_LENGTH] + "..." if len(content) > EXCERPT_LENGTH else content
+
+def _default_excerpt(context) -> str:
+    return make_excerpt(context.get_current_parameters().get("content"))
+
 class WellnessTip(Base):
     __tablename__ = "wellness_tips"
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
+    excerpt = Column(String(EXCERPT_LENGTH + 3), default=_default_excerpt)  # kept in sync with content by WellnessService
     category = Column(Enum(WellnessCategoryEnum), nullable=False)
     tags = Column(JSON, default=list)
     
@@ -38,6 +54,7 @@ class WellnessTip(Base):
     likes_count = Column(Integer, default=0)
     shares_count = Column(Integer, default=0)
     views_count = Column(Integer, default=0)
+    unique_viewers = Column(Integer, default=0)  # HyperLogLog estimate, persisted by UniqueViewerTracker
     
     # Metadata
     source_url = Column(String)  # If tip comes from external source
@@ -50,6 +67,14 @@ class WellnessTip(Base):
     
     # Relationships
     author = relationship("User", back_populates="wellness_tips")
+    
+    # Keyset pagination indexes: (sort column, id) for each listing sort
+    __table_args__ = (
+        Index("ix_wellness_tips_created_at_id", "created_at", "id"),
+        Index("ix_wellness_tips_likes_count_id", "likes_count", "id"),
+        Index("ix_wellness_tips_views_count_id", "views_count", "id"),
+        Index("ix_wellness_tips_category_created_at_id", "category", "created_at", "id"),
+    )
 
 class UserActivity(Base):
     __tablename__ = "user_activities"
@@ -61,7 +86,8 @@ class UserActivity(Base):
     # Activity context
     category = Column(Enum(WellnessCategoryEnum))
     content_id = Column(String)  # Generic content identifier
-    metadata = Column(JSON, default=dict)  # Additional activity data
+    # "metadata" is reserved on declarative classes, so the attribute is renamed
+    activity_metadata = Column("metadata", JSON, default=dict)  # Additional activity data
     
     # Session tracking
     session_id = Column(String)
@@ -95,4 +121,76 @@ class WellnessCategory(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class CategoryRollup(Base):
+    """Engagement totals per category, maintained incrementally on writes"""
+    __tablename__ = "category_rollups"
+    
+    category = Column(Enum(WellnessCategoryEnum), primary_key=True)
+    total_tips = Column(Integer, default=0, nullable=False)
+    total_views = Column(Integer, default=0, nullable=False)
+    total_likes = Column(Integer, default=0, nullable=False)
+    total_shares = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CategoryTagCount(Base):
+    """Number of tips carrying each tag, per category"""
+    __tablename__ = "category_tag_counts"
+    
+    category = Column(Enum(WellnessCategoryEnum), primary_key=True)
+    tag = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_category_tag_counts_category_count", "category", "count"),
+    )
+
+class UserBehaviorProfile(Base):
+    """Compact rolling activity profile used for personalization"""
+    __tablename__ = "user_behavior_profiles"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    
+    # Snapshot of the user's preference fields so a recommendation needs one read
+    interests = Column(JSON, default=list)
+    wellness_goals = Column(JSON, default=list)
+    experience_level = Column(String, default="beginner")
+    
+    # 30-slot ring of per-category daily counts: {"food": [..30 ints..]} plus the day each slot holds
+    day_buckets = Column(JSON, default=dict)
+    slot_days = Column(JSON, default=list)
+    
+    reconciled_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TipTrendingScore(Base):
+    """Forward-decayed hot score per tip, relative to TrendingState.epoch"""
+    __tablename__ = "tip_trending_scores"
+    
+    tip_id = Column(Integer, ForeignKey("wellness_tips.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, default=0.0, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_tip_trending_scores_score_tip_id", "score", "tip_id"),
+    )
+
+class TipViewerSketch(Base):
+    """HyperLogLog registers of the users who viewed a tip on one day (UTC);
+    the row for ALL_DAYS holds the union over every day"""
+    __tablename__ = "tip_viewer_sketches"
+    
+    tip_id = Column(Integer, ForeignKey("wellness_tips.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+
+class TrendingState(Base):
+    """Single-row bookkeeping for the trending job"""
+    __tablename__ = "trending_state"
+    
+    id = Column(Integer, primary_key=True)
+    epoch = Column(DateTime(timezone=True), nullable=False)  # scores are stored as weights * 2^((t - epoch) / half-life)
+    watermark = Column(DateTime(timezone=True), nullable=False)  # activity before this has been scored
+    category_scores = Column(JSON, default=dict)  # forward-decayed, same epoch
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
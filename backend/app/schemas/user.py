@@ -79,4 +79,7 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
-    exp: Optional[int] = None
\ No newline at end of file
+    exp: Optional[int] = None
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
\ No newline at end of file
@@ -4,7 +4,7 @@ Wellness-related Pydantic schemas
 
 from pydantic import BaseModel, validator
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 from ..models.wellness import WellnessCategoryEnum, ActivityTypeEnum
@@ -34,10 +34,12 @@ class WellnessTipUpdate(BaseModel):
 
 class WellnessTip(WellnessTipBase):
     id: int
+    excerpt: Optional[str] = None
     author_id: int
     likes_count: int
     shares_count: int
     views_count: int
+    unique_viewers: int = 0  # distinct viewers (estimate), refreshed periodically
     is_featured: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -102,7 +104,30 @@ class WellnessCategory(WellnessCategoryBase):
     class Config:
         from_attributes = True
 
+# Batch Schemas
+class TipBatchGet(BaseModel):
+    ids: List[int]
+    fields: Optional[List[str]] = None
+
+class BatchItemError(BaseModel):
+    index: int
+    detail: Any
+
+class TipBatchResult(BaseModel):
+    tips: List[Optional[Dict[str, Any]]]  # in request order, null where the tip could not be returned
+    errors: List[BatchItemError]
+
+class ActivityBatchResult(BaseModel):
+    accepted: int
+    errors: List[BatchItemError]
+
 # Analytics and Insights
+class TipUniqueViewers(BaseModel):
+    tip_id: int
+    start: date
+    end: date
+    unique_viewers: int  # HyperLogLog estimate, about 1% standard error
+
 class CategoryInsights(BaseModel):
     category: WellnessCategoryEnum
     total_tips: int
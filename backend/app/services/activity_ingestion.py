@@ -0,0 +1,396 @@
+"""
+Batched asynchronous ingestion of user activity events
+"""
+
+import asyncio
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import insert
+
+from ..core.config import settings
+from ..core.database import engine
+from ..models.wellness import UserActivity, ActivityTypeEnum, WellnessCategoryEnum
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+BatchListener = Callable[[Any, List[Dict[str, Any]]], Awaitable[None]]
+
+# Column order used for COPY on Postgres
+COPY_COLUMNS = ["user_id", "activity_type", "category", "content_id", "metadata", "session_id", "created_at"]
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ActivityIngestionPipeline:
+    """Bounded queue of activity events drained by a background bulk writer"""
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.ACTIVITY_QUEUE_MAX_SIZE,
+        batch_size: int = settings.ACTIVITY_BATCH_SIZE,
+        flush_interval: float = settings.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+        overflow_policy: str = settings.ACTIVITY_OVERFLOW_POLICY,
+        enqueue_timeout: float = settings.ACTIVITY_ENQUEUE_TIMEOUT_SECONDS,
+        spill_path: str = settings.ACTIVITY_SPILL_PATH
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_path = spill_path
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._write_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._batch_listeners: List[BatchListener] = []
+        self._listener_tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "failed_batches": 0
+        }
+
+    @staticmethod
+    def build_event(
+        user_id: int,
+        activity_type: str,
+        category: Optional[WellnessCategoryEnum] = None,
+        content_id: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build a row for the user_activities table, stamped with the event time"""
+
+        return {
+            "user_id": user_id,
+            "activity_type": ActivityTypeEnum(activity_type),
+            "category": WellnessCategoryEnum(category) if category else None,
+            "content_id": content_id,
+            "metadata": metadata or {},
+            "session_id": session_id,
+            "created_at": datetime.now(timezone.utc)
+        }
+
+    async def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Queue an event, applying the overflow policy when full. Returns False if dropped."""
+
+        try:
+            self._queue.put_nowait(event)
+            self.stats["enqueued"] += 1
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy == "block":
+            # Backpressure: wait briefly for the writer to make room
+            try:
+                await asyncio.wait_for(self._queue.put(event), timeout=self.enqueue_timeout)
+                self.stats["enqueued"] += 1
+                return True
+            except asyncio.TimeoutError:
+                pass
+        elif self.overflow_policy == "spill":
+            self._spill([event])
+            return True
+
+        self.stats["dropped"] += 1
+        return False
+
+    async def enqueue_many(self, events: List[Dict[str, Any]]) -> int:
+        """Queue events in order, applying the overflow policy to those that do not fit.
+
+        Returns how many events were accepted; they are always a prefix of
+        `events`, and the rest were dropped.
+        """
+
+        accepted = 0
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                break
+            accepted += 1
+        self.stats["enqueued"] += accepted
+
+        rest = events[accepted:]
+        if not rest:
+            return accepted
+
+        if self.overflow_policy == "block":
+            # One backpressure window for the whole batch, not one per event
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.enqueue_timeout
+            for event in rest:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._queue.put(event), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                accepted += 1
+                self.stats["enqueued"] += 1
+        elif self.overflow_policy == "spill":
+            self._spill(rest)
+            return len(events)
+
+        self.stats["dropped"] += len(events) - accepted
+        return accepted
+
+    def queue_depth(self) -> int:
+        """Number of events waiting to be written"""
+        return self._queue.qsize()
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Bulk insert a batch in one statement (COPY on Postgres)"""
+
+        table = UserActivity.__table__
+        async with self._write_lock:
+            try:
+                async with engine.begin() as conn:
+                    if conn.dialect.name == "postgresql":
+                        raw = await conn.get_raw_connection()
+                        await raw.driver_connection.copy_records_to_table(
+                            table.name,
+                            records=[self._copy_record(event) for event in batch],
+                            columns=COPY_COLUMNS
+                        )
+                    else:
+                        await conn.execute(insert(table).values(batch))
+                self.stats["written"] += len(batch)
+            except Exception as e:
+                self.stats["failed_batches"] += 1
+                print(f"Activity batch write error: {e}")
+                if self.overflow_policy == "spill":
+                    self._spill(batch)
+                else:
+                    self.stats["dropped"] += len(batch)
+                return
+
+            await self._notify(batch)
+
+    def add_batch_listener(self, listener: BatchListener) -> None:
+        """Register a coroutine called with (connection, batch) after each batch is stored"""
+        self._batch_listeners.append(listener)
+
+    def notify_stored(self, events: List[Dict[str, Any]]) -> None:
+        """Run batch listeners in the background for events a request transaction stored itself"""
+
+        task = asyncio.create_task(self._notify(events))
+        self._listener_tasks.add(task)
+        task.add_done_callback(self._listener_tasks.discard)
+
+    async def _notify(self, batch: List[Dict[str, Any]]) -> None:
+        """Run batch listeners in their own transaction; failures never affect stored activity"""
+
+        for listener in self._batch_listeners:
+            try:
+                async with engine.begin() as conn:
+                    await listener(conn, batch)
+            except Exception as e:
+                print(f"Activity batch listener error: {e}")
+
+    @staticmethod
+    def _copy_record(event: Dict[str, Any]) -> tuple:
+        """Convert an event to a COPY record (enums are stored by name)"""
+
+        return (
+            event["user_id"],
+            event["activity_type"].name,
+            event["category"].name if event["category"] else None,
+            event["content_id"],
+            json.dumps(event["metadata"]),
+            event["session_id"],
+            event["created_at"]
+        )
+
+    def _spill_name(self, *parts: Any) -> str:
+        """ACTIVITY_SPILL_PATH with `parts` inserted before its extension"""
+        root, ext = os.path.splitext(self.spill_path)
+        return ".".join([root, *map(str, parts)]) + ext
+
+    def _spill_file(self) -> str:
+        """This process's spill file (prefork workers share ACTIVITY_SPILL_PATH)"""
+        return self._spill_name(os.getpid())
+
+    def _replayable_spills(self) -> List[str]:
+        """Spill and unfinished replay files of this process or of processes that exited"""
+
+        directory = os.path.dirname(self.spill_path) or "."
+        root, ext = os.path.splitext(os.path.basename(self.spill_path))
+        pattern = re.compile(rf"^{re.escape(root)}\.(\d+)(?:\.replay-[0-9a-f]+)?{re.escape(ext)}$")
+
+        # The shared path itself is only written by versions before per-process spill files
+        paths = [self.spill_path] if os.path.exists(self.spill_path) else []
+        for name in sorted(os.listdir(directory)):
+            match = pattern.match(name)
+            if match and (int(match.group(1)) == os.getpid() or not _process_alive(int(match.group(1)))):
+                paths.append(os.path.join(directory, name))
+        return paths
+
+    @staticmethod
+    def _spill_lines(events: List[Dict[str, Any]]) -> str:
+        return "".join(
+            json.dumps({
+                **event,
+                "activity_type": event["activity_type"].value,
+                "category": event["category"].value if event["category"] else None,
+                "created_at": event["created_at"].isoformat()
+            }) + "\n"
+            for event in events
+        )
+
+    def _spill(self, events: List[Dict[str, Any]]) -> None:
+        """Append events to this process's spill file for later replay"""
+
+        with open(self._spill_file(), "a", encoding="utf-8") as spill_file:
+            spill_file.write(self._spill_lines(events))
+        self.stats["spilled"] += len(events)
+
+    async def replay_spill(self) -> int:
+        """Write spilled events back to the database, returns number replayed.
+
+        Covers this process's spill file and those left by exited workers. Each
+        file is claimed by renaming it to a name unique to this replay, so new
+        spills never interleave with it and two workers never replay (or
+        overwrite) the same file; batches that fail again are re-spilled.
+        """
+
+        replayed = 0
+        for path in self._replayable_spills():
+            replay_path = self._spill_name(os.getpid(), f"replay-{uuid.uuid4().hex}")
+            try:
+                os.rename(path, replay_path)
+            except FileNotFoundError:
+                # Claimed by another worker first
+                continue
+            replayed += await self._replay_file(replay_path)
+        return replayed
+
+    @staticmethod
+    def _read_spill(path: str) -> List[Dict[str, Any]]:
+        events = []
+        with open(path, encoding="utf-8") as spill_file:
+            for line in spill_file:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash while spilling
+                    print(f"Skipping unreadable line in activity spill file {path}")
+                    continue
+                event["activity_type"] = ActivityTypeEnum(event["activity_type"])
+                event["category"] = WellnessCategoryEnum(event["category"]) if event["category"] else None
+                event["created_at"] = datetime.fromisoformat(event["created_at"])
+                events.append(event)
+        return events
+
+    async def _replay_file(self, replay_path: str) -> int:
+        """Write the events of a claimed spill file, deleting it once every batch is stored or re-spilled.
+
+        If the replay is interrupted, the file is cut down to the events not yet
+        written and stays claimed under a name _replayable_spills picks up again;
+        after a hard crash the whole file is replayed (at least once).
+        """
+
+        events = self._read_spill(replay_path)
+        written = 0
+        try:
+            while written < len(events):
+                batch = events[written:written + self.batch_size]
+                await self._write(batch)
+                written += len(batch)
+        except BaseException:
+            remaining = f"{replay_path}.tmp"
+            with open(remaining, "w", encoding="utf-8") as spill_file:
+                spill_file.write(self._spill_lines(events[written:]))
+            os.replace(remaining, replay_path)
+            raise
+        os.remove(replay_path)
+        return len(events)
+
+    async def _collect(self, batch: List[Dict[str, Any]]) -> None:
+        """Wait for one event, then collect more until the batch is full or the interval elapses"""
+
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        """Background writer loop"""
+
+        while True:
+            batch: List[Dict[str, Any]] = []
+            try:
+                await self._collect(batch)
+            except asyncio.CancelledError:
+                # Do not lose events already taken off the queue
+                if batch:
+                    await asyncio.shield(self._write(batch))
+                raise
+            await asyncio.shield(self._write(batch))
+
+            if self.overflow_policy == "spill" and self._queue.empty():
+                try:
+                    await self.replay_spill()
+                except Exception as e:
+                    print(f"Activity spill replay error: {e}")
+
+    async def flush(self) -> int:
+        """Write everything currently queued, returns number of events drained"""
+
+        drained = 0
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+            drained += len(batch)
+        return drained
+
+    def start(self) -> None:
+        """Start the background writer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush queued events"""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+        if self._listener_tasks:
+            await asyncio.gather(*self._listener_tasks)
+
+activity_pipeline = ActivityIngestionPipeline()
@@ -0,0 +1,191 @@
+"""
+In-memory caches on the authentication path: verified tokens and current users
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.security import verify_token
+from ..core.singleflight import SingleFlight
+from ..core.tiered_cache import CacheBus, cache_bus
+from ..models.user import User
+
+CREDENTIALS_ERROR = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def _token_id(token: str, payload: Dict[str, Any]) -> str:
+    """A token's jti, or a digest for tokens issued without one"""
+    return payload.get("jti") or hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+class AuthCache:
+    """Verified JWT payloads (until their exp) and resolved users (short TTL).
+
+    A token is decoded and its signature checked once; later requests with the
+    same token reuse the payload until it expires. Users are cached as
+    detached, read-only User instances and dropped whenever UserService writes
+    them (profile edits, deactivation).
+
+    Logged-out tokens are revoked by jti until their own expiry: in this
+    process, in the shared L2 (so other workers and restarts see it when they
+    first verify the token) and on the cache bus (so workers that already
+    cached the payload reject it at once). User invalidations are broadcast
+    the same way. Without an L2 both stay local to this process.
+    """
+
+    namespace = "auth"
+
+    def __init__(
+        self,
+        max_tokens: int = settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+        max_users: int = settings.AUTH_USER_CACHE_MAX_ENTRIES,
+        user_ttl: float = settings.AUTH_USER_CACHE_TTL_SECONDS,
+        bus: CacheBus = cache_bus
+    ):
+        self._payloads = TTLCache(max_tokens, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        self._users = TTLCache(max_users, user_ttl)
+        self._user_loads = SingleFlight()
+        self._revoked = TTLCache(max_tokens, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)  # token id -> True until exp
+        self._generation = 0
+        self.bus = bus
+        self.lookups = 0
+        self.served_from_memory = 0
+        bus.register(self)
+
+    def _l2_key(self, token_id: str) -> str:
+        return f"{self.bus.prefix}:{self.namespace}:revoked:{token_id}"
+
+    async def _is_revoked(self, token_id: str, exp: float) -> bool:
+        if token_id in self._revoked:
+            return True
+        if not self.bus.l2_available:
+            return False
+        if await self.bus.call_l2(lambda: self.bus.l2.get(self._l2_key(token_id))) is None:
+            return False
+        self._revoked.set(token_id, True, ttl=max(exp - time.time(), 0))
+        return True
+
+    async def payload(self, token: str) -> Dict[str, Any]:
+        """Verified claims of a token, raising 401 if it is invalid, expired or revoked"""
+
+        payload = self._payloads.get(token)
+        if payload is not None:
+            if _token_id(token, payload) in self._revoked:
+                self._payloads.delete(token)
+                raise CREDENTIALS_ERROR
+            return payload
+
+        payload = verify_token(token)
+        exp = payload.get("exp", 0)
+        if await self._is_revoked(_token_id(token, payload), exp):
+            raise CREDENTIALS_ERROR
+        remaining = exp - time.time()
+        if remaining > 0:
+            self._payloads.set(token, payload, ttl=remaining)
+        return payload
+
+    async def _load_user(self, user_id: int) -> Optional[User]:
+        generation = self._generation
+
+        async def load() -> Optional[User]:
+            async with AsyncSessionLocal() as session:
+                user = await session.get(User, user_id)
+                if user is not None:
+                    session.expunge(user)
+            if user is not None and generation == self._generation:
+                self._users.set(user_id, user)
+            return user
+
+        return await self._user_loads.do(user_id, load)
+
+    async def current_user(self, token: str) -> User:
+        """Active user a bearer access token belongs to"""
+
+        self.lookups += 1
+        token_cached = token in self._payloads
+        payload = await self.payload(token)
+        subject = payload.get("sub")
+        if payload.get("type") == "refresh" or not subject or not subject.isdigit():
+            raise CREDENTIALS_ERROR
+
+        user_id = int(subject)
+        user = self._users.get(user_id)
+        if user is not None:
+            if token_cached:
+                self.served_from_memory += 1
+        else:
+            user = await self._load_user(user_id)
+        if user is None:
+            raise CREDENTIALS_ERROR
+        if not user.is_active:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+        return user
+
+    async def revoke(self, token: str) -> None:
+        """Reject a token everywhere from now until it expires (logout)"""
+
+        try:
+            payload = await self.payload(token)
+        except HTTPException:
+            return  # already unusable
+        self._payloads.delete(token)
+        exp = payload.get("exp", 0)
+        remaining = exp - time.time()
+        if remaining <= 0:
+            return
+        token_id = _token_id(token, payload)
+        self._revoked.set(token_id, True, ttl=remaining)
+        if self.bus.l2_available:
+            await self.bus.call_l2(lambda: self.bus.l2.set(self._l2_key(token_id), b"1", remaining))
+            await self.bus.publish_invalidation(self.namespace, [f"token:{token_id}:{exp}"])
+
+    def _drop_user(self, user_id: int) -> None:
+        self._generation += 1
+        self._users.delete(user_id)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop a cached user after their row changed, here and in every other process"""
+
+        self._drop_user(user_id)
+        if self.bus.l2_available:
+            await self.bus.publish_invalidation(self.namespace, [f"user:{user_id}"])
+
+    def drop_local(self, keys: Optional[List[str]]) -> None:
+        """Apply invalidations from another process (None: some were missed, forget every token and user)"""
+
+        if keys is None:
+            # Tokens are re-verified against the shared revocations on next use
+            self._generation += 1
+            self._users.clear()
+            self._payloads.clear()
+            return
+        for key in keys:
+            kind, _, rest = key.partition(":")
+            if kind == "user":
+                self._drop_user(int(rest))
+            elif kind == "token":
+                token_id, _, exp = rest.rpartition(":")
+                remaining = float(exp) - time.time()
+                if remaining > 0:
+                    self._revoked.set(token_id, True, ttl=remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        """Token and user cache counters, and the share of lookups that needed no decode or query"""
+        return {
+            "tokens": self._payloads.stats(),
+            "users": self._users.stats(),
+            "user_loads": self._user_loads.stats(),
+            "revoked_tokens": len(self._revoked),
+            "lookups": self.lookups,
+            "served_from_memory_ratio": round(self.served_from_memory / self.lookups, 4) if self.lookups else 0.0
+        }
+
+auth_cache = AuthCache()
@@ -0,0 +1,245 @@
+"""
+Rolling per-user behavior profiles (30-day ring of per-category daily counts)
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+
+from ..core.config import settings
+from ..core.database import engine, upsert_insert
+from ..models.user import User
+from ..models.wellness import UserActivity, UserBehaviorProfile, WellnessCategoryEnum
+
+WINDOW_DAYS = 30
+UNCATEGORIZED = "_none"
+
+def _day_number(value: Union[date, datetime, str]) -> int:
+    """Ordinal day for a date, datetime or ISO date string"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+def _category_key(category: Optional[Union[WellnessCategoryEnum, str]]) -> str:
+    if category is None:
+        return UNCATEGORIZED
+    return getattr(category, "value", category)
+
+class ActivityRing:
+    """Per-category daily counters in a fixed ring of WINDOW_DAYS slots"""
+
+    def __init__(self, day_buckets: Optional[Dict[str, List[int]]] = None, slot_days: Optional[List[int]] = None):
+        self.day_buckets = {key: list(counts) for key, counts in (day_buckets or {}).items()}
+        self.slot_days = list(slot_days) if slot_days else [0] * WINDOW_DAYS
+
+    def add(self, category_key: str, day: int, count: int = 1) -> None:
+        """Add events for a day, recycling the slot if it still holds an older day"""
+
+        slot = day % WINDOW_DAYS
+        if self.slot_days[slot] > day:
+            return  # older than the window the slot already covers
+        if self.slot_days[slot] != day:
+            for counts in self.day_buckets.values():
+                counts[slot] = 0
+            self.slot_days[slot] = day
+
+        counts = self.day_buckets.setdefault(category_key, [0] * WINDOW_DAYS)
+        counts[slot] += count
+
+    def totals(self, today: int) -> Dict[Optional[WellnessCategoryEnum], int]:
+        """Event counts per category over the last WINDOW_DAYS days"""
+
+        live = [slot for slot, day in enumerate(self.slot_days) if today - WINDOW_DAYS < day <= today]
+        patterns = {}
+        for key, counts in self.day_buckets.items():
+            total = sum(counts[slot] for slot in live)
+            if total:
+                patterns[None if key == UNCATEGORIZED else WellnessCategoryEnum(key)] = total
+        return patterns
+
+class BehaviorProfileService:
+    """Reads, updates and reconciles rolling behavior profiles.
+
+    Works on an AsyncSession (request path) or an AsyncConnection (ingestion listener).
+    """
+
+    def __init__(self, db: Union[AsyncSession, AsyncConnection]):
+        self.db = db
+
+    async def get_profile(self, user_id: int) -> Dict[str, Any]:
+        """Profile in the shape the recommendation engine expects, built on first use"""
+
+        result = await self.db.execute(
+            select(UserBehaviorProfile.__table__).where(UserBehaviorProfile.user_id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            row = await self.reconcile(user_id)
+            if row is None:
+                return {"interests": [], "experience_level": "beginner", "activity_patterns": {}}
+
+        ring = ActivityRing(row.day_buckets, row.slot_days)
+        return {
+            "interests": row.interests or [],
+            "wellness_goals": row.wellness_goals or [],
+            "experience_level": row.experience_level,
+            "activity_patterns": ring.totals(datetime.now(timezone.utc).date().toordinal())
+        }
+
+    async def reconcile(self, user_id: int):
+        """Rebuild a profile from the user row and the last WINDOW_DAYS of activity"""
+
+        user_result = await self.db.execute(
+            select(User.interests, User.wellness_goals, User.experience_level).where(User.id == user_id)
+        )
+        user = user_result.first()
+        if user is None:
+            return None
+
+        since = datetime.now(timezone.utc) - timedelta(days=WINDOW_DAYS)
+        activity_day = func.date(UserActivity.created_at)
+        activity_result = await self.db.execute(
+            select(
+                UserActivity.category,
+                activity_day.label("day"),
+                func.count(UserActivity.id).label("count")
+            ).where(
+                UserActivity.user_id == user_id,
+                UserActivity.created_at >= since
+            ).group_by(UserActivity.category, activity_day)
+        )
+        ring = ActivityRing()
+        for row in activity_result.fetchall():
+            ring.add(_category_key(row.category), _day_number(row.day), row.count)
+
+        values = {
+            "user_id": user_id,
+            "interests": user.interests or [],
+            "wellness_goals": user.wellness_goals or [],
+            "experience_level": user.experience_level,
+            "day_buckets": ring.day_buckets,
+            "slot_days": ring.slot_days,
+            "reconciled_at": datetime.now(timezone.utc)
+        }
+        table = UserBehaviorProfile.__table__
+        stmt = upsert_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={key: stmt.excluded[key] for key in values if key != "user_id"}
+        )
+        await self.db.execute(stmt)
+
+        result = await self.db.execute(select(table).where(table.c.user_id == user_id))
+        return result.first()
+
+    async def apply_activity(self, events: List[Dict[str, Any]]) -> None:
+        """Fold a batch of stored activity events into existing profiles"""
+
+        per_user: Dict[int, Dict[Tuple[str, int], int]] = defaultdict(lambda: defaultdict(int))
+        for event in events:
+            per_user[event["user_id"]][(_category_key(event["category"]), _day_number(event["created_at"]))] += 1
+
+        table = UserBehaviorProfile.__table__
+        result = await self.db.execute(
+            select(table.c.user_id, table.c.day_buckets, table.c.slot_days)
+            .where(table.c.user_id.in_(list(per_user)))
+            .with_for_update()
+        )
+        # Users without a profile get one built from the table on their next recommendation
+        for row in result.fetchall():
+            ring = ActivityRing(row.day_buckets, row.slot_days)
+            for (category_key, day), count in per_user[row.user_id].items():
+                ring.add(category_key, day, count)
+            await self.db.execute(
+                table.update()
+                .where(table.c.user_id == row.user_id)
+                .values(day_buckets=ring.day_buckets, slot_days=ring.slot_days)
+            )
+
+    async def sync_user_fields(self, user: User) -> None:
+        """Copy changed preference fields (interests, goals, level) into the profile"""
+
+        table = UserBehaviorProfile.__table__
+        await self.db.execute(
+            table.update()
+            .where(table.c.user_id == user.id)
+            .values(
+                interests=user.interests or [],
+                wellness_goals=user.wellness_goals or [],
+                experience_level=user.experience_level
+            )
+        )
+
+    async def stale_user_ids(self, limit: int) -> List[int]:
+        """Profiles whose last reconciliation is older than the configured age"""
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.BEHAVIOR_PROFILE_RECONCILE_AFTER_SECONDS)
+        result = await self.db.execute(
+            select(UserBehaviorProfile.user_id)
+            .where(or_(
+                UserBehaviorProfile.reconciled_at.is_(None),
+                UserBehaviorProfile.reconciled_at < cutoff
+            ))
+            .order_by(UserBehaviorProfile.reconciled_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+async def apply_activity_batch(conn: AsyncConnection, batch: List[Dict[str, Any]]) -> None:
+    """Activity pipeline listener keeping profiles current as events are ingested"""
+    await BehaviorProfileService(conn).apply_activity(batch)
+
+class ProfileReconciler:
+    """Background task that periodically rebuilds stale profiles from user_activities"""
+
+    def __init__(
+        self,
+        poll_interval: float = settings.BEHAVIOR_PROFILE_RECONCILE_POLL_SECONDS,
+        batch_size: int = settings.BEHAVIOR_PROFILE_RECONCILE_BATCH
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.reconciled = 0
+
+    async def run_once(self) -> int:
+        """Reconcile one batch of stale profiles, returns how many were rebuilt"""
+
+        async with engine.begin() as conn:
+            user_ids = await BehaviorProfileService(conn).stale_user_ids(self.batch_size)
+        for user_id in user_ids:
+            async with engine.begin() as conn:
+                await BehaviorProfileService(conn).reconcile(user_id)
+        self.reconciled += len(user_ids)
+        return len(user_ids)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Behavior profile reconciliation error: {e}")
+
+    def start(self) -> None:
+        """Start the reconciliation loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the reconciliation loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+profile_reconciler = ProfileReconciler()
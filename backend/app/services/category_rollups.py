@@ -0,0 +1,250 @@
+"""
+Incrementally maintained per-category insight rollups
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+
+from ..core.config import settings
+from ..core.database import upsert_insert
+from ..core.tiered_cache import TieredCache, cache_bus
+from ..models.wellness import WellnessTip, WellnessCategoryEnum, CategoryRollup, CategoryTagCount
+from ..schemas.wellness import CategoryInsights
+from .trending import TrendingService
+
+TOP_TAGS_LIMIT = 5
+ALL_CATEGORIES_KEY = "*"  # insights cache key of the every-category listing
+
+# Insights read from the rollups, cached briefly by category value (and ALL_CATEGORIES_KEY)
+insights_cache = TieredCache("insights", settings.INSIGHTS_CACHE_TTL_SECONDS, cache_bus)
+
+async def invalidate_insights(*categories: Optional[WellnessCategoryEnum]) -> None:
+    """Drop cached insights of these categories, and of every category, after their rollups changed"""
+    names = {getattr(category, "value", category) for category in categories if category is not None}
+    await insights_cache.invalidate(ALL_CATEGORIES_KEY, *names)
+
+class CategoryRollupService:
+    """Applies deltas to category rollups and reads insights from them.
+
+    Works on either an AsyncSession (request path, same transaction as the
+    tip write) or an AsyncConnection (background counter flushes).
+    """
+
+    def __init__(self, db: Union[AsyncSession, AsyncConnection]):
+        self.db = db
+
+    async def apply_deltas(
+        self,
+        category: WellnessCategoryEnum,
+        tips: int = 0,
+        views: int = 0,
+        likes: int = 0,
+        shares: int = 0
+    ) -> None:
+        """Add deltas to a category's totals (atomic upsert)"""
+
+        table = CategoryRollup.__table__
+        stmt = upsert_insert(table).values(
+            category=category,
+            total_tips=tips,
+            total_views=views,
+            total_likes=likes,
+            total_shares=shares
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.category],
+            set_={
+                "total_tips": table.c.total_tips + stmt.excluded.total_tips,
+                "total_views": table.c.total_views + stmt.excluded.total_views,
+                "total_likes": table.c.total_likes + stmt.excluded.total_likes,
+                "total_shares": table.c.total_shares + stmt.excluded.total_shares,
+                "updated_at": func.now()
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def set_totals(
+        self,
+        category: WellnessCategoryEnum,
+        tips: int,
+        views: int,
+        likes: int,
+        shares: int
+    ) -> None:
+        """Overwrite a category's totals (idempotent, unlike apply_deltas)"""
+
+        table = CategoryRollup.__table__
+        stmt = upsert_insert(table).values(
+            category=category,
+            total_tips=tips,
+            total_views=views,
+            total_likes=likes,
+            total_shares=shares
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.category],
+            set_={
+                "total_tips": stmt.excluded.total_tips,
+                "total_views": stmt.excluded.total_views,
+                "total_likes": stmt.excluded.total_likes,
+                "total_shares": stmt.excluded.total_shares,
+                "updated_at": func.now()
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def apply_tag_deltas(self, category: WellnessCategoryEnum, deltas: Dict[str, int]) -> None:
+        """Add per-tag deltas for a category and drop tags that reach zero"""
+
+        deltas = {tag: delta for tag, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        table = CategoryTagCount.__table__
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.category, table.c.tag],
+            set_={"count": table.c["count"] + stmt.excluded["count"]}
+        )
+        await self.db.execute(stmt, [
+            {"category": category, "tag": tag, "count": delta}
+            for tag, delta in deltas.items()
+        ])
+        await self.db.execute(
+            delete(table).where(
+                table.c.category == category,
+                table.c.tag.in_(list(deltas)),
+                table.c["count"] <= 0
+            )
+        )
+
+    async def tip_created(self, category: WellnessCategoryEnum, tags: Optional[Iterable[str]]) -> None:
+        """Account for a new tip"""
+        await self.apply_deltas(category, tips=1)
+        await self.apply_tag_deltas(category, Counter(set(tags or [])))
+
+    async def tip_deleted(self, tip: WellnessTip) -> None:
+        """Remove a tip and its stored engagement from its category"""
+        await self.apply_deltas(
+            tip.category,
+            tips=-1,
+            views=-(tip.views_count or 0),
+            likes=-(tip.likes_count or 0),
+            shares=-(tip.shares_count or 0)
+        )
+        await self.apply_tag_deltas(tip.category, {tag: -1 for tag in set(tip.tags or [])})
+
+    async def tags_changed(
+        self,
+        category: WellnessCategoryEnum,
+        old_tags: Optional[Iterable[str]],
+        new_tags: Optional[Iterable[str]]
+    ) -> None:
+        """Move tag counts from a tip's old tags to its new ones"""
+        old, new = set(old_tags or []), set(new_tags or [])
+        deltas = {tag: 1 for tag in new - old}
+        deltas.update({tag: -1 for tag in old - new})
+        await self.apply_tag_deltas(category, deltas)
+
+    async def rebuild(self) -> None:
+        """Recompute every rollup from the tips table.
+
+        Rows are overwritten rather than incremented, so processes that find
+        the rollups empty and rebuild at the same time converge on the same
+        totals instead of adding them up twice.
+        """
+
+        await self.db.execute(delete(CategoryRollup.__table__))
+        await self.db.execute(delete(CategoryTagCount.__table__))
+
+        totals = await self.db.execute(
+            select(
+                WellnessTip.category,
+                func.count(WellnessTip.id).label("tips"),
+                func.coalesce(func.sum(WellnessTip.views_count), 0).label("views"),
+                func.coalesce(func.sum(WellnessTip.likes_count), 0).label("likes"),
+                func.coalesce(func.sum(WellnessTip.shares_count), 0).label("shares")
+            ).group_by(WellnessTip.category)
+        )
+        for row in totals.fetchall():
+            await self.set_totals(row.category, row.tips, row.views, row.likes, row.shares)
+
+        tag_counts: Dict[WellnessCategoryEnum, Counter] = {}
+        tag_rows = await self.db.stream(select(WellnessTip.category, WellnessTip.tags))
+        async for row in tag_rows:
+            tag_counts.setdefault(row.category, Counter()).update(set(row.tags or []))
+
+        table = CategoryTagCount.__table__
+        rows = [
+            {"category": category, "tag": tag, "count": count}
+            for category, counts in tag_counts.items()
+            for tag, count in counts.items()
+        ]
+        if rows:
+            stmt = upsert_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.category, table.c.tag],
+                set_={"count": stmt.excluded["count"]}
+            )
+            await self.db.execute(stmt, rows)
+
+    async def is_empty(self) -> bool:
+        """Whether the rollups have never been built"""
+        return not await self.db.scalar(select(func.count()).select_from(CategoryRollup.__table__))
+
+    async def get_insights(self, category: WellnessCategoryEnum) -> CategoryInsights:
+        """Insights for one category: a primary key read plus its top tags"""
+        insights = await self.get_all_insights([category])
+        return insights[0]
+
+    async def get_all_insights(
+        self,
+        categories: Optional[List[WellnessCategoryEnum]] = None
+    ) -> List[CategoryInsights]:
+        """Insights for several categories (all by default) in three small queries"""
+
+        categories = categories or list(WellnessCategoryEnum)
+
+        rollup_table = CategoryRollup.__table__
+        rollups = await self.db.execute(
+            select(rollup_table).where(rollup_table.c.category.in_(categories))
+        )
+        by_category = {row.category: row for row in rollups.fetchall()}
+
+        tag_rank = func.row_number().over(
+            partition_by=CategoryTagCount.category,
+            order_by=(CategoryTagCount.count.desc(), CategoryTagCount.tag)
+        ).label("tag_rank")
+        ranked = select(CategoryTagCount.category, CategoryTagCount.tag, tag_rank).where(
+            CategoryTagCount.category.in_(categories)
+        ).subquery()
+        tag_result = await self.db.execute(
+            select(ranked.c.category, ranked.c.tag)
+            .where(ranked.c.tag_rank <= TOP_TAGS_LIMIT)
+            .order_by(ranked.c.category, ranked.c.tag_rank)
+        )
+        top_tags: Dict[WellnessCategoryEnum, List[str]] = {}
+        for row in tag_result.fetchall():
+            top_tags.setdefault(row.category, []).append(row.tag)
+
+        trending = await TrendingService(self.db).category_scores(categories)
+        
+        insights = []
+        for category in categories:
+            rollup = by_category.get(category)
+            total_tips = rollup.total_tips if rollup else 0
+            total_views = rollup.total_views if rollup else 0
+            total_likes = rollup.total_likes if rollup else 0
+            insights.append(CategoryInsights(
+                category=category,
+                total_tips=total_tips,
+                total_views=total_views,
+                total_likes=total_likes,
+                avg_engagement=(total_views + total_likes) / total_tips if total_tips else 0.0,
+                top_tags=top_tags.get(category, []),
+                trending_score=trending[category]
+            ))
+        return insights
@@ -0,0 +1,281 @@
+"""
+Item-item collaborative filtering from co-engagement in the activity stream
+"""
+
+import asyncio
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.database import engine
+from ..models.wellness import UserActivity, ActivityTypeEnum
+
+ENGAGEMENT_TYPES = (ActivityTypeEnum.VIEW_CONTENT, ActivityTypeEnum.LIKE_TIP, ActivityTypeEnum.SHARE_TIP)
+LOAD_CHUNK = 5_000
+INGEST_LAG = timedelta(seconds=30)  # activity younger than this may still be in a writer's batch
+
+class CoEngagementModel:
+    """Symmetric tip x tip co-occurrence counts with precomputed top-N neighbours.
+
+    Two tips co-occur when one user engages with both within their last
+    `history_size` distinct tips. Counts live in an array-backed CSR matrix plus
+    a small dict of recent deltas that is merged into it once large enough.
+    Similarity is cosine over users: C[i, j] / sqrt(n_i * n_j).
+
+    Every worker tails user_activities itself, so each sees all activity.
+    """
+
+    def __init__(
+        self,
+        neighbours: int = settings.CO_ENGAGEMENT_NEIGHBOURS,
+        history_size: int = settings.CO_ENGAGEMENT_USER_HISTORY,
+        window_days: int = settings.CO_ENGAGEMENT_WINDOW_DAYS,
+        poll_interval: float = settings.CO_ENGAGEMENT_POLL_SECONDS,
+        compact_after: int = settings.CO_ENGAGEMENT_COMPACT_AFTER
+    ):
+        self.neighbour_count = neighbours
+        self.history_size = history_size
+        self.window_days = window_days
+        self.poll_interval = poll_interval
+        self.compact_after = compact_after
+        self.loaded = False
+        self.watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.compactions = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.item_index: Dict[int, int] = {}
+        self.item_ids: List[int] = []
+        self.item_users = np.zeros(1024, dtype=np.float32)  # distinct users per tip
+        self.histories: Dict[int, deque] = {}
+
+        # Merged co-occurrence counts (CSR over dense item indexes) and pending deltas
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.float32)
+        self.delta: Dict[int, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        self.delta_entries = 0
+
+        # Precomputed neighbours: CSR from the last compaction, overridden per tip since
+        self.top_indptr = np.zeros(1, dtype=np.int64)
+        self.top_items = np.zeros(0, dtype=np.int32)
+        self.top_scores = np.zeros(0, dtype=np.float32)
+        self.top_overrides: Dict[int, List[Tuple[int, float]]] = {}
+
+    def _item(self, tip_id: int) -> int:
+        item = self.item_index.get(tip_id)
+        if item is None:
+            item = len(self.item_ids)
+            self.item_index[tip_id] = item
+            self.item_ids.append(tip_id)
+            if item == len(self.item_users):
+                grown = np.zeros(item * 2, dtype=np.float32)
+                grown[:item] = self.item_users
+                self.item_users = grown
+        return item
+
+    def add_events(self, events: Iterable[Tuple[int, int]]) -> None:
+        """Fold (user_id, tip_id) engagements, oldest first, into the model"""
+
+        dirty = set()
+        for user_id, tip_id in events:
+            item = self._item(tip_id)
+            history = self.histories.get(user_id)
+            if history is None:
+                history = self.histories[user_id] = deque(maxlen=self.history_size)
+            self.events += 1
+            if item in history:
+                continue  # repeat engagement: co-occurrence is counted once per user
+
+            self.item_users[item] += 1
+            for other in history:
+                self.delta[item][other] += 1
+                self.delta[other][item] += 1
+                dirty.add(other)
+            self.delta_entries += 2 * len(history)
+            history.append(item)
+            dirty.add(item)
+
+        if self.delta_entries >= self.compact_after:
+            self.compact()
+        else:
+            for item in dirty:
+                self._refresh_neighbours(item)
+
+    def _row(self, item: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Co-occurrence counts of one item: merged CSR row plus pending deltas"""
+
+        columns, values = [], []
+        if item + 1 < len(self.indptr):
+            start, end = self.indptr[item], self.indptr[item + 1]
+            columns.append(self.indices[start:end])
+            values.append(self.data[start:end])
+        pending = self.delta.get(item)
+        if pending:
+            columns.append(np.fromiter(pending.keys(), dtype=np.int32, count=len(pending)))
+            values.append(np.fromiter(pending.values(), dtype=np.float32, count=len(pending)))
+        if not columns:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        columns, values = np.concatenate(columns), np.concatenate(values)
+        if len(columns) > 1 and pending:
+            columns, inverse = np.unique(columns, return_inverse=True)
+            values = np.bincount(inverse, weights=values).astype(np.float32)
+        return columns, values
+
+    def _refresh_neighbours(self, item: int) -> None:
+        columns, values = self._row(item)
+        if not len(columns):
+            return
+        scores = values / np.sqrt(self.item_users[item] * self.item_users[columns])
+        k = min(self.neighbour_count, len(columns))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        self.top_overrides[self.item_ids[item]] = [
+            (self.item_ids[columns[c]], float(scores[c])) for c in top
+        ]
+
+    def compact(self) -> None:
+        """Merge pending deltas into the CSR matrix and recompute every tip's neighbours"""
+
+        n = len(self.item_ids)
+        rows = [np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr))]
+        columns = [self.indices.astype(np.int64)]
+        values = [self.data]
+        for row, pending in self.delta.items():
+            rows.append(np.full(len(pending), row, dtype=np.int64))
+            columns.append(np.fromiter(pending.keys(), dtype=np.int64, count=len(pending)))
+            values.append(np.fromiter(pending.values(), dtype=np.float32, count=len(pending)))
+        rows, columns, values = np.concatenate(rows), np.concatenate(columns), np.concatenate(values)
+
+        # Sum duplicate (row, column) entries
+        keys = rows * max(n, 1) + columns
+        keys, inverse = np.unique(keys, return_inverse=True)
+        values = np.bincount(inverse, weights=values).astype(np.float32)
+        rows, columns = keys // max(n, 1), (keys % max(n, 1)).astype(np.int32)
+
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n))))
+        self.indices, self.data = columns, values
+        self.delta = defaultdict(lambda: defaultdict(float))
+        self.delta_entries = 0
+
+        # Top-N per row in one pass: order by (row, -score) and keep each row's first N
+        scores = values / np.sqrt(self.item_users[rows] * self.item_users[columns])
+        order = np.lexsort((-scores, rows))
+        rank = np.arange(len(order)) - self.indptr[rows[order]]
+        keep = order[rank < self.neighbour_count]
+        self.top_items = columns[keep]
+        self.top_scores = scores[keep].astype(np.float32)
+        self.top_indptr = np.concatenate(([0], np.cumsum(np.bincount(rows[keep], minlength=n))))
+        self.top_overrides = {}
+        self.compactions += 1
+
+    def neighbours(self, tip_id: int, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(tip_id, similarity) of tips most co-engaged with a tip, best first"""
+
+        found = self.top_overrides.get(tip_id)
+        if found is None:
+            item = self.item_index.get(tip_id)
+            if item is None or item + 1 >= len(self.top_indptr):
+                return []
+            start, end = self.top_indptr[item], self.top_indptr[item + 1]
+            found = [
+                (self.item_ids[other], float(score))
+                for other, score in zip(self.top_items[start:end], self.top_scores[start:end])
+            ]
+        return found[:limit] if limit else found
+
+    def recommend_for_user(
+        self,
+        user_id: int,
+        limit: int = 6,
+        exclude: Sequence[int] = ()
+    ) -> List[Tuple[int, float]]:
+        """Tips co-engaged with the user's recent tips that the user has not engaged with"""
+
+        history = self.histories.get(user_id)
+        if not history:
+            return []
+        seen = {self.item_ids[item] for item in history} | set(exclude)
+        scores: Dict[int, float] = defaultdict(float)
+        for item in history:
+            for tip_id, score in self.neighbours(self.item_ids[item]):
+                if tip_id not in seen:
+                    scores[tip_id] += score
+        return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)[:limit]
+
+    async def _fetch(self, since: datetime, until: datetime) -> None:
+        """Read engagement in [since, until) and fold it in, chunk by chunk"""
+
+        async with engine.connect() as conn:
+            result = await conn.stream(
+                select(UserActivity.user_id, UserActivity.content_id, UserActivity.created_at)
+                .where(
+                    UserActivity.created_at >= since,
+                    UserActivity.created_at < until,
+                    UserActivity.activity_type.in_(ENGAGEMENT_TYPES)
+                )
+                .order_by(UserActivity.created_at, UserActivity.id)
+            )
+            async for rows in result.partitions(LOAD_CHUNK):
+                self.add_events(
+                    (row.user_id, int(row.content_id))
+                    for row in rows
+                    if row.content_id and row.content_id.isdigit()
+                )
+                await asyncio.sleep(0)  # let requests run during a large initial load
+
+    async def catch_up(self) -> None:
+        """Fold in activity recorded since the last read (the first call loads the window)"""
+
+        until = datetime.now(timezone.utc) - INGEST_LAG
+        since = self.watermark or until - timedelta(days=self.window_days)
+        if until <= since:
+            return
+        await self._fetch(since, until)
+        self.watermark = until
+        if not self.loaded:
+            self.compact()
+            self.loaded = True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.catch_up()
+            except Exception as e:
+                print(f"Co-engagement update error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Load the activity window in the background, then keep tailing new activity"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop tailing activity"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Model size and update counters"""
+        return {
+            "loaded": self.loaded,
+            "tips": len(self.item_ids),
+            "users": len(self.histories),
+            "pairs": int(len(self.indices)) + self.delta_entries,
+            "events": self.events,
+            "compactions": self.compactions
+        }
+
+co_engagement = CoEngagementModel()
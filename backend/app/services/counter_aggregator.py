@@ -0,0 +1,200 @@
+"""
+Write-behind aggregation of tip engagement counters
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update, bindparam, func
+
+from ..core.config import settings
+from ..core.database import engine
+from ..models.wellness import WellnessTip, WellnessCategoryEnum
+from .category_rollups import CategoryRollupService, invalidate_insights
+from .tip_catalog import tip_catalog
+from .tip_list_cache import tip_list_cache
+from .entity_cache import entity_cache
+
+COUNTER_FIELDS = ("views_count", "likes_count", "shares_count")
+
+class CounterAggregator:
+    """Collects per-tip counter deltas in memory and flushes them as batched atomic UPDATEs.
+
+    With transactional engagement writes the request commits the tip counter and
+    its category rollup delta together, so nothing durable waits in memory; the
+    aggregator then only coalesces the cache invalidation that follows into the
+    same periodic flush.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = settings.COUNTER_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = settings.COUNTER_FLUSH_MAX_PENDING
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._in_flight: Dict[int, Dict[str, int]] = {}
+        self._committed: Dict[int, WellnessCategoryEnum] = {}  # tip -> category, awaiting cache invalidation
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, tip_id: int, field: str, amount: int = 1) -> None:
+        """Record a counter delta for a tip"""
+
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter field: {field}")
+
+        deltas = self._pending.setdefault(tip_id, {})
+        deltas[field] = deltas.get(field, 0) + amount
+
+        # Flush early once enough distinct tips are buffered
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def record_committed(self, tip_id: int, category: WellnessCategoryEnum, field: str, amount: int = 1) -> None:
+        """Note a counter change a request already committed with its rollup delta (caches follow on the next flush)"""
+
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter field: {field}")
+
+        self._committed[tip_id] = category
+        if field == "likes_count":
+            tip_catalog.add_engagement(tip_id, amount)
+
+        if len(self._committed) >= self.max_pending:
+            self._wakeup.set()
+
+    def pending_deltas(self, tip_id: int) -> Dict[str, int]:
+        """Deltas not yet committed for a tip (read-your-writes overlay)"""
+
+        combined = dict.fromkeys(COUNTER_FIELDS, 0)
+        for source in (self._in_flight, self._pending):
+            for field, amount in source.get(tip_id, {}).items():
+                combined[field] += amount
+        return combined
+
+    def discard(self, tip_id: int) -> None:
+        """Drop buffered deltas for a tip that no longer exists"""
+        self._pending.pop(tip_id, None)
+        self._committed.pop(tip_id, None)
+
+    async def flush(self) -> int:
+        """Write all buffered deltas in one executemany UPDATE, returns number of tips flushed"""
+
+        async with self._flush_lock:
+            committed, self._committed = self._committed, {}
+            if not self._pending and not committed:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            self._in_flight = batch
+
+            table = WellnessTip.__table__
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("tip_id"))
+                .values({
+                    field: func.coalesce(table.c[field], 0) + bindparam(f"delta_{field}")
+                    for field in COUNTER_FIELDS
+                })
+            )
+            params = [
+                {
+                    "tip_id": tip_id,
+                    **{f"delta_{field}": deltas.get(field, 0) for field in COUNTER_FIELDS}
+                }
+                for tip_id, deltas in batch.items()
+            ]
+
+            try:
+                categories = set(committed.values())
+                if batch:
+                    async with engine.begin() as conn:
+                        await conn.execute(stmt, params)
+                        categories.update(await self._apply_to_rollups(conn, batch))
+            except Exception:
+                # Put the batches back so the next flush retries them
+                for tip_id, deltas in batch.items():
+                    for field, amount in deltas.items():
+                        self.add(tip_id, field, amount)
+                for tip_id, category in committed.items():
+                    self._committed.setdefault(tip_id, category)
+                raise
+            finally:
+                self._in_flight = {}
+
+            for tip_id, deltas in batch.items():
+                tip_catalog.add_engagement(tip_id, deltas.get("likes_count", 0))
+            tip_list_cache.bump(*categories)
+            await invalidate_insights(*categories)
+            await entity_cache.invalidate_tips({*batch, *committed})
+
+            return len(batch) + len(committed)
+
+    @staticmethod
+    async def _apply_to_rollups(conn, batch: Dict[int, Dict[str, int]]) -> List[WellnessCategoryEnum]:
+        """Fold a flushed batch into the per-category rollups in the same transaction,
+        returns the categories touched"""
+
+        per_category: Dict[WellnessCategoryEnum, Dict[str, int]] = {}
+
+        def fold(category: WellnessCategoryEnum, deltas: Dict[str, int]) -> None:
+            totals = per_category.setdefault(category, dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, amount in deltas.items():
+                totals[field] += amount
+
+        result = await conn.execute(
+            select(WellnessTip.id, WellnessTip.category).where(WellnessTip.id.in_(list(batch)))
+        )
+        for tip_id, category in result.fetchall():
+            fold(category, batch[tip_id])
+
+        rollups = CategoryRollupService(conn)
+        for category, totals in per_category.items():
+            await rollups.apply_deltas(
+                category,
+                views=totals["views_count"],
+                likes=totals["likes_count"],
+                shares=totals["shares_count"]
+            )
+        return list(per_category)
+
+    async def _run(self) -> None:
+        """Background flush loop"""
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                # Shielded so a shutdown cancel never abandons a batch mid-write
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Counter flush error: {e}")
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write out whatever is still buffered"""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+counter_aggregator = CounterAggregator()
@@ -0,0 +1,83 @@
+"""
+Read-through cache of tip rows and tip authors with single-flight loading
+"""
+
+import enum
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.database import engine
+from ..core.tiered_cache import TieredCache, cache_bus
+from ..models.user import User
+from ..models.wellness import WellnessTip
+
+# Public columns shown next to a tip; nothing else of a user row reaches the shared L2
+AUTHOR_COLUMNS = [User.__table__.c.id, User.__table__.c.username, User.__table__.c.full_name]
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+class EntityCache:
+    """JSON snapshots of WellnessTip rows and of their authors' public columns, keyed by id.
+
+    A miss loads the row on its own connection through a per-key single-flight,
+    so any number of concurrent requests for one tip cost one query. Snapshots
+    are plain dicts shared between callers and must be treated as read-only;
+    datetimes are ISO strings and enums their values, the same in L1 and L2.
+
+    Both namespaces are two-tier caches (L1 in this process, L2 in Redis), so a
+    row loaded by one worker is served to the others, and writers' invalidations
+    reach every worker's L1. A load that overlapped an invalidation is returned
+    to its callers but not stored, so a pre-write read never repopulates it.
+    """
+
+    def __init__(self, ttl: float = settings.ENTITY_CACHE_TTL_SECONDS):
+        # JSON, never pickle: anything read back from a shared L2 must be safe to decode
+        self._tips = TieredCache("tips", ttl, cache_bus, max_entries=settings.ENTITY_CACHE_MAX_ENTRIES)
+        self._authors = TieredCache("authors", ttl, cache_bus, max_entries=settings.ENTITY_CACHE_MAX_ENTRIES)
+
+    @staticmethod
+    async def _load(columns, id_column, entity_id: int) -> Optional[Dict[str, Any]]:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(*columns).where(id_column == entity_id))
+            row = result.first()
+        return {name: _json_value(value) for name, value in row._mapping.items()} if row is not None else None
+
+    async def get_tip(self, tip_id: int) -> Optional[Dict[str, Any]]:
+        """A tip's columns, or None if it does not exist"""
+        table = WellnessTip.__table__
+        return await self._tips.get_or_load(tip_id, lambda: self._load(table.c, table.c.id, tip_id))
+
+    async def get_author(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """A user's public author columns (id, username, full_name), or None if they do not exist"""
+        return await self._authors.get_or_load(
+            user_id, lambda: self._load(AUTHOR_COLUMNS, User.__table__.c.id, user_id)
+        )
+
+    async def invalidate_tips(self, tip_ids: Iterable[int]) -> None:
+        """Drop cached tips after they were written"""
+        await self._tips.invalidate(*tip_ids)
+
+    async def invalidate_tip(self, tip_id: int) -> None:
+        """Drop a cached tip after it was written"""
+        await self._tips.invalidate(tip_id)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop a cached author after the user was written"""
+        await self._authors.invalidate(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-entity tier hit counters and single-flight load counters"""
+        return {
+            "tips": self._tips.stats(),
+            "authors": self._authors.stats()
+        }
+
+entity_cache = EntityCache()
@@ -0,0 +1,104 @@
+"""
+Per-user recommendation cache with activity-driven invalidation
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.wellness import WellnessCategoryEnum
+
+CacheKey = Tuple[int, Optional[str], int]
+
+class RecommendationCache:
+    """LRU/TTL cache of recommendation lists keyed by (user_id, category, limit)"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.RECOMMENDATION_CACHE_MAX_ENTRIES,
+        ttl: float = settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+        activity_threshold: int = settings.RECOMMENDATION_CACHE_ACTIVITY_THRESHOLD
+    ):
+        self.activity_threshold = activity_threshold
+        self._cache = TTLCache(max_entries, ttl, on_evict=self._forget_key)
+        self._keys_by_user: Dict[int, Set[CacheKey]] = {}
+        # Activity categories each cached user had when their entries were computed
+        self._patterns: Dict[int, Set[str]] = {}
+        self._new_activity: Dict[int, int] = {}
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id: int, category: Optional[WellnessCategoryEnum], limit: int) -> CacheKey:
+        return (user_id, category.value if category else None, limit)
+
+    def get(
+        self,
+        user_id: int,
+        category: Optional[WellnessCategoryEnum],
+        limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Cached recommendations, or None on a miss"""
+        return self._cache.get(self._key(user_id, category, limit))
+
+    def set(
+        self,
+        user_id: int,
+        category: Optional[WellnessCategoryEnum],
+        limit: int,
+        recommendations: List[Dict[str, Any]],
+        activity_patterns: Dict[Any, int]
+    ) -> None:
+        """Store recommendations along with the activity pattern they were based on"""
+
+        key = self._key(user_id, category, limit)
+        self._cache.set(key, recommendations)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        self._patterns[user_id] = {
+            getattr(name, "value", name) for name in activity_patterns if name is not None
+        }
+        self._new_activity.setdefault(user_id, 0)
+
+    def record_activity(self, user_id: int, category: Optional[WellnessCategoryEnum]) -> None:
+        """Invalidate a user's entries once new activity shifts their category mix"""
+
+        if user_id not in self._keys_by_user or category is None:
+            return
+
+        category_name = getattr(category, "value", category)
+        self._new_activity[user_id] = self._new_activity.get(user_id, 0) + 1
+
+        # A first visit to a category changes the profile outright; otherwise wait for enough volume
+        if (
+            category_name not in self._patterns.get(user_id, set())
+            or self._new_activity[user_id] >= self.activity_threshold
+        ):
+            self.invalidate_user(user_id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached entry for a user (e.g. after their interests change)"""
+
+        keys = self._keys_by_user.get(user_id)
+        if not keys:
+            return
+        for key in list(keys):
+            self._cache.delete(key)
+        self.invalidations += 1
+
+    def _forget_key(self, key: CacheKey, _value: Any) -> None:
+        """Keep the per-user index in step with evictions and expiry"""
+
+        user_id = key[0]
+        keys = self._keys_by_user.get(user_id)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[user_id]
+            self._patterns.pop(user_id, None)
+            self._new_activity.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters"""
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+recommendation_cache = RecommendationCache()
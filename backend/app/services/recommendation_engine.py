@@ -2,84 +2,241 @@
 Advanced AI-powered recommendation engine for wellness content
 """
 
-import openai
-from typing import List, Dict, Any, Optional
+import asyncio
+import importlib
+import hashlib
+from typing import List, Dict, Any, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy import select, Row
 import json
+from itertools import zip_longest
 
 from ..core.config import settings
-from ..models.wellness import WellnessTip, UserActivity, WellnessCategoryEnum
-from ..models.user import User
+from ..core.database import ReadSessionLocal
+from ..core.tiered_cache import TieredCache, cache_bus
+from ..models.wellness import WellnessTip, WellnessCategoryEnum
 from ..schemas.wellness import CategoryInsights
+from .recommendation_cache import recommendation_cache
+from .category_rollups import ALL_CATEGORIES_KEY, CategoryRollupService, insights_cache
+from .behavior_profiles import BehaviorProfileService
+from .tip_catalog import tip_catalog
+from .co_engagement import co_engagement
+
+# Outcomes of the race between the AI and algorithmic recommendations
+RECOMMENDATION_OUTCOMES = ("ai", "fallback", "timeout")
+
+# Tip columns behind a recommendation entry (the stored excerpt instead of the full content)
+RECOMMENDATION_TIP_COLUMNS = (
+    WellnessTip.id,
+    WellnessTip.title,
+    WellnessTip.excerpt,
+    WellnessTip.category,
+    WellnessTip.tags,
+    WellnessTip.difficulty_level
+)
 
 class RecommendationEngine:
     """Enterprise-grade recommendation system with AI and analytics"""
     
     def __init__(self):
+        # Created on the first AI call; importing the OpenAI SDK costs more than the rest of startup
         self.client = None
-        if settings.OPENAI_API_KEY:
-            self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.http_client = None
+        self._client_lock = asyncio.Lock()
+        self._preload_task: Optional[asyncio.Task] = None
+        
+        # Identical prompts share one in-flight call and one cached response, across workers
+        self.response_cache = TieredCache(
+            "llm",
+            settings.LLM_RESPONSE_CACHE_TTL_SECONDS,
+            cache_bus,
+            max_entries=settings.LLM_RESPONSE_CACHE_MAX_ENTRIES
+        )
+        self.insights_cache = insights_cache
+        
+        # AI calls that missed their deadline, still running to fill the recommendation cache
+        self._late_ai_tasks: Set[asyncio.Task] = set()
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+        self.late_ai_results = 0
+        self.ai_errors = 0
+    
+    async def _get_client(self):
+        """OpenAI client, importing the SDK off the event loop the first time it is needed"""
+        
+        if self.client is None:
+            async with self._client_lock:
+                if self.client is None:
+                    openai = await asyncio.to_thread(importlib.import_module, "openai")
+                    import httpx  # already loaded by the SDK
+                    
+                    # One pooled HTTP client for the process; the engine is shared via app.state
+                    self.http_client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+                        ),
+                        timeout=settings.OPENAI_TIMEOUT_SECONDS
+                    )
+                    self.client = openai.AsyncOpenAI(
+                        api_key=settings.OPENAI_API_KEY,
+                        http_client=self.http_client
+                    )
+        return self.client
+    
+    def start(self) -> None:
+        """Create the OpenAI client in the background once the worker is serving"""
+        if settings.OPENAI_API_KEY and self._preload_task is None:
+            self._preload_task = asyncio.create_task(self._get_client())
+    
+    async def aclose(self) -> None:
+        """Abandon late AI calls and release pooled HTTP connections"""
+        for task in list(self._late_ai_tasks):
+            task.cancel()
+        await asyncio.gather(*self._late_ai_tasks, return_exceptions=True)
+        if self._preload_task is not None:
+            try:
+                await self._preload_task
+            except Exception as e:
+                print(f"OpenAI client preload error: {e}")
+        if self.http_client is not None:
+            await self.http_client.aclose()
+    
+    def llm_stats(self) -> Dict[str, Any]:
+        """Response cache counters (including its single-flight loads) and per-endpoint race outcomes"""
+        return {
+            "response_cache": self.response_cache.stats(),
+            "recommendation_outcomes": self.outcomes,
+            "late_ai_results": self.late_ai_results,
+            "late_ai_pending": len(self._late_ai_tasks),
+            "ai_errors": self.ai_errors
+        }
+    
+    def _record_outcome(self, endpoint: str, outcome: str) -> None:
+        counts = self.outcomes.setdefault(endpoint, dict.fromkeys(RECOMMENDATION_OUTCOMES, 0))
+        counts[outcome] += 1
     
     async def get_personalized_recommendations(
         self,
         db: AsyncSession,
         user_id: int,
         category: Optional[WellnessCategoryEnum] = None,
-        limit: int = 6
+        limit: int = 6,
+        endpoint: str = "recommendations"
     ) -> List[Dict[str, Any]]:
         """Generate personalized recommendations using AI and user behavior analysis"""
         
+        cached = recommendation_cache.get(user_id, category, limit)
+        if cached is not None:
+            return cached
+        
         # Analyze user behavior patterns
         user_profile = await self._analyze_user_behavior(db, user_id)
         
         # Get content recommendations
-        if self.client and settings.OPENAI_API_KEY:
-            recommendations = await self._generate_ai_recommendations(
-                user_profile, category, limit
+        if settings.OPENAI_API_KEY:
+            recommendations, final = await self._race_recommendations(
+                user_id, user_profile, category, limit, endpoint
             )
         else:
-            recommendations = await self._generate_algorithmic_recommendations(
-                db, user_profile, category, limit
+            recommendations, final = await self._generate_algorithmic_recommendations(
+                db, user_profile, category, limit, user_id
+            ), True
+        
+        # A stand-in served while the AI call finishes is not cached; the AI result will be
+        if final:
+            recommendation_cache.set(
+                user_id, category, limit, recommendations, user_profile["activity_patterns"]
             )
         
         return recommendations
     
-    async def _analyze_user_behavior(
-        self, 
-        db: AsyncSession, 
-        user_id: int
-    ) -> Dict[str, Any]:
-        """Analyze user behavior patterns for personalization"""
+    async def _race_recommendations(
+        self,
+        user_id: int,
+        user_profile: Dict[str, Any],
+        category: Optional[WellnessCategoryEnum],
+        limit: int,
+        endpoint: str
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Best recommendations available within RECOMMENDATION_DEADLINE_SECONDS.
         
-        # Get user preferences
-        user_query = select(User).where(User.id == user_id)
-        user_result = await db.execute(user_query)
-        user = user_result.scalar_one_or_none()
+        The AI call and the algorithmic ranking start together. The AI result is
+        served if it arrives by the deadline; otherwise the algorithmic one is,
+        and the AI call keeps running to populate the cache for the next request
+        (identical prompts from other requests join that same call). If neither
+        is ready in time the static picks are served. Returns the
+        recommendations and whether they are final, i.e. worth caching.
+        """
         
-        if not user:
-            return {"interests": [], "experience_level": "beginner", "activity_patterns": {}}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.RECOMMENDATION_DEADLINE_SECONDS
+        ai = asyncio.create_task(self._generate_ai_recommendations(user_profile, category, limit))
+        algorithmic = asyncio.create_task(
+            self._generate_algorithmic_recommendations_in_session(user_profile, category, limit, user_id)
+        )
         
-        # Analyze recent activity (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        activity_query = select(
-            UserActivity.category,
-            func.count(UserActivity.id).label('count')
-        ).where(
-            UserActivity.user_id == user_id,
-            UserActivity.created_at >= thirty_days_ago
-        ).group_by(UserActivity.category)
+        ai_pending = True
+        try:
+            await asyncio.wait({ai}, timeout=max(deadline - loop.time(), 0))
+            ai_pending = not ai.done()
+            if not ai_pending and ai.exception() is None:
+                self._record_outcome(endpoint, "ai")
+                return ai.result(), True
+            if not ai_pending:
+                print(f"AI recommendation error: {ai.exception()}")
+                self.ai_errors += 1
+            
+            await asyncio.wait({algorithmic}, timeout=max(deadline - loop.time(), 0))
+            if algorithmic.done() and algorithmic.exception() is not None:
+                print(f"Algorithmic recommendation error: {algorithmic.exception()}")
+                self._record_outcome(endpoint, "fallback")
+                return await self._generate_fallback_recommendations(user_profile, category, limit), False
+            if algorithmic.done():
+                self._record_outcome(endpoint, "fallback")
+                # Final only when no AI result is coming
+                return algorithmic.result(), not ai_pending
+
+            self._record_outcome(endpoint, "timeout")
+            return await self._generate_fallback_recommendations(user_profile, category, limit), False
+        finally:
+            if ai_pending:
+                self._finish_late(ai, user_id, category, limit, user_profile["activity_patterns"])
+            algorithmic.cancel()
+            algorithmic.add_done_callback(lambda task: task.cancelled() or task.exception())
+    
+    def _finish_late(
+        self,
+        ai: asyncio.Task,
+        user_id: int,
+        category: Optional[WellnessCategoryEnum],
+        limit: int,
+        activity_patterns: Dict[Any, int]
+    ) -> None:
+        """Let an AI call that missed its deadline finish and cache its result for the user"""
         
-        activity_result = await db.execute(activity_query)
-        activity_patterns = {row.category: row.count for row in activity_result.fetchall()}
+        async def finish() -> None:
+            try:
+                recommendations = await ai
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"AI recommendation error: {e}")
+                self.ai_errors += 1
+                return
+            recommendation_cache.set(user_id, category, limit, recommendations, activity_patterns)
+            self.late_ai_results += 1
         
-        return {
-            "interests": user.interests or [],
-            "wellness_goals": user.wellness_goals or [],
-            "experience_level": user.experience_level,
-            "activity_patterns": activity_patterns
-        }
+        task = asyncio.create_task(finish())
+        self._late_ai_tasks.add(task)
+        task.add_done_callback(self._late_ai_tasks.discard)
+    
+    async def _analyze_user_behavior(
+        self, 
+        db: AsyncSession, 
+        user_id: int
+    ) -> Dict[str, Any]:
+        """Analyze user behavior patterns for personalization (one read of the rolling profile)"""
+        return await BehaviorProfileService(db).get_profile(user_id)
     
     async def _generate_ai_recommendations(
         self,
@@ -87,34 +244,46 @@ class RecommendationEngine:
         category: Optional[WellnessCategoryEnum] = None,
         limit: int = 6
     ) -> List[Dict[str, Any]]:
-        """Generate recommendations using OpenAI"""
+        """Generate recommendations using OpenAI (errors propagate; the caller falls back)"""
         
         prompt = self._build_recommendation_prompt(user_profile, category, limit)
+        messages = [
+            {
+                "role": "system",
+                "content": "You are an expert wellness content curator. Generate personalized wellness recommendations based on user behavior and preferences. Respond only with valid JSON."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
         
-        try:
-            response = await self.client.chat.completions.create(
+        content = await self._complete_json(messages)
+        result = json.loads(content)
+        return result.get("recommendations", [])
+    
+    async def _complete_json(self, messages: List[Dict[str, str]]) -> str:
+        """Run a JSON chat completion, deduplicated by a hash of the full request"""
+        
+        request_key = hashlib.sha256(json.dumps({
+            "model": settings.AI_MODEL,
+            "messages": messages,
+            "max_tokens": settings.MAX_TOKENS,
+            "temperature": settings.TEMPERATURE
+        }, sort_keys=True).encode()).hexdigest()
+        
+        async def create() -> str:
+            client = await self._get_client()
+            response = await client.chat.completions.create(
                 model=settings.AI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert wellness content curator. Generate personalized wellness recommendations based on user behavior and preferences. Respond only with valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=messages,
                 response_format={"type": "json_object"},
                 max_tokens=settings.MAX_TOKENS,
                 temperature=settings.TEMPERATURE
             )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result.get("recommendations", [])
-            
-        except Exception as e:
-            print(f"AI recommendation error: {e}")
-            return await self._generate_fallback_recommendations(user_profile, category, limit)
+            return response.choices[0].message.content
+        
+        return await self.response_cache.get_or_load(request_key, create)
     
     def _build_recommendation_prompt(
         self,
@@ -124,11 +293,12 @@ class RecommendationEngine:
     ) -> str:
         """Build AI prompt for recommendations"""
         
-        interests = ", ".join(user_profile.get("interests", []))
-        goals = ", ".join(user_profile.get("wellness_goals", []))
+        # Sorted so users with the same profile produce byte-identical prompts
+        interests = ", ".join(sorted(user_profile.get("interests", [])))
+        goals = ", ".join(sorted(user_profile.get("wellness_goals", [])))
         experience = user_profile.get("experience_level", "beginner")
         
-        category_filter = f"Focus specifically on {category} category." if category else ""
+        category_filter = f"Focus specifically on {category.value} category." if category else ""
         
         return f"""
         Generate {limit} personalized wellness content recommendations for a user with:
@@ -168,38 +338,89 @@ class RecommendationEngine:
         db: AsyncSession,
         user_profile: Dict[str, Any],
         category: Optional[WellnessCategoryEnum] = None,
-        limit: int = 6
+        limit: int = 6,
+        user_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Generate recommendations using algorithmic approach"""
+        """Blend content scores from the in-memory catalog with co-engagement candidates"""
         
-        # Get popular content based on engagement
-        query = select(WellnessTip).order_by(
-            (WellnessTip.likes_count + WellnessTip.views_count).desc()
-        )
+        await tip_catalog.ensure_loaded()
+        ranked = tip_catalog.top_k(user_profile, category, limit)
         
-        if category:
-            query = query.where(WellnessTip.category == category)
-        
-        query = query.limit(limit)
-        result = await db.execute(query)
-        tips = result.scalars().all()
-        
-        recommendations = []
-        for tip in tips:
-            recommendations.append({
-                "id": f"tip_{tip.id}",
-                "title": tip.title,
-                "description": tip.content[:200] + "..." if len(tip.content) > 200 else tip.content,
-                "category": tip.category,
-                "type": "tip",
-                "relevance_score": min(0.9, (tip.likes_count + tip.views_count) / 100),
-                "tags": tip.tags or [],
-                "difficulty": tip.difficulty_level,
-                "source": "Community"
-            })
+        # Tips co-engaged with the user's recent tips; over-fetched since the category is checked after loading
+        collaborative = []
+        if user_id is not None:
+            collaborative = co_engagement.recommend_for_user(user_id, limit * 2 if category else limit)
+        
+        tips_by_id = await self._load_tips(db, [tip_id for tip_id, _ in ranked + collaborative])
+        
+        content_recommendations = [
+            self._tip_recommendation(tips_by_id[tip_id], score, "Community")
+            for tip_id, score in ranked
+            if tip_id in tips_by_id
+        ]
+        collaborative_recommendations = [
+            self._tip_recommendation(tips_by_id[tip_id], score, "Members also liked")
+            for tip_id, score in collaborative
+            if tip_id in tips_by_id and (category is None or tips_by_id[tip_id].category == category)
+        ]
+        
+        # Alternate the two sources, best content match first, without repeating a tip
+        recommendations, seen = [], set()
+        for pair in zip_longest(content_recommendations, collaborative_recommendations):
+            for recommendation in pair:
+                if recommendation and recommendation["id"] not in seen and len(recommendations) < limit:
+                    seen.add(recommendation["id"])
+                    recommendations.append(recommendation)
         
         return recommendations
     
+    async def _generate_algorithmic_recommendations_in_session(
+        self,
+        user_profile: Dict[str, Any],
+        category: Optional[WellnessCategoryEnum],
+        limit: int,
+        user_id: int
+    ) -> List[Dict[str, Any]]:
+        """Algorithmic recommendations on a session of their own, so the race can abandon them"""
+        async with ReadSessionLocal() as session:
+            return await self._generate_algorithmic_recommendations(
+                session, user_profile, category, limit, user_id
+            )
+    
+    async def get_also_liked(self, db: AsyncSession, tip_id: int, limit: int = 6) -> List[Dict[str, Any]]:
+        """Tips most often engaged with by the same members as the given tip"""
+        
+        neighbours = co_engagement.neighbours(tip_id, limit)
+        tips_by_id = await self._load_tips(db, [neighbour_id for neighbour_id, _ in neighbours])
+        return [
+            self._tip_recommendation(tips_by_id[neighbour_id], score, "Members also liked")
+            for neighbour_id, score in neighbours
+            if neighbour_id in tips_by_id
+        ]
+    
+    async def _load_tips(self, db: AsyncSession, tip_ids: List[int]) -> Dict[int, Row]:
+        """Load the columns a recommendation needs for the candidate tips, keyed by id"""
+        if not tip_ids:
+            return {}
+        result = await db.execute(
+            select(*RECOMMENDATION_TIP_COLUMNS).where(WellnessTip.id.in_(set(tip_ids)))
+        )
+        return {tip.id: tip for tip in result.all()}
+    
+    def _tip_recommendation(self, tip: Row, score: float, source: str) -> Dict[str, Any]:
+        """Recommendation entry for a stored tip"""
+        return {
+            "id": f"tip_{tip.id}",
+            "title": tip.title,
+            "description": tip.excerpt or "",
+            "category": tip.category,
+            "type": "tip",
+            "relevance_score": round(score, 4),
+            "tags": tip.tags or [],
+            "difficulty": tip.difficulty_level,
+            "source": source
+        }
+    
     async def _generate_fallback_recommendations(
         self,
         user_profile: Dict[str, Any],
@@ -284,30 +505,25 @@ class RecommendationEngine:
         db: AsyncSession, 
         category: WellnessCategoryEnum
     ) -> CategoryInsights:
-        """Generate analytics insights for a wellness category"""
+        """Analytics insights for a wellness category, read from the maintained rollups (briefly cached).
         
-        # Get category statistics
-        tips_query = select(func.count(WellnessTip.id)).where(
-            WellnessTip.category == category
-        )
-        tips_count = await db.scalar(tips_query)
-        
-        # Get engagement metrics
-        engagement_query = select(
-            func.sum(WellnessTip.views_count).label('total_views'),
-            func.sum(WellnessTip.likes_count).label('total_likes'),
-            func.avg(WellnessTip.likes_count + WellnessTip.views_count).label('avg_engagement')
-        ).where(WellnessTip.category == category)
-        
-        engagement_result = await db.execute(engagement_query)
-        engagement_data = engagement_result.fetchone()
-        
-        return CategoryInsights(
-            category=category,
-            total_tips=tips_count or 0,
-            total_views=engagement_data.total_views or 0,
-            total_likes=engagement_data.total_likes or 0,
-            avg_engagement=float(engagement_data.avg_engagement or 0),
-            top_tags=["wellness", "health", "tips"],  # Could be computed from actual data
-            trending_score=0.8
-        )
\ No newline at end of file
+        The load runs on its own read session rather than `db`, since other
+        requests missing the same key share it and may outlive the caller.
+        """
+        
+        async def load() -> Dict[str, Any]:
+            async with ReadSessionLocal() as session:
+                insights = await CategoryRollupService(session).get_insights(category)
+            return insights.model_dump(mode="json")
+        
+        return CategoryInsights(**await self.insights_cache.get_or_load(category.value, load))
+    
+    async def get_all_category_insights(self, db: AsyncSession) -> List[CategoryInsights]:
+        """Analytics insights for every category in one read (briefly cached)"""
+        
+        async def load() -> List[Dict[str, Any]]:
+            async with ReadSessionLocal() as session:
+                insights = await CategoryRollupService(session).get_all_insights()
+            return [item.model_dump(mode="json") for item in insights]
+        
+        return [CategoryInsights(**item) for item in await self.insights_cache.get_or_load(ALL_CATEGORIES_KEY, load)]
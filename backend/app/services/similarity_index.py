@@ -0,0 +1,485 @@
+"""
+In-memory similar-tips index over hashed TF-IDF vectors
+"""
+
+import asyncio
+import math
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, func
+
+from ..core.config import settings
+from ..core.database import engine
+from ..models.wellness import WellnessTip
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "you your our can do does into more most not than then them they their".split()
+)
+
+# Term weights by field: tags and titles say more about a tip than body text
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+TAG_WEIGHT = 3.0
+
+CATCH_UP_SLACK = timedelta(minutes=1)
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+class TipSimilarityIndex:
+    """Hashed TF-IDF tip vectors, each reduced to its heaviest terms.
+
+    Terms are hashed with crc32 (stable across processes, unlike hash()) into a
+    fixed number of signed buckets. A tip keeps its `top_terms` strongest
+    buckets, L2-normalized, as two fixed-width rows (bucket, weight), so the
+    index costs a few hundred bytes per tip instead of a dense row. Rows are
+    transposed into per-bucket postings for scoring, like the tip catalog's
+    tags; rows written since are scored directly until the postings are
+    rebuilt. Document frequencies count each tip's stored buckets and a
+    vector is weighted with the IDF current when it was (re)indexed.
+
+    Every worker catches up from the database every SIMILAR_TIPS_REFRESH_SECONDS,
+    so tips written through other workers show up there too. One process (the
+    one holding the index file's lock) saves the index, stamped with the time
+    of its last catch-up, and a restart catches up from that stamp.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = settings.SIMILAR_TIPS_DIMENSIONS,
+        top_terms: int = settings.SIMILAR_TIPS_TOP_TERMS,
+        path: str = settings.SIMILAR_TIPS_INDEX_PATH,
+        refresh_interval: float = settings.SIMILAR_TIPS_REFRESH_SECONDS,
+        save_interval: float = settings.SIMILAR_TIPS_SAVE_INTERVAL_SECONDS
+    ):
+        if not 0 < dimensions <= 1 << 16:
+            raise ValueError(f"Similar tips dimensions must be between 1 and 65536, got {dimensions}")
+        self.dimensions = dimensions
+        self.top_terms = top_terms
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.save_interval = save_interval
+        self.dirty = False
+        self.synced_at: Optional[datetime] = None
+        self._pending: List[Tuple[int, int, asyncio.Future]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lock_file = None
+        self.batches = 0
+        self.queries = 0
+        self._reset(0)
+
+    def _reset(self, capacity: int) -> None:
+        capacity = max(capacity, 1024)
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.term_ids = np.zeros((capacity, self.top_terms), dtype=np.uint16)
+        self.term_weights = np.zeros((capacity, self.top_terms), dtype=np.float32)  # 0 pads unused slots
+        self.document_frequency = np.zeros(self.dimensions, dtype=np.int64)
+        self.documents = 0
+        self.positions: Dict[int, int] = {}
+        self.dead = 0
+        # Per-bucket postings cover rows [0, indexed); later rows are scored from their own terms
+        self.indexed = 0
+        self.posting_ptr = np.zeros(self.dimensions + 1, dtype=np.int64)
+        self.posting_rows = np.zeros(0, dtype=np.int32)
+        self.posting_weights = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _term_weights(self, title: str, content: str, tags: Optional[Sequence[str]]) -> Counter:
+        weights: Counter = Counter()
+        for token in _tokens(title):
+            weights[token] += TITLE_WEIGHT
+        for token in _tokens(content):
+            weights[token] += CONTENT_WEIGHT
+        for tag in tags or []:
+            weights["#" + tag.strip().lower()] += TAG_WEIGHT
+        return weights
+
+    def _hashed_tf(self, title: str, content: str, tags: Optional[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Signed hashed sublinear term frequencies as (buckets, values)"""
+
+        buckets: Dict[int, float] = {}
+        for term, weight in self._term_weights(title, content, tags).items():
+            hashed = zlib.crc32(term.encode())
+            sign = 1.0 if hashed & 0x80000000 else -1.0
+            bucket = hashed % self.dimensions
+            buckets[bucket] = buckets.get(bucket, 0.0) + sign * (1.0 + math.log(weight))
+        return (
+            np.fromiter(buckets.keys(), dtype=np.int64, count=len(buckets)),
+            np.fromiter(buckets.values(), dtype=np.float32, count=len(buckets))
+        )
+
+    def _idf(self, document_frequency: np.ndarray, documents: int) -> np.ndarray:
+        return (np.log((1.0 + documents) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+
+    def _vectorize(self, tf: Tuple[np.ndarray, np.ndarray], idf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Apply IDF weights, keep the heaviest `top_terms` buckets and L2-normalize"""
+
+        buckets, values = tf
+        weights = values * idf[buckets]
+        if len(weights) > self.top_terms:
+            keep = np.argpartition(-np.abs(weights), self.top_terms)[:self.top_terms]
+            buckets, weights = buckets[keep], weights[keep]
+        norm = np.linalg.norm(weights)
+        return buckets, (weights / norm if norm > 0 else weights)
+
+    def _grow(self) -> None:
+        capacity = len(self.ids) * 2
+        for name in ("ids", "alive", "term_ids", "term_weights"):
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+
+    def _append(self, tip_id: int, buckets: np.ndarray, weights: np.ndarray) -> None:
+        if self.size == len(self.ids):
+            self._grow()
+        position = self.size
+        self.term_ids[position, :len(buckets)] = buckets
+        self.term_weights[position, :len(weights)] = weights
+        self.ids[position] = tip_id
+        self.alive[position] = True
+        self.positions[tip_id] = position
+        self.size += 1
+
+    def upsert(self, tip_id: int, title: str, content: str, tags: Optional[Sequence[str]]) -> None:
+        """Index a new tip or re-index an updated one (as a new row)"""
+
+        self.remove(tip_id)
+        buckets, weights = self._vectorize(
+            self._hashed_tf(title, content, tags), self._idf(self.document_frequency, self.documents)
+        )
+        self.document_frequency[buckets] += 1
+        self.documents += 1
+        self._append(tip_id, buckets, weights)
+        self.dirty = True
+
+    def remove(self, tip_id: int) -> None:
+        """Drop a tip; its row is compacted away when the postings are next rebuilt"""
+
+        position = self.positions.pop(tip_id, None)
+        if position is None:
+            return
+        stored = self.term_weights[position] != 0
+        self.document_frequency[self.term_ids[position][stored]] -= 1
+        self.documents -= 1
+        self.term_weights[position] = 0.0
+        self.alive[position] = False
+        self.dead += 1
+        self.dirty = True
+
+    def index_tip(self, tip: WellnessTip) -> None:
+        """Index a tip model after it was created or updated"""
+        self.upsert(tip.id, tip.title, tip.content, tip.tags)
+
+    def _compact(self) -> None:
+        """Drop removed rows"""
+
+        keep = np.flatnonzero(self.alive[:self.size])
+        n = len(keep)
+        for name in ("ids", "alive", "term_ids", "term_weights"):
+            array = getattr(self, name)
+            array[:n] = array[keep]
+            array[n:self.size] = 0
+        self.size = n
+        self.dead = 0
+        self.positions = {int(tip_id): position for position, tip_id in enumerate(self.ids[:n])}
+
+    def _build_postings(self) -> None:
+        """Compact, then transpose the rows' (bucket, weight) terms into per-bucket postings"""
+
+        if self.dead:
+            self._compact()
+        n = self.size
+        stored = self.term_weights[:n].ravel() != 0
+        buckets = self.term_ids[:n].ravel()[stored]
+        rows = np.repeat(np.arange(n, dtype=np.int32), self.top_terms)[stored]
+        order = np.argsort(buckets, kind="stable")
+        self.posting_rows = rows[order]
+        self.posting_weights = self.term_weights[:n].ravel()[stored][order]
+        counts = np.bincount(buckets, minlength=self.dimensions)
+        self.posting_ptr = np.concatenate(([0], np.cumsum(counts)))
+        self.indexed = n
+
+    def _scores(self, position: int) -> np.ndarray:
+        """Cosine of one row against every row"""
+
+        stored = self.term_weights[position] != 0
+        buckets = self.term_ids[position][stored].astype(np.int64)
+        weights = self.term_weights[position][stored]
+        scores = np.zeros(self.size, dtype=np.float32)
+
+        # Indexed rows: gather the postings of the row's buckets and sum per row
+        starts = self.posting_ptr[buckets]
+        lengths = self.posting_ptr[buckets + 1] - starts
+        entries = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        entries += np.arange(len(entries))
+        scores[:self.indexed] = np.bincount(
+            self.posting_rows[entries],
+            weights=self.posting_weights[entries] * np.repeat(weights, lengths),
+            minlength=self.indexed
+        )
+
+        # Rows added since the postings were built
+        if self.size > self.indexed:
+            dense = np.zeros(self.dimensions, dtype=np.float32)
+            dense[buckets] = weights
+            tail = slice(self.indexed, self.size)
+            scores[tail] = (dense[self.term_ids[tail]] * self.term_weights[tail]).sum(axis=1)
+        return scores
+
+    def query_batch(self, tip_ids: Sequence[int], limit: int) -> List[Optional[List[Tuple[int, float]]]]:
+        """Cosine top-K neighbours for several tips"""
+
+        if self.size - self.indexed > max(2_000, self.indexed // 10):
+            self._build_postings()
+
+        results: List[Optional[List[Tuple[int, float]]]] = [None] * len(tip_ids)
+        n = self.size
+        k = min(limit, len(self.positions) - 1)
+        for slot, tip_id in enumerate(tip_ids):
+            position = self.positions.get(tip_id)
+            if position is None:
+                continue
+            if k <= 0:
+                results[slot] = []
+                continue
+            scores = self._scores(position)
+            scores[~self.alive[:n]] = -np.inf
+            scores[position] = -np.inf  # never return the tip itself
+            top = np.argpartition(scores, n - k)[n - k:]
+            candidates = top[np.argsort(-scores[top], kind="stable")]
+            results[slot] = [(int(self.ids[c]), float(scores[c])) for c in candidates]
+
+        self.batches += 1
+        self.queries += len(tip_ids)
+        return results
+
+    async def similar(self, tip_id: int, limit: int = 10) -> Optional[List[Tuple[int, float]]]:
+        """(tip_id, cosine) neighbours, best first; None if the tip is not indexed.
+
+        Requests arriving in the same event loop iteration share one batched query.
+        """
+
+        if tip_id not in self.positions:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((tip_id, limit, future))
+        if len(self._pending) == 1:
+            asyncio.get_running_loop().call_soon(self._run_pending)
+        return await future
+
+    def _run_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        try:
+            results = self.query_batch([tip_id for tip_id, _, _ in pending], max(limit for _, limit, _ in pending))
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, limit, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result[:limit] if result is not None else None)
+
+    async def build(self) -> None:
+        """Rebuild from every tip in the database (IDF computed over the full corpus first)"""
+
+        async with engine.connect() as conn:
+            count = await conn.scalar(select(func.count()).select_from(WellnessTip.__table__))
+            result = await conn.stream(select(WellnessTip.id, WellnessTip.title, WellnessTip.content, WellnessTip.tags))
+            rows = [tuple(row) async for row in result]
+
+        self._reset(count or 0)
+        term_frequencies = [self._hashed_tf(title, content, tags) for _, title, content, tags in rows]
+        corpus_frequency = np.zeros(self.dimensions, dtype=np.int64)
+        for buckets, _ in term_frequencies:
+            corpus_frequency[buckets] += 1
+        idf = self._idf(corpus_frequency, len(rows))
+
+        for (tip_id, _, _, _), tf in zip(rows, term_frequencies):
+            buckets, weights = self._vectorize(tf, idf)
+            self.document_frequency[buckets] += 1
+            self._append(tip_id, buckets, weights)
+        self.documents = len(rows)
+        self._build_postings()
+        self.dirty = True
+
+    def _snapshot(self) -> Dict[str, np.ndarray]:
+        n = self.size
+        synced_at = self.synced_at.timestamp() if self.synced_at else time.time()
+        return {
+            "ids": self.ids[:n].copy(),
+            "alive": self.alive[:n].copy(),
+            "term_ids": self.term_ids[:n].copy(),
+            "term_weights": self.term_weights[:n].copy(),
+            "document_frequency": self.document_frequency.copy(),
+            "meta": np.array([self.dimensions, self.top_terms, self.documents, synced_at])
+        }
+
+    def _write(self, snapshot: Dict[str, np.ndarray]) -> None:
+        """Write a snapshot atomically to the configured path"""
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            np.savez(handle, **snapshot)
+        os.replace(temporary, self.path)
+
+    def _is_saver(self) -> bool:
+        """Whether this process saves the index: the first to lock the index file does, until it exits"""
+
+        if self._lock_file is None:
+            try:
+                import fcntl
+            except ImportError:
+                return True
+            handle = open(f"{self.path}.lock", "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            self._lock_file = handle
+        return True
+
+    def save(self) -> None:
+        """Persist the index"""
+        self._write(self._snapshot())
+        self.dirty = False
+
+    def load_file(self) -> Optional[datetime]:
+        """Load a saved index, returning the time it was caught up to (None if missing or incompatible)"""
+
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path, allow_pickle=False) as data:
+            if "term_ids" not in data.files:
+                return None
+            dimensions, top_terms, documents, synced_at = data["meta"]
+            if int(dimensions) != self.dimensions or int(top_terms) != self.top_terms:
+                return None
+            n = len(data["ids"])
+            self._reset(n)
+            self.ids[:n] = data["ids"]
+            self.alive[:n] = data["alive"]
+            self.term_ids[:n] = data["term_ids"]
+            self.term_weights[:n] = data["term_weights"]
+            self.document_frequency[:] = data["document_frequency"]
+        self.size = n
+        self.documents = int(documents)
+        self.dead = int(np.count_nonzero(~self.alive[:n]))
+        self.positions = {int(self.ids[p]): int(p) for p in np.flatnonzero(self.alive[:n])}
+        self._build_postings()
+        return datetime.fromtimestamp(synced_at, tz=timezone.utc)
+
+    async def load(self) -> None:
+        """Reload the saved index and catch up on changes since, or build from scratch"""
+
+        started = datetime.now(timezone.utc)
+        try:
+            saved_at = self.load_file()
+        except Exception as e:
+            print(f"Similar tips index could not be read, rebuilding: {e}")
+            saved_at = None
+        if saved_at is None:
+            await self.build()
+        else:
+            await self._catch_up(saved_at)
+        self.synced_at = started
+
+    async def refresh(self) -> None:
+        """Index tips written (through any worker) since the last catch-up and drop deleted ones"""
+
+        started = datetime.now(timezone.utc)
+        await self._catch_up(self.synced_at or started)
+        self.synced_at = started
+
+    async def _catch_up(self, since: datetime) -> None:
+        since = since - CATCH_UP_SLACK
+        if engine.dialect.name == "sqlite":
+            # SQLite keeps server-side timestamps as "YYYY-MM-DD HH:MM:SS" text
+            since = str(since.replace(tzinfo=None))
+        async with engine.connect() as conn:
+            changed = await conn.execute(
+                select(WellnessTip.id, WellnessTip.title, WellnessTip.content, WellnessTip.tags).where(
+                    func.coalesce(WellnessTip.updated_at, WellnessTip.created_at) >= since
+                )
+            )
+            for row in changed.fetchall():
+                self.upsert(row.id, row.title, row.content, row.tags)
+            existing = set((await conn.execute(select(WellnessTip.id))).scalars().all())
+        for tip_id in [tip_id for tip_id in self.positions if tip_id not in existing]:
+            self.remove(tip_id)
+
+    async def _save_if_dirty(self) -> None:
+        if self.dirty and self._is_saver():
+            # Snapshot on the event loop so the file never sees a half-applied update
+            snapshot = self._snapshot()
+            self.dirty = False
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+            except Exception:
+                self.dirty = True
+                raise
+
+    async def _run(self) -> None:
+        """Periodically catch up from the database and persist changes"""
+
+        loop = asyncio.get_running_loop()
+        next_save = loop.time() + self.save_interval
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Similar tips index refresh error: {e}")
+            if loop.time() >= next_save:
+                next_save = loop.time() + self.save_interval
+                try:
+                    await self._save_if_dirty()
+                except Exception as e:
+                    print(f"Similar tips index save error: {e}")
+
+    def start(self) -> None:
+        """Start periodic catch-ups and saves"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and persist the final state"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._save_if_dirty()
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size, memory and query batching counters"""
+        return {
+            "tips": len(self),
+            "dimensions": self.dimensions,
+            "top_terms": self.top_terms,
+            "bytes": int(
+                self.term_ids.nbytes + self.term_weights.nbytes
+                + self.posting_rows.nbytes + self.posting_weights.nbytes
+            ),
+            "saver": self._lock_file is not None,
+            "batches": self.batches,
+            "queries": self.queries
+        }
+
+similarity_index = TipSimilarityIndex()
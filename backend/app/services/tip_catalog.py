@@ -0,0 +1,336 @@
+"""
+Columnar in-memory tip catalog with vectorized personalized scoring
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, func
+
+from ..core.config import settings
+from ..core.database import engine
+from ..models.wellness import WellnessTip, WellnessCategoryEnum
+
+CATEGORIES = list(WellnessCategoryEnum)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+DIFFICULTY_CODES = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+# Tags that signal relevance for each wellness goal
+GOAL_TAGS = {
+    "weight_loss": ["weight-loss", "cardio", "nutrition", "calories", "hiit"],
+    "muscle_gain": ["strength", "protein", "muscle", "resistance"],
+    "stress_relief": ["stress", "mindfulness", "breathing", "meditation", "relaxation"],
+    "better_sleep": ["sleep", "rest", "recovery", "relaxation"],
+    "nutrition": ["nutrition", "diet", "protein", "vegetables", "recipes"],
+    "flexibility": ["flexibility", "stretching", "mobility", "yoga"],
+    "mental_health": ["mental-health", "gratitude", "mindfulness", "anxiety", "journaling"]
+}
+
+# Score weights; each component is scaled to [0, 1]
+WEIGHT_CATEGORY = 0.35
+WEIGHT_TAGS = 0.30
+WEIGHT_DIFFICULTY = 0.15
+WEIGHT_ENGAGEMENT = 0.20
+MAX_TAG_MATCHES = 3
+
+# Row code for deleted tips; scores -inf in every lookup table
+DEAD_CODE = len(CATEGORIES) * len(DIFFICULTY_CODES)
+
+CatalogRow = Tuple[int, Any, Optional[Sequence[str]], Optional[str], int, int]
+
+def _normalize_tag(tag: str) -> str:
+    return tag.strip().lower().replace("_", "-").replace(" ", "-")
+
+class TipCatalog:
+    """Tips as parallel NumPy arrays.
+
+    Each row stores a combined category/difficulty code, so one lookup table
+    per query scores both (and filters categories and deleted rows). Tags are
+    kept CSR-style per row and transposed into per-tag postings for scoring.
+    """
+
+    def __init__(self, refresh_interval: float = settings.TIP_CATALOG_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.loaded = False
+        self._task: Optional[asyncio.Task] = None
+        self._load_lock = asyncio.Lock()
+        self._reset(0)
+
+    def _reset(self, capacity: int) -> None:
+        capacity = max(capacity, 1024)
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.codes = np.zeros(capacity, dtype=np.int8)  # category * len(DIFFICULTY_CODES) + difficulty
+        self.engagement = np.zeros(capacity, dtype=np.float32)  # likes + unique viewers
+        self.viewers = np.zeros(capacity, dtype=np.float32)  # unique viewers part of engagement
+        self.tag_indptr = np.zeros(capacity + 1, dtype=np.int64)
+        self.tag_indices = np.zeros(capacity * 2, dtype=np.int32)
+        self.vocabulary: Dict[str, int] = {}
+        self.rows: Dict[int, int] = {}
+        self.dead = 0
+        # Per-tag postings cover rows [0, indexed); later rows are matched through the CSR tail
+        self.indexed = 0
+        self.posting_ptr = np.zeros(1, dtype=np.int64)
+        self.posting_rows = np.zeros(0, dtype=np.int32)
+        self._engagement_score: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _grow(self) -> None:
+        capacity = len(self.ids) * 2
+        for name in ("ids", "codes", "engagement", "viewers"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+        indptr = np.zeros(capacity + 1, dtype=np.int64)
+        indptr[:self.size + 1] = self.tag_indptr[:self.size + 1]
+        self.tag_indptr = indptr
+
+    def _tag_codes(self, tags: Optional[Sequence[str]]) -> List[int]:
+        codes = []
+        for tag in set(_normalize_tag(tag) for tag in (tags or [])):
+            codes.append(self.vocabulary.setdefault(tag, len(self.vocabulary)))
+        return codes
+
+    def _append(self, row: CatalogRow) -> None:
+        tip_id, category, tags, difficulty, likes, viewers = row
+        if self.size == len(self.ids):
+            self._grow()
+
+        position = self.size
+        codes = self._tag_codes(tags)
+        start = self.tag_indptr[position]
+        end = start + len(codes)
+        if end > len(self.tag_indices):
+            grown = np.zeros(max(end, len(self.tag_indices) * 2), dtype=np.int32)
+            grown[:start] = self.tag_indices[:start]
+            self.tag_indices = grown
+        self.tag_indices[start:end] = codes
+        self.tag_indptr[position + 1] = end
+
+        self.ids[position] = tip_id
+        self.codes[position] = (
+            CATEGORY_CODES[WellnessCategoryEnum(category)] * len(DIFFICULTY_CODES)
+            + DIFFICULTY_CODES.get(difficulty or "beginner", 0)
+        )
+        self.viewers[position] = viewers or 0
+        self.engagement[position] = (likes or 0) + self.viewers[position]
+        self.rows[tip_id] = position
+        self.size += 1
+        self._engagement_score = None
+
+    def _build_postings(self) -> None:
+        """Transpose the row -> tags CSR into tag -> rows postings"""
+
+        n = self.size
+        entries = self.tag_indices[:self.tag_indptr[n]]
+        entry_rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(self.tag_indptr[:n + 1]))
+        self.posting_rows = entry_rows[np.argsort(entries, kind="stable")]
+        counts = np.bincount(entries, minlength=len(self.vocabulary))
+        self.posting_ptr = np.concatenate(([0], np.cumsum(counts)))
+        self.indexed = n
+
+    def load_rows(self, rows: Iterable[CatalogRow], expected: int = 0) -> None:
+        """Replace the catalog with (id, category, tags, difficulty, likes, unique viewers) rows"""
+        self._reset(expected)
+        for row in rows:
+            self._append(row)
+        self._build_postings()
+        self.loaded = True
+
+    def upsert(self, tip: WellnessTip) -> None:
+        """Add a tip or replace its row after an update"""
+        self.remove(tip.id)
+        self._append((tip.id, tip.category, tip.tags, tip.difficulty_level, tip.likes_count, tip.unique_viewers))
+
+    def remove(self, tip_id: int) -> None:
+        """Tombstone a tip's row; rows are compacted on the next full load"""
+        position = self.rows.pop(tip_id, None)
+        if position is not None:
+            self.codes[position] = DEAD_CODE
+            self.dead += 1
+
+    def add_engagement(self, tip_id: int, amount: int) -> None:
+        """Apply a flushed likes delta"""
+        position = self.rows.get(tip_id)
+        if position is not None:
+            self.engagement[position] += amount
+            self._engagement_score = None
+
+    def set_unique_viewers(self, tip_id: int, viewers: int) -> None:
+        """Replace a tip's unique viewer estimate (raw views are not ranked: refreshes would inflate them)"""
+        position = self.rows.get(tip_id)
+        if position is not None:
+            self.engagement[position] += viewers - self.viewers[position]
+            self.viewers[position] = viewers
+            self._engagement_score = None
+
+    def _engagement_component(self) -> np.ndarray:
+        """Weighted log engagement scaled to [0, WEIGHT_ENGAGEMENT], cached until counters change"""
+
+        if self._engagement_score is None or len(self._engagement_score) != self.size:
+            engagement = np.log1p(self.engagement[:self.size])
+            peak = engagement.max() if self.size else 0.0
+            if peak > 0:
+                engagement *= np.float32(WEIGHT_ENGAGEMENT / peak)
+            self._engagement_score = engagement
+        return self._engagement_score
+
+    def _user_vectors(
+        self,
+        user_profile: Dict[str, Any],
+        category: Optional[WellnessCategoryEnum] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Category/difficulty score table (indexed by row code) and wanted tag codes for a profile"""
+
+        interests = {_normalize_tag(interest) for interest in user_profile.get("interests", [])}
+        goals = [getattr(goal, "value", goal) for goal in user_profile.get("wellness_goals", [])]
+
+        # Category affinity: share of recent activity plus a bonus for named interests
+        affinity = np.zeros(len(CATEGORIES), dtype=np.float32)
+        patterns = user_profile.get("activity_patterns", {})
+        total = sum(count for category_key, count in patterns.items() if category_key is not None)
+        for category_key, count in patterns.items():
+            if category_key is not None and total:
+                affinity[CATEGORY_CODES[WellnessCategoryEnum(category_key)]] += count / total
+        for code, category_enum in enumerate(CATEGORIES):
+            if category_enum.value in interests:
+                affinity[code] += 0.5
+        if affinity.max() > 0:
+            affinity /= affinity.max()
+
+        # Difficulty closeness to the user's experience level
+        experience = DIFFICULTY_CODES.get(user_profile.get("experience_level") or "beginner", 0)
+        levels = np.arange(len(DIFFICULTY_CODES))
+        closeness = 1.0 - np.abs(levels - experience) / (len(DIFFICULTY_CODES) - 1)
+
+        table = np.full(DEAD_CODE + 1, -np.inf, dtype=np.float32)
+        table[:DEAD_CODE] = (
+            WEIGHT_CATEGORY * affinity[:, None] + WEIGHT_DIFFICULTY * closeness[None, :]
+        ).ravel()
+        if category is not None:
+            keep = CATEGORY_CODES[WellnessCategoryEnum(category)] * len(DIFFICULTY_CODES)
+            filtered = np.full_like(table, -np.inf)
+            filtered[keep:keep + len(DIFFICULTY_CODES)] = table[keep:keep + len(DIFFICULTY_CODES)]
+            table = filtered
+
+        wanted = set(interests)
+        for goal in goals:
+            wanted.update(GOAL_TAGS.get(goal, []))
+            wanted.add(_normalize_tag(goal))
+        tag_codes = np.array(
+            sorted(self.vocabulary[tag] for tag in wanted if tag in self.vocabulary),
+            dtype=np.int32
+        )
+        return table, tag_codes
+
+    def _tag_matches(self, tag_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows carrying any wanted tag and how many of the wanted tags each carries"""
+
+        if not len(tag_codes):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Indexed rows: concatenate the postings of each wanted tag
+        indexed_codes = tag_codes[tag_codes < len(self.posting_ptr) - 1]
+        hits = [self.posting_rows[self.posting_ptr[code]:self.posting_ptr[code + 1]] for code in indexed_codes]
+
+        # Rows appended since the postings were built: scan their CSR entries
+        if self.size > self.indexed:
+            tail_start = self.tag_indptr[self.indexed]
+            tail_entries = self.tag_indices[tail_start:self.tag_indptr[self.size]]
+            matched = np.flatnonzero(np.isin(tail_entries, tag_codes)) + tail_start
+            hits.append(np.searchsorted(self.tag_indptr[:self.size + 1], matched, side="right") - 1)
+
+        return np.unique(np.concatenate(hits), return_counts=True)
+
+    def score(self, user_profile: Dict[str, Any], category: Optional[WellnessCategoryEnum] = None) -> np.ndarray:
+        """Score every row against a profile in one vectorized pass (dead/filtered rows get -inf)"""
+
+        n = self.size
+        if n - self.indexed > max(10_000, self.indexed // 10):
+            self._build_postings()
+
+        table, tag_codes = self._user_vectors(user_profile, category)
+        scores = table[self.codes[:n]]
+        scores += self._engagement_component()
+
+        rows, matches = self._tag_matches(tag_codes)
+        scores[rows] += WEIGHT_TAGS * np.minimum(matches, MAX_TAG_MATCHES).astype(np.float32) / MAX_TAG_MATCHES
+        return scores
+
+    def top_k(
+        self,
+        user_profile: Dict[str, Any],
+        category: Optional[WellnessCategoryEnum] = None,
+        limit: int = 6
+    ) -> List[Tuple[int, float]]:
+        """Highest scoring (tip_id, score) pairs, best first"""
+
+        if self.size == 0:
+            return []
+        scores = self.score(user_profile, category)
+        if category is not None or self.dead:
+            # Partitioning around many tied -inf rows is slow; drop them first
+            positions = np.flatnonzero(scores != -np.inf)
+            pool = scores[positions]
+        else:
+            positions, pool = None, scores
+        if not len(pool):
+            return []
+        k = min(limit, len(pool))
+        candidates = np.argpartition(pool, len(pool) - k)[len(pool) - k:]
+        if positions is not None:
+            candidates = positions[candidates]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(self.ids[position]), float(scores[position])) for position in ranked]
+
+    async def load(self) -> None:
+        """Load every tip from the database"""
+
+        async with self._load_lock:
+            async with engine.connect() as conn:
+                count = await conn.scalar(select(func.count()).select_from(WellnessTip.__table__))
+                result = await conn.stream(select(
+                    WellnessTip.id,
+                    WellnessTip.category,
+                    WellnessTip.tags,
+                    WellnessTip.difficulty_level,
+                    WellnessTip.likes_count,
+                    WellnessTip.unique_viewers
+                ))
+                rows = [tuple(row) async for row in result]
+            self.load_rows(rows, expected=count or 0)
+
+    async def ensure_loaded(self) -> None:
+        """Load on first use"""
+        if not self.loaded:
+            await self.load()
+
+    async def _run(self) -> None:
+        """Periodic full reload picks up writes made by other workers"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                print(f"Tip catalog refresh error: {e}")
+
+    def start(self) -> None:
+        """Start periodic reloads"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic reloads"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+tip_catalog = TipCatalog()
@@ -0,0 +1,28 @@
+"""
+Stored tip excerpts for databases created before the excerpt column existed
+"""
+
+from sqlalchemy import inspect, text
+
+from ..core.database import engine
+from ..models.wellness import EXCERPT_LENGTH
+
+async def install_excerpts() -> None:
+    """Add the excerpt column to an existing wellness_tips table and backfill it"""
+
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("wellness_tips")}
+        )
+        if "excerpt" in columns:
+            return
+
+        await conn.execute(text(f"ALTER TABLE wellness_tips ADD COLUMN excerpt VARCHAR({EXCERPT_LENGTH + 3})"))
+        # Same rule as make_excerpt
+        await conn.execute(
+            text(
+                "UPDATE wellness_tips SET excerpt = CASE WHEN length(content) > :length "
+                "THEN substr(content, 1, :length) || '...' ELSE content END"
+            ),
+            {"length": EXCERPT_LENGTH}
+        )
@@ -0,0 +1,19 @@
+"""
+Keyset pagination indexes for databases created before they were declared
+"""
+
+from sqlalchemy.schema import CreateIndex
+
+from ..core.database import engine
+from ..models.wellness import WellnessTip
+
+async def install_keyset_indexes() -> None:
+    """Create the wellness_tips indexes an existing table is missing.
+
+    create_all skips tables that already exist, so the composite (sort column,
+    id) indexes behind cursor pagination would otherwise never be built there.
+    """
+
+    async with engine.begin() as conn:
+        for index in sorted(WellnessTip.__table__.indexes, key=lambda index: index.name):
+            await conn.execute(CreateIndex(index, if_not_exists=True))
@@ -0,0 +1,123 @@
+"""
+Versioned cache of serialized /tips listing pages
+"""
+
+import hashlib
+import secrets
+from collections import defaultdict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.wellness import WellnessCategoryEnum
+
+ALL_CATEGORIES = None  # version bumped by every write; unfiltered listings depend on it
+ENTRY_OVERHEAD = 256  # rough per-entry cost of the key, tuple and bookkeeping
+
+CacheKey = Tuple[Any, ...]
+CachedPage = Tuple[bytes, Optional[str]]
+
+def _entry_size(page: CachedPage) -> int:
+    body, next_cursor = page
+    return len(body) + len(next_cursor or "") + ENTRY_OVERHEAD
+
+def _category_name(category: Optional[WellnessCategoryEnum]) -> Optional[str]:
+    return getattr(category, "value", category)
+
+class TipListCache:
+    """Listing pages (JSON body, next cursor) keyed by the normalized query and a version.
+
+    Writes bump the version of the tip's category (and the all-categories
+    version) instead of deleting keys: lookups build their key from the current
+    version, so superseded pages are never read again and age out of the LRU.
+    The key, and so the ETag derived from it, is taken before the query runs,
+    which means a page computed concurrently with a write is stored under the
+    old version and never served after it.
+
+    Versions are per process; the TTL bounds how long another worker's writes
+    can go unseen, so a matching ETag only earns a 304 while its page is
+    still cached here.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.TIP_LIST_CACHE_MAX_ENTRIES,
+        ttl: float = settings.TIP_LIST_CACHE_TTL_SECONDS,
+        max_bytes: int = settings.TIP_LIST_CACHE_MAX_BYTES
+    ):
+        self._cache = TTLCache(max_entries, ttl, max_bytes=max_bytes, size_of=_entry_size)
+        # Random per process so ETags from another worker (or before a restart) never match
+        self._epoch = secrets.token_hex(4)
+        self._versions: Dict[Optional[str], int] = defaultdict(int)
+        self._trending_version = 0
+        self.bumps = 0
+        self.not_modified = 0
+
+    def key(
+        self,
+        category: Optional[WellnessCategoryEnum],
+        search: Optional[str],
+        sort_by: str,
+        order: str,
+        skip: int,
+        cursor: Optional[str],
+        limit: int,
+        fields: Optional[Sequence[str]]
+    ) -> CacheKey:
+        """Cache key for a listing request at the current data version"""
+
+        name = _category_name(category)
+        return (
+            self._versions[name],
+            self._trending_version if sort_by == "trending" else 0,
+            name,
+            " ".join(search.lower().split()) if search else None,
+            sort_by,
+            order,
+            ("cursor", cursor) if cursor else ("skip", skip),
+            limit,
+            tuple(dict.fromkeys(fields)) if fields else None
+        )
+
+    def etag(self, key: CacheKey) -> str:
+        """Strong ETag for the page a key identifies"""
+        digest = hashlib.blake2b(repr((self._epoch, key)).encode(), digest_size=12).hexdigest()
+        return f'"{digest}"'
+
+    def not_modified_for(self, if_none_match: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header lets the request be answered with 304"""
+
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or etag in candidates:
+            self.not_modified += 1
+            return True
+        return False
+
+    def get(self, key: CacheKey) -> Optional[CachedPage]:
+        """Cached (body, next cursor), or None on a miss"""
+        return self._cache.get(key)
+
+    def set(self, key: CacheKey, body: bytes, next_cursor: Optional[str]) -> None:
+        """Store a serialized page"""
+        self._cache.set(key, (body, next_cursor))
+
+    def bump(self, *categories: Optional[WellnessCategoryEnum]) -> None:
+        """Move listings of these categories (and unfiltered listings) to a new version"""
+
+        for category in set(categories):
+            if category is not None:
+                self._versions[_category_name(category)] += 1
+        self._versions[ALL_CATEGORIES] += 1
+        self.bumps += 1
+
+    def bump_trending(self) -> None:
+        """Move trending-sorted listings to a new version after scores changed"""
+        self._trending_version += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, memory use and invalidation counters"""
+        return {**self._cache.stats(), "version_bumps": self.bumps, "not_modified": self.not_modified}
+
+tip_list_cache = TipListCache()
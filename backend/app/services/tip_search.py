@@ -0,0 +1,125 @@
+"""
+Full-text search over wellness tips (Postgres tsvector/GIN, SQLite FTS5)
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, or_, text
+from sqlalchemy.sql import Select, table, column
+
+from ..core.config import settings
+from ..core.database import engine
+from ..models.wellness import WellnessTip
+
+FTS_TABLE = "wellness_tips_fts"
+fts_table = table(FTS_TABLE, column("rowid"), column("rank"))
+
+# Generated column keeps the vector in sync with title/content on every write
+POSTGRES_FTS_DDL = [
+    """
+    ALTER TABLE wellness_tips ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_wellness_tips_search_vector ON wellness_tips USING GIN (search_vector)"
+]
+
+# External-content FTS5 table kept in sync by triggers
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5(title, content, content='wellness_tips', content_rowid='id')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON wellness_tips BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON wellness_tips BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON wellness_tips BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """
+]
+
+def full_text_search_ddl() -> List[str]:
+    """DDL install_full_text_search applies, for the schema fingerprint"""
+    if settings.SEARCH_BACKEND != "fulltext":
+        return []
+    return POSTGRES_FTS_DDL if engine.dialect.name == "postgresql" else SQLITE_FTS_DDL
+
+def full_text_enabled() -> bool:
+    """Whether searches use the full-text index for the configured database"""
+    return settings.SEARCH_BACKEND == "fulltext" and engine.dialect.name in ("postgresql", "sqlite")
+
+async def install_full_text_search() -> None:
+    """Create the full-text column/index (Postgres) or FTS5 table and triggers (SQLite)"""
+
+    if settings.SEARCH_BACKEND != "fulltext":
+        return
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            for statement in POSTGRES_FTS_DDL:
+                await conn.execute(text(statement))
+        elif conn.dialect.name == "sqlite":
+            existing = await conn.scalar(
+                text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            )
+            for statement in SQLITE_FTS_DDL:
+                await conn.execute(text(statement))
+            if not existing:
+                # Index rows that were inserted before the triggers existed
+                await conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def _fts5_query(search: str) -> str:
+    """Turn free text into a safe FTS5 expression (AND of quoted terms, prefix on the last)"""
+
+    terms = re.findall(r"\w+", search)
+    if not terms:
+        return '""'
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def apply_search(query: Select, search: str, ranked: bool = False) -> Tuple[Select, Optional[object]]:
+    """Add a search filter to a tips query, returns the query and a relevance expression (higher is better).
+
+    The full-text index is only used when results are `ranked` by relevance:
+    for a broad term it has to collect and sort every match, while an ILIKE
+    filter over a listing in index order stops after the first page.
+    """
+
+    if ranked and full_text_enabled():
+        if engine.dialect.name == "postgresql":
+            search_vector = literal_column("wellness_tips.search_vector")
+            ts_query = func.websearch_to_tsquery("english", search)
+            query = query.where(search_vector.op("@@")(ts_query))
+            return query, func.ts_rank_cd(search_vector, ts_query)
+
+        query = query.join(
+            fts_table, fts_table.c.rowid == WellnessTip.id
+        ).where(
+            literal_column(FTS_TABLE).op("MATCH")(_fts5_query(search))
+        )
+        # FTS5 rank is bm25, where lower means more relevant
+        return query, -fts_table.c.rank
+
+    search_term = f"%{search}%"
+    query = query.where(
+        or_(
+            WellnessTip.title.ilike(search_term),
+            WellnessTip.content.ilike(search_term)
+        )
+    )
+    return query, None
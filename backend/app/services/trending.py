@@ -0,0 +1,216 @@
+"""
+Time-decayed trending scores for tips and categories
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy import select, update, delete, insert, exists, literal, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+
+from ..core.config import settings
+from ..core.database import engine, upsert_insert
+from ..models.wellness import (
+    WellnessTip,
+    UserActivity,
+    ActivityTypeEnum,
+    WellnessCategoryEnum,
+    TipTrendingScore,
+    TrendingState
+)
+from .tip_list_cache import tip_list_cache
+
+# How much each kind of engagement adds to a hot score
+ACTIVITY_WEIGHTS = {
+    ActivityTypeEnum.VIEW_CONTENT: 1.0,
+    ActivityTypeEnum.LIKE_TIP: 3.0,
+    ActivityTypeEnum.SHARE_TIP: 5.0,
+    ActivityTypeEnum.VIEW_CATEGORY: 0.5
+}
+TIP_ACTIVITY_TYPES = (ActivityTypeEnum.VIEW_CONTENT, ActivityTypeEnum.LIKE_TIP, ActivityTypeEnum.SHARE_TIP)
+
+STATE_ID = 1
+LOOKBACK_HALF_LIVES = 7  # history scored on the first run
+REBASE_AFTER_HALF_LIVES = 16  # keeps stored values well inside float range
+
+def _utc(value: datetime) -> datetime:
+    """SQLite hands timestamps back naive; they are stored as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+class TrendingService:
+    """Maintains hot scores with forward decay.
+
+    An event at time t adds weight * 2^((t - epoch) / half-life). Every stored
+    score decays by the same factor as time passes, so ordering never needs a
+    rewrite; only tips with new activity are touched. The epoch is moved forward
+    (rescaling everything once) before values grow large.
+
+    Works on an AsyncSession (tip writes) or an AsyncConnection (background job).
+    """
+
+    def __init__(self, db: Union[AsyncSession, AsyncConnection]):
+        self.db = db
+        self.half_life = timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)
+
+    def _growth(self, when: datetime, epoch: datetime) -> float:
+        return 2.0 ** ((_utc(when) - epoch) / self.half_life)
+
+    async def _lock_state(self, now: datetime):
+        """Fetch the state row for update, creating it on the first run"""
+
+        table = TrendingState.__table__
+        await self.db.execute(
+            upsert_insert(table).values(
+                id=STATE_ID,
+                epoch=now,
+                watermark=now - self.half_life * LOOKBACK_HALF_LIVES,
+                category_scores={}
+            ).on_conflict_do_nothing(index_elements=[table.c.id])
+        )
+        result = await self.db.execute(select(table).where(table.c.id == STATE_ID).with_for_update())
+        return result.first()
+
+    async def refresh(self, now: Optional[datetime] = None) -> int:
+        """Score activity between the watermark and now minus the ingest lag, returns events scored.
+
+        The state row lock makes concurrent workers take turns; the second one
+        finds the watermark already advanced.
+        """
+
+        now = now or datetime.now(timezone.utc)
+        upto = now - timedelta(seconds=settings.TRENDING_INGEST_LAG_SECONDS)
+        state = await self._lock_state(now)
+        epoch, watermark = _utc(state.epoch), _utc(state.watermark)
+        category_scores: Dict[str, float] = dict(state.category_scores or {})
+        if upto <= watermark:
+            return 0
+
+        if upto - epoch > self.half_life * REBASE_AFTER_HALF_LIVES:
+            factor = 1.0 / self._growth(upto, epoch)
+            table = TipTrendingScore.__table__
+            await self.db.execute(update(table).where(table.c.score > 0).values(score=table.c.score * factor))
+            category_scores = {key: score * factor for key, score in category_scores.items()}
+            epoch = upto
+
+        tip_scores: Dict[int, float] = defaultdict(float)
+        events = 0
+        result = await self.db.stream(
+            select(
+                UserActivity.content_id,
+                UserActivity.category,
+                UserActivity.activity_type,
+                UserActivity.created_at
+            ).where(
+                UserActivity.created_at >= watermark,
+                UserActivity.created_at < upto,
+                UserActivity.activity_type.in_(list(ACTIVITY_WEIGHTS))
+            )
+        )
+        async for row in result:
+            weight = ACTIVITY_WEIGHTS[row.activity_type] * self._growth(row.created_at, epoch)
+            if row.category is not None:
+                key = row.category.value
+                category_scores[key] = category_scores.get(key, 0.0) + weight
+            if row.activity_type in TIP_ACTIVITY_TYPES and row.content_id and row.content_id.isdigit():
+                tip_scores[int(row.content_id)] += weight
+            events += 1
+
+        if tip_scores:
+            # Tips without a row were deleted; the UPDATE simply skips them
+            table = TipTrendingScore.__table__
+            await self.db.execute(
+                update(table)
+                .where(table.c.tip_id == bindparam("b_tip_id"))
+                .values(score=table.c.score + bindparam("b_score")),
+                [{"b_tip_id": tip_id, "b_score": score} for tip_id, score in tip_scores.items()]
+            )
+
+        state_table = TrendingState.__table__
+        await self.db.execute(
+            update(state_table)
+            .where(state_table.c.id == STATE_ID)
+            .values(epoch=epoch, watermark=upto, category_scores=category_scores)
+        )
+        return events
+
+    async def tip_created(self, tip_id: int) -> None:
+        """Give a new tip its (zero) score row"""
+        await self.db.execute(insert(TipTrendingScore.__table__).values(tip_id=tip_id, score=0.0))
+
+    async def tip_deleted(self, tip_id: int) -> None:
+        """Drop a tip's score row (SQLite does not enforce the cascade)"""
+        table = TipTrendingScore.__table__
+        await self.db.execute(delete(table).where(table.c.tip_id == tip_id))
+
+    async def ensure_tip_rows(self) -> None:
+        """Create score rows for tips that predate the trending table"""
+
+        table = TipTrendingScore.__table__
+        await self.db.execute(
+            insert(table).from_select(
+                ["tip_id", "score"],
+                select(WellnessTip.id, literal(0.0)).where(
+                    ~exists().where(table.c.tip_id == WellnessTip.id)
+                )
+            )
+        )
+
+    async def category_scores(self, categories: List[WellnessCategoryEnum]) -> Dict[WellnessCategoryEnum, float]:
+        """Current category heat relative to the hottest category (0.0 - 1.0)"""
+
+        result = await self.db.execute(
+            select(TrendingState.category_scores).where(TrendingState.id == STATE_ID)
+        )
+        raw = result.scalar_one_or_none() or {}
+        peak = max(raw.values(), default=0.0)
+        return {
+            category: round(raw.get(category.value, 0.0) / peak, 4) if peak > 0 else 0.0
+            for category in categories
+        }
+
+class TrendingJob:
+    """Background task that folds new activity into the trending scores"""
+
+    def __init__(self, interval: float = settings.TRENDING_REFRESH_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.events_scored = 0
+        self.runs = 0
+
+    async def run_once(self) -> int:
+        """Run one incremental refresh, returns events scored"""
+
+        async with engine.begin() as conn:
+            events = await TrendingService(conn).refresh()
+        self.runs += 1
+        self.events_scored += events
+        if events:
+            tip_list_cache.bump_trending()
+        return events
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Trending refresh error: {e}")
+
+    def start(self) -> None:
+        """Start the refresh loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+trending_job = TrendingJob()
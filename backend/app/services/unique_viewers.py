@@ -0,0 +1,235 @@
+"""
+Unique viewers per tip from HyperLogLog sketches
+"""
+
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, inspect, select, text, update
+
+from ..core.config import settings
+from ..core.database import engine, upsert_insert
+from ..core.hyperloglog import HyperLogLog
+from ..models.wellness import ALL_DAYS, TipViewerSketch, WellnessTip
+from .entity_cache import entity_cache
+from .tip_catalog import tip_catalog
+from .tip_list_cache import tip_list_cache
+
+SketchKey = Tuple[int, date]
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+async def install_unique_viewers() -> None:
+    """Add the unique_viewers column to an existing wellness_tips table"""
+
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("wellness_tips")}
+        )
+        if "unique_viewers" not in columns:
+            await conn.execute(text("ALTER TABLE wellness_tips ADD COLUMN unique_viewers INTEGER DEFAULT 0"))
+
+class UniqueViewerTracker:
+    """Counts distinct viewers per tip without a write per view.
+
+    Views are added to in-memory sketches per (tip, UTC day); a re-view by
+    the same user changes no register. Each flush merges the sketches into
+    the stored daily rows and each tip's all-time row under a row lock, so
+    workers flushing the same tip union rather than overwrite each other,
+    then stores the all-time estimate in wellness_tips.unique_viewers. Any
+    date range is the union of its daily sketches.
+    """
+
+    def __init__(
+        self,
+        precision: int = settings.UNIQUE_VIEWERS_PRECISION,
+        flush_interval: float = settings.UNIQUE_VIEWERS_FLUSH_SECONDS,
+        max_pending: int = settings.UNIQUE_VIEWERS_FLUSH_MAX_PENDING
+    ):
+        self.precision = precision
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[SketchKey, HyperLogLog] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"views": 0, "new_viewers": 0, "flushes": 0, "rows_written": 0}
+
+    def record(self, tip_id: int, user_id: int, day: Optional[date] = None) -> None:
+        """Note that a user viewed a tip"""
+
+        key = (tip_id, day or _today())
+        sketch = self._pending.get(key)
+        if sketch is None:
+            sketch = self._pending[key] = HyperLogLog(self.precision)
+        self._stats["views"] += 1
+        if sketch.add(user_id):
+            self._stats["new_viewers"] += 1
+
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def discard(self, tip_id: int) -> None:
+        """Drop unflushed sketches of a tip that no longer exists"""
+        for key in [key for key in self._pending if key[0] == tip_id]:
+            del self._pending[key]
+
+    async def count(self, tip_id: int, start: date, end: date) -> int:
+        """Estimated distinct viewers of a tip between two UTC days (inclusive)"""
+
+        table = TipViewerSketch.__table__
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(table.c.registers).where(
+                    table.c.tip_id == tip_id,
+                    table.c.day > ALL_DAYS,
+                    table.c.day >= start,
+                    table.c.day <= end
+                )
+            )
+            sketches = [HyperLogLog.from_bytes(registers) for registers, in result.all()]
+        sketches.extend(
+            sketch for (pending_tip, day), sketch in self._pending.items()
+            if pending_tip == tip_id and start <= day <= end
+        )
+        return HyperLogLog.union(sketches, self.precision).count()
+
+    async def flush(self) -> int:
+        """Merge buffered sketches into the database, returns how many tips changed"""
+
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            # The all-time sketch of a tip gains everything its daily sketches gained
+            updates: Dict[SketchKey, HyperLogLog] = dict(batch)
+            for (tip_id, _), sketch in batch.items():
+                updates.setdefault((tip_id, ALL_DAYS), HyperLogLog(self.precision)).merge(sketch)
+
+            try:
+                async with engine.begin() as conn:
+                    rows, estimates = await self._merge(conn, updates)
+                    categories = await self._store_estimates(conn, estimates)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                for key, sketch in batch.items():
+                    self._pending.setdefault(key, HyperLogLog(self.precision)).merge(sketch)
+                raise
+
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += rows
+            for tip_id, estimate in estimates.items():
+                tip_catalog.set_unique_viewers(tip_id, estimate)
+            if estimates:
+                tip_list_cache.bump(*categories)
+                await entity_cache.invalidate_tips(estimates)
+            return len(estimates)
+
+    async def _merge(self, conn, updates: Dict[SketchKey, HyperLogLog]) -> Tuple[int, Dict[int, int]]:
+        """Union `updates` into the stored sketches; returns rows written and the
+        new all-time estimate of each tip that gained viewers"""
+
+        table = TipViewerSketch.__table__
+        # Tips deleted since the views were recorded have nothing to attach to
+        existing = set(await conn.scalars(
+            select(WellnessTip.id).where(WellnessTip.id.in_({tip_id for tip_id, _ in updates}))
+        ))
+        updates = {key: sketch for key, sketch in updates.items() if key[0] in existing}
+        if not updates:
+            return 0, {}
+
+        # Create missing rows empty first, so every merge below is a locked read-modify-write
+        # and two workers adding a tip's first sketch of the day cannot overwrite each other
+        empty = bytes(1 << self.precision)
+        await conn.execute(
+            upsert_insert(table).on_conflict_do_nothing(index_elements=[table.c.tip_id, table.c.day]),
+            [{"tip_id": tip_id, "day": day, "registers": empty} for tip_id, day in updates]
+        )
+        result = await conn.execute(
+            select(table.c.tip_id, table.c.day, table.c.registers)
+            .where(table.c.tip_id.in_(existing), table.c.day.in_({day for _, day in updates}))
+            .order_by(table.c.tip_id, table.c.day)
+            .with_for_update()
+        )
+        stored = {(tip_id, day): registers for tip_id, day, registers in result.all()}
+
+        rows, estimates = [], {}
+        for key, sketch in updates.items():
+            merged = HyperLogLog.from_bytes(stored[key])
+            if not merged.merge(sketch):
+                # Nobody new since the last flush (by any worker)
+                continue
+            rows.append({"key_tip_id": key[0], "key_day": key[1], "registers": merged.to_bytes()})
+            if key[1] == ALL_DAYS:
+                estimates[key[0]] = merged.count()
+
+        if rows:
+            await conn.execute(
+                update(table)
+                .where(table.c.tip_id == bindparam("key_tip_id"), table.c.day == bindparam("key_day"))
+                .values(registers=bindparam("registers")),
+                rows
+            )
+        return len(rows), estimates
+
+    @staticmethod
+    async def _store_estimates(conn, estimates: Dict[int, int]) -> List:
+        """Write all-time estimates next to the tip counters, returns the categories touched"""
+
+        if not estimates:
+            return []
+        table = WellnessTip.__table__
+        await conn.execute(
+            update(table)
+            .where(table.c.id == bindparam("tip_id"))
+            .values(unique_viewers=bindparam("estimate")),
+            [{"tip_id": tip_id, "estimate": estimate} for tip_id, estimate in estimates.items()]
+        )
+        result = await conn.execute(
+            select(table.c.category).where(table.c.id.in_(list(estimates))).distinct()
+        )
+        return list(result.scalars())
+
+    async def _run(self) -> None:
+        """Background flush loop"""
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                # Shielded so a shutdown cancel never abandons a batch mid-write
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Unique viewer flush error: {e}")
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and merge whatever is still buffered"""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "pending_sketches": len(self._pending)}
+
+unique_viewers = UniqueViewerTracker()
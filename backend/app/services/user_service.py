@@ -0,0 +1,113 @@
+"""
+User account service layer
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+
+from ..core.database import after_commit
+from ..models.user import User
+from ..core.password_hasher import password_hasher
+from ..schemas.user import UserCreate, UserUpdate
+from .auth_cache import auth_cache
+from .behavior_profiles import BehaviorProfileService
+from .entity_cache import entity_cache
+from .recommendation_cache import recommendation_cache
+
+class UserService:
+    """Service layer for user accounts; writes are committed by the caller, then drop the user from the caches"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        return await self.db.get(User, user_id)
+
+    async def get_by_login(self, login: str) -> Optional[User]:
+        """Get user by username or email"""
+
+        result = await self.db.execute(
+            select(User).where(or_(User.username == login, User.email == login))
+        )
+        return result.scalars().first()
+
+    async def is_taken(self, username: str, email: str) -> bool:
+        """Whether a username or email is already registered"""
+
+        result = await self.db.execute(
+            select(User.id).where(or_(User.username == username, User.email == email)).limit(1)
+        )
+        return result.first() is not None
+
+    async def create_user(self, user_data: UserCreate) -> User:
+        """Register a new user"""
+
+        user = User(
+            username=user_data.username,
+            email=user_data.email,
+            hashed_password=await password_hasher.hash(user_data.password),
+            full_name=user_data.full_name,
+            wellness_goals=[goal.value for goal in user_data.wellness_goals],
+            interests=user_data.interests,
+            experience_level=user_data.experience_level.value
+        )
+
+        self.db.add(user)
+        await self.db.flush()
+        await self.db.refresh(user)
+
+        return user
+
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> User:
+        """Update a user's profile"""
+
+        user = await self.db.get(User, user_id)
+        preferences = self._preferences(user)
+
+        if user_update.full_name is not None:
+            user.full_name = user_update.full_name
+        if user_update.wellness_goals is not None:
+            user.wellness_goals = [goal.value for goal in user_update.wellness_goals]
+        if user_update.interests is not None:
+            user.interests = user_update.interests
+        if user_update.experience_level is not None:
+            user.experience_level = user_update.experience_level.value
+        preferences_changed = self._preferences(user) != preferences
+
+        await self.db.flush()
+        await self.db.refresh(user)
+        self._invalidate_after_commit(user_id)
+        if preferences_changed:
+            # Recommendations are ranked from the profile's copy of these fields
+            await BehaviorProfileService(self.db).sync_user_fields(user)
+            after_commit(self.db, lambda: recommendation_cache.invalidate_user(user_id))
+
+        return user
+
+    async def set_active(self, user_id: int, is_active: bool) -> None:
+        """Activate or deactivate an account"""
+
+        user = await self.db.get(User, user_id)
+        user.is_active = is_active
+        await self.db.flush()
+        self._invalidate_after_commit(user_id)
+
+    async def record_login(self, user: User) -> None:
+        """Stamp a successful login"""
+
+        user.last_login = datetime.now(timezone.utc)
+        await self.db.flush()
+        self._invalidate_after_commit(user.id)
+
+    @staticmethod
+    def _preferences(user: User) -> Tuple[Any, ...]:
+        """The profile fields recommendations are ranked from"""
+        return (list(user.wellness_goals or []), list(user.interests or []), user.experience_level)
+
+    def _invalidate_after_commit(self, user_id: int) -> None:
+        after_commit(self.db, lambda: auth_cache.invalidate_user(user_id))
+        after_commit(self.db, lambda: entity_cache.invalidate_user(user_id))
@@ -0,0 +1,47 @@
+"""
+Cache warmup run by each worker before it reports ready
+"""
+
+from ..core.database import AsyncSessionLocal, engine
+from ..models.wellness import WellnessCategoryEnum
+from .recommendation_engine import RecommendationEngine
+from .tip_list_cache import tip_list_cache
+from .wellness_service import WellnessService
+
+# The page the frontend opens with (see GET /tips defaults)
+FIRST_PAGE = {"skip": 0, "limit": 20, "sort_by": "created_at", "order": "desc"}
+
+async def warm_connection_pool() -> int:
+    """Open the pool's connections up front so the first requests do not pay for the handshakes"""
+
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    conns = [await engine.connect() for _ in range(size)]
+    for conn in conns:
+        await conn.close()
+    return size
+
+async def warm_tip_list_cache() -> int:
+    """Cache the first /tips page for every category and for all categories"""
+
+    pages = 0
+    async with AsyncSessionLocal() as session:
+        service = WellnessService(session)
+        for category in [None, *WellnessCategoryEnum]:
+            key = tip_list_cache.key(
+                category, None, FIRST_PAGE["sort_by"], FIRST_PAGE["order"],
+                FIRST_PAGE["skip"], None, FIRST_PAGE["limit"], None
+            )
+            if tip_list_cache.get(key) is not None:
+                continue
+            body, next_cursor = await service.get_tips_page_json(category=category, **FIRST_PAGE)
+            tip_list_cache.set(key, body, next_cursor)
+            pages += 1
+    return pages
+
+async def warm_insights(recommendation_engine: RecommendationEngine) -> None:
+    """Load category insights into the shared insights cache"""
+
+    async with AsyncSessionLocal() as session:
+        await recommendation_engine.get_all_category_insights(session)
+        for category in WellnessCategoryEnum:
+            await recommendation_engine.get_category_insights(session, category)
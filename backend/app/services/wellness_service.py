@@ -2,22 +2,132 @@
 Wellness service layer with business logic
 """
 
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, asc, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, insert, delete, func, desc, asc, tuple_, literal, Row, Select
 
-from ..models.wellness import WellnessTip, UserActivity, WellnessCategoryEnum, ActivityTypeEnum
+from ..models.wellness import (
+    WellnessTip,
+    UserActivity,
+    WellnessCategoryEnum,
+    ActivityTypeEnum,
+    TipTrendingScore,
+    TipViewerSketch,
+    make_excerpt
+)
 from ..models.user import User
+from ..core.config import settings
+from ..core.database import engine, after_commit
+from ..core.pagination import encode_cursor, decode_cursor
 from ..schemas.wellness import (
     WellnessTipCreate,
     WellnessTipUpdate,
     WellnessTipWithAuthor,
+    UserActivityCreate,
     UserActivity as UserActivitySchema
 )
+from .counter_aggregator import counter_aggregator
+from .activity_ingestion import activity_pipeline
+from .tip_search import apply_search
+from .recommendation_cache import recommendation_cache
+from .tip_list_cache import tip_list_cache
+from .entity_cache import entity_cache
+from .category_rollups import CategoryRollupService, invalidate_insights
+from .tip_catalog import tip_catalog
+from .similarity_index import similarity_index
+from .trending import TrendingService
+from .unique_viewers import unique_viewers
+
+# Sort columns that support keyset pagination (id is the tiebreaker)
+KEYSET_SORT_COLUMNS = ("created_at", "likes_count", "views_count", "trending")
+
+# Fields of a WellnessTipWithAuthor list entry and the columns behind them, in response order
+TIP_LIST_FIELDS = {
+    "title": WellnessTip.title,
+    "content": WellnessTip.content,
+    "category": WellnessTip.category,
+    "tags": WellnessTip.tags,
+    "source_url": WellnessTip.source_url,
+    "difficulty_level": WellnessTip.difficulty_level,
+    "id": WellnessTip.id,
+    "excerpt": WellnessTip.excerpt,
+    "author_id": WellnessTip.author_id,
+    "likes_count": WellnessTip.likes_count,
+    "shares_count": WellnessTip.shares_count,
+    "views_count": WellnessTip.views_count,
+    "unique_viewers": WellnessTip.unique_viewers,
+    "is_featured": WellnessTip.is_featured,
+    "created_at": WellnessTip.created_at,
+    "updated_at": WellnessTip.updated_at,
+    "author_username": User.username,
+    "author_full_name": User.full_name
+}
+AUTHOR_FIELDS = ("author_username", "author_full_name")
+COUNTER_FIELDS = ("likes_count", "shares_count", "views_count")
+
+# Counter bumped by each engagement activity
+ENGAGEMENT_COUNTERS = {
+    "like_tip": "likes_count",
+    "share_tip": "shares_count",
+    "view_content": "views_count"
+}
+
+# CategoryRollupService.apply_deltas argument for each counter
+ROLLUP_DELTAS = {"likes_count": "likes", "shares_count": "shares", "views_count": "views"}
+
+def _tip_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """Validated field names for a sparse fieldset (all fields by default)"""
+    if not fields:
+        return list(TIP_LIST_FIELDS)
+    unknown = [name for name in fields if name not in TIP_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+def _tip_projection(fields: List[str]) -> Select:
+    """SELECT of the requested fields plus the row id, joining users only when needed"""
+    query = select(
+        *(TIP_LIST_FIELDS[name].label(name) for name in fields),
+        WellnessTip.id.label("_row_id")
+    ).select_from(WellnessTip)
+    if any(name in AUTHOR_FIELDS for name in fields):
+        query = query.join(User, User.id == WellnessTip.author_id)
+    return query
+
+def _cursor_position(cursor: str, sort_by: str, order: str) -> Tuple[Any, int]:
+    """Decoded (sort value, id) of a keyset cursor, raises ValueError unless it fits `sort_by`"""
+    
+    position = decode_cursor(cursor)
+    if position.get("sort_by") != sort_by or position.get("order") != order:
+        raise ValueError("Cursor does not match the requested sort")
+    
+    value, last_id = position.get("value"), position.get("id")
+    if type(last_id) is not int:
+        raise ValueError("Invalid cursor")
+    if sort_by == "created_at":
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        if engine.dialect.name == "sqlite":
+            # SQLite keeps server-side timestamps as "YYYY-MM-DD HH:MM:SS" text
+            value = str(value.replace(tzinfo=None))
+    elif sort_by == "trending":
+        if type(value) not in (int, float):
+            raise ValueError("Invalid cursor")
+    elif type(value) is not int:
+        raise ValueError("Invalid cursor")
+    return value, last_id
 
 class WellnessService:
-    """Service layer for wellness-related operations"""
+    """Service layer for wellness-related operations.
+    
+    Write methods stage their changes on the session and register what must
+    happen once they are durable (cache invalidation, in-memory indexes) with
+    after_commit; the endpoint commits the unit of work.
+    """
     
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -33,95 +143,232 @@ class WellnessService:
     ) -> List[WellnessTipWithAuthor]:
         """Get wellness tips with filtering and pagination"""
         
-        query = select(WellnessTip).options(selectinload(WellnessTip.author))
+        tips, _ = await self.get_tips_page(
+            skip=skip,
+            limit=limit,
+            category=category,
+            search=search,
+            sort_by=sort_by,
+            order=order
+        )
+        return tips
+    
+    async def get_tips_page(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[WellnessCategoryEnum] = None,
+        search: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+        cursor: Optional[str] = None
+    ) -> Tuple[List[WellnessTipWithAuthor], Optional[str]]:
+        """Get a page of wellness tips and the cursor for the next page"""
+        
+        rows, next_cursor = await self.get_tip_rows_page(skip, limit, category, search, sort_by, order, cursor)
+        return [WellnessTipWithAuthor(**row) for row in rows], next_cursor
+    
+    async def get_tips_page_json(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[WellnessCategoryEnum] = None,
+        search: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[bytes, Optional[str]]:
+        """Same page as get_tips_page, serialized straight to JSON bytes (no model instances)"""
+        
+        rows, next_cursor = await self.get_tip_rows_page(skip, limit, category, search, sort_by, order, cursor, fields)
+        return orjson.dumps(rows, option=orjson.OPT_UTC_Z), next_cursor
+    
+    async def get_tip_rows_page(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[WellnessCategoryEnum] = None,
+        search: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """A page of tips as plain dicts in the WellnessTipWithAuthor shape, plus the next cursor.
+        
+        Only the columns of the requested fields (all by default) are selected,
+        with the author joined in the same query when needed. With a cursor the
+        page is fetched by keyset (sort value, id) instead of OFFSET, so deep
+        pages cost the same as the first one.
+        """
+        
+        fields = _tip_fields(fields)
+        query = _tip_projection(fields)
         
         # Apply category filter
         if category:
             query = query.where(WellnessTip.category == category)
         
         # Apply search filter
+        relevance = None
         if search:
-            search_term = f"%{search}%"
-            query = query.where(
-                or_(
-                    WellnessTip.title.ilike(search_term),
-                    WellnessTip.content.ilike(search_term)
-                )
-            )
+            query, relevance = apply_search(query, search, ranked=sort_by == "relevance")
         
-        # Apply sorting
-        sort_column = getattr(WellnessTip, sort_by)
+        # Apply sorting (relevance only means something when searching)
+        keyset = sort_by in KEYSET_SORT_COLUMNS
+        id_column = WellnessTip.id
+        if sort_by == "relevance":
+            sort_column = relevance if relevance is not None else WellnessTip.created_at
+        elif sort_by == "trending":
+            # Precomputed by the trending job; ordered from its (score, tip_id) index
+            query = query.join(TipTrendingScore, TipTrendingScore.tip_id == WellnessTip.id)
+            sort_column, id_column = TipTrendingScore.score, TipTrendingScore.tip_id
+        else:
+            sort_column = getattr(WellnessTip, sort_by)
+        if keyset:
+            query = query.add_columns(sort_column.label("_sort_value"))
         if order == "desc":
-            query = query.order_by(desc(sort_column))
+            query = query.order_by(desc(sort_column), desc(id_column))
         else:
-            query = query.order_by(asc(sort_column))
+            query = query.order_by(asc(sort_column), asc(id_column))
         
         # Apply pagination
-        query = query.offset(skip).limit(limit)
+        if cursor:
+            if not keyset:
+                raise ValueError(f"Cursor pagination is not supported for sort_by={sort_by}")
+            value, last_id = _cursor_position(cursor, sort_by, order)
+            
+            row_key = tuple_(sort_column, id_column)
+            after = tuple_(literal(value), literal(last_id))
+            query = query.where(row_key < after if order == "desc" else row_key > after)
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         
         result = await self.db.execute(query)
-        tips = result.scalars().all()
-        
-        # Convert to response schema
-        tips_with_author = []
-        for tip in tips:
-            tip_dict = {
-                "id": tip.id,
-                "title": tip.title,
-                "content": tip.content,
-                "category": tip.category,
-                "tags": tip.tags or [],
-                "author_id": tip.author_id,
-                "likes_count": tip.likes_count,
-                "shares_count": tip.shares_count,
-                "views_count": tip.views_count,
-                "is_featured": bool(tip.is_featured),
-                "source_url": tip.source_url,
-                "difficulty_level": tip.difficulty_level,
-                "created_at": tip.created_at,
-                "updated_at": tip.updated_at,
-                "author_username": tip.author.username,
-                "author_full_name": tip.author.full_name
-            }
-            tips_with_author.append(WellnessTipWithAuthor(**tip_dict))
-        
-        return tips_with_author
+        rows = result.all()
+        
+        next_cursor = None
+        if keyset and len(rows) == limit:
+            # Built from the stored value, not the overlaid counters returned to the client
+            last = rows[-1]._mapping
+            value = last["_sort_value"]
+            next_cursor = encode_cursor({
+                "sort_by": sort_by,
+                "order": order,
+                "value": value.isoformat() if sort_by == "created_at" else value,
+                "id": last["_row_id"]
+            })
+        
+        return [self._row_to_dict(row, fields) for row in rows], next_cursor
     
-    async def get_tip_by_id(self, tip_id: int) -> Optional[WellnessTipWithAuthor]:
-        """Get wellness tip by ID"""
+    async def get_tip_rows_by_ids(
+        self,
+        tip_ids: Sequence[int],
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """Tips as response dicts keyed by id (missing ids are left out), one query"""
         
-        query = select(WellnessTip).options(selectinload(WellnessTip.author)).where(WellnessTip.id == tip_id)
-        result = await self.db.execute(query)
-        tip = result.scalar_one_or_none()
+        fields = _tip_fields(fields)
+        if not tip_ids:
+            return {}
+        result = await self.db.execute(_tip_projection(fields).where(WellnessTip.id.in_(set(tip_ids))))
+        return {row._mapping["_row_id"]: self._row_to_dict(row, fields) for row in result.all()}
+    
+    async def get_tip_rows_in_order(
+        self,
+        tip_ids: Sequence[int],
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Tips as response dicts in the order of `tip_ids` (None for missing ids), one query"""
         
-        if not tip:
-            return None
+        rows = await self.get_tip_rows_by_ids(tip_ids, fields)
+        return [rows.get(tip_id) for tip_id in tip_ids]
+    
+    def _row_to_dict(self, row: Row, fields: List[str]) -> Dict[str, Any]:
+        """Projected tip row as a response dict, including unflushed counter deltas"""
         
+        mapping = row._mapping
+        tip = {name: mapping[name] for name in fields}
+        if "tags" in tip:
+            tip["tags"] = tip["tags"] or []
+        if "is_featured" in tip:
+            tip["is_featured"] = bool(tip["is_featured"])
+        if any(name in tip for name in COUNTER_FIELDS):
+            pending = counter_aggregator.pending_deltas(mapping["_row_id"])
+            for name in COUNTER_FIELDS:
+                if name in tip:
+                    tip[name] = (tip[name] or 0) + pending[name]
+        return tip
+    
+    def _with_author(self, tip: Dict[str, Any], author: Dict[str, Any]) -> WellnessTipWithAuthor:
+        """Response schema for cached tip and author columns, including unflushed counter deltas"""
+        
+        pending = counter_aggregator.pending_deltas(tip["id"])
         return WellnessTipWithAuthor(
-            id=tip.id,
-            title=tip.title,
-            content=tip.content,
-            category=tip.category,
-            tags=tip.tags or [],
-            author_id=tip.author_id,
-            likes_count=tip.likes_count,
-            shares_count=tip.shares_count,
-            views_count=tip.views_count,
-            is_featured=bool(tip.is_featured),
-            source_url=tip.source_url,
-            difficulty_level=tip.difficulty_level,
-            created_at=tip.created_at,
-            updated_at=tip.updated_at,
-            author_username=tip.author.username,
-            author_full_name=tip.author.full_name
+            id=tip["id"],
+            title=tip["title"],
+            content=tip["content"],
+            excerpt=tip["excerpt"],
+            category=tip["category"],
+            tags=tip["tags"] or [],
+            author_id=tip["author_id"],
+            likes_count=(tip["likes_count"] or 0) + pending["likes_count"],
+            shares_count=(tip["shares_count"] or 0) + pending["shares_count"],
+            views_count=(tip["views_count"] or 0) + pending["views_count"],
+            unique_viewers=tip["unique_viewers"] or 0,
+            is_featured=bool(tip["is_featured"]),
+            source_url=tip["source_url"],
+            difficulty_level=tip["difficulty_level"],
+            created_at=tip["created_at"],
+            updated_at=tip["updated_at"],
+            author_username=author["username"],
+            author_full_name=author["full_name"]
         )
     
+    async def get_tip_by_id(self, tip_id: int) -> Optional[WellnessTipWithAuthor]:
+        """Get wellness tip by ID (read through the shared entity cache)"""
+        
+        tip = await entity_cache.get_tip(tip_id)
+        if not tip:
+            return None
+        
+        author = await entity_cache.get_author(tip["author_id"])
+        
+        # Include counter deltas that have not been flushed yet
+        return self._with_author(tip, author)
+    
+    async def get_similar_tips(
+        self,
+        tip_id: int,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Tips most similar to a tip by content as response dicts, best first; None if the tip is unknown"""
+        
+        fields = _tip_fields(fields)
+        neighbours = await similarity_index.similar(tip_id, limit)
+        if neighbours is None:
+            return None
+        
+        tips_by_id = await self.get_tip_rows_by_ids([neighbour_id for neighbour_id, _ in neighbours], fields)
+        return [tips_by_id[neighbour_id] for neighbour_id, _ in neighbours if neighbour_id in tips_by_id]
+    
+    async def get_unique_viewers(self, tip_id: int, start: date, end: date) -> Optional[int]:
+        """Estimated distinct viewers of a tip between two UTC days; None if the tip is unknown"""
+        
+        if not await entity_cache.get_tip(tip_id):
+            return None
+        return await unique_viewers.count(tip_id, start, end)
+    
     async def create_tip(self, tip_data: WellnessTipCreate, author_id: int) -> WellnessTip:
         """Create new wellness tip"""
         
         tip = WellnessTip(
             title=tip_data.title,
             content=tip_data.content,
+            excerpt=make_excerpt(tip_data.content),
             category=tip_data.category,
             tags=tip_data.tags,
             source_url=tip_data.source_url,
@@ -130,9 +377,16 @@ class WellnessService:
         )
         
         self.db.add(tip)
-        await self.db.commit()
+        await self.db.flush()
+        await CategoryRollupService(self.db).tip_created(tip.category, tip.tags)
+        await TrendingService(self.db).tip_created(tip.id)
         await self.db.refresh(tip)
         
+        after_commit(self.db, lambda: tip_catalog.upsert(tip))
+        after_commit(self.db, lambda: similarity_index.index_tip(tip))
+        after_commit(self.db, lambda: tip_list_cache.bump(tip.category))
+        after_commit(self.db, lambda: invalidate_insights(tip.category))
+        
         return tip
     
     async def update_tip(self, tip_id: int, tip_update: WellnessTipUpdate) -> WellnessTip:
@@ -147,16 +401,24 @@ class WellnessService:
             tip.title = tip_update.title
         if tip_update.content is not None:
             tip.content = tip_update.content
+            tip.excerpt = make_excerpt(tip_update.content)
         if tip_update.tags is not None:
+            await CategoryRollupService(self.db).tags_changed(tip.category, tip.tags, tip_update.tags)
             tip.tags = tip_update.tags
         if tip_update.source_url is not None:
             tip.source_url = tip_update.source_url
         if tip_update.difficulty_level is not None:
             tip.difficulty_level = tip_update.difficulty_level
         
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(tip)
         
+        after_commit(self.db, lambda: tip_catalog.upsert(tip))
+        after_commit(self.db, lambda: similarity_index.index_tip(tip))
+        after_commit(self.db, lambda: tip_list_cache.bump(tip.category))
+        after_commit(self.db, lambda: invalidate_insights(tip.category))
+        after_commit(self.db, lambda: entity_cache.invalidate_tip(tip_id))
+        
         return tip
     
     async def delete_tip(self, tip_id: int) -> None:
@@ -166,28 +428,90 @@ class WellnessService:
         result = await self.db.execute(query)
         tip = result.scalar_one()
         
+        category = tip.category
+        await CategoryRollupService(self.db).tip_deleted(tip)
+        await TrendingService(self.db).tip_deleted(tip_id)
+        # SQLite does not enforce the cascade
+        await self.db.execute(delete(TipViewerSketch.__table__).where(TipViewerSketch.tip_id == tip_id))
         await self.db.delete(tip)
-        await self.db.commit()
+        await self.db.flush()
+        
+        after_commit(self.db, lambda: counter_aggregator.discard(tip_id))
+        after_commit(self.db, lambda: unique_viewers.discard(tip_id))
+        after_commit(self.db, lambda: tip_catalog.remove(tip_id))
+        after_commit(self.db, lambda: similarity_index.remove(tip_id))
+        after_commit(self.db, lambda: tip_list_cache.bump(category))
+        after_commit(self.db, lambda: invalidate_insights(category))
+        after_commit(self.db, lambda: entity_cache.invalidate_tip(tip_id))
     
-    async def increment_likes(self, tip_id: int) -> None:
-        """Increment like count for tip"""
+    async def record_engagement(self, user_id: int, tip_id: int, activity_type: str) -> Optional[Dict[str, Any]]:
+        """Count a like, share or view of a tip and record the activity.
         
-        query = select(WellnessTip).where(WellnessTip.id == tip_id)
-        result = await self.db.execute(query)
-        tip = result.scalar_one()
+        Returns the tip's id, category and new count, or None if the tip does not
+        exist. With ENGAGEMENT_WRITE_MODE "transactional" this is one
+        UPDATE ... RETURNING, one activity INSERT and the category rollup delta in
+        the caller's unit of work; with "buffered" both go to the write-behind aggregator and ingestion queue.
+        """
+        
+        field = ENGAGEMENT_COUNTERS[activity_type]
+        if settings.ENGAGEMENT_WRITE_MODE == "buffered":
+            return await self._record_engagement_buffered(user_id, tip_id, activity_type, field)
+        
+        table = WellnessTip.__table__
+        result = await self.db.execute(
+            update(table)
+            .where(table.c.id == tip_id)
+            .values({field: func.coalesce(table.c[field], 0) + 1})
+            .returning(table.c.id, table.c.category, table.c[field])
+        )
+        row = result.first()
+        if row is None:
+            return None
+        
+        event = activity_pipeline.build_event(
+            user_id=user_id,
+            activity_type=activity_type,
+            category=row.category,
+            content_id=str(tip_id)
+        )
+        await self.db.execute(insert(UserActivity.__table__).values(event))
+        # Last, so the category's rollup row stays locked only until the caller commits
+        await CategoryRollupService(self.db).apply_deltas(row.category, **{ROLLUP_DELTAS[field]: 1})
+        
+        after_commit(self.db, lambda: counter_aggregator.record_committed(tip_id, row.category, field))
+        after_commit(self.db, lambda: recommendation_cache.record_activity(user_id, row.category))
+        after_commit(self.db, lambda: activity_pipeline.notify_stored([event]))
+        if activity_type == ActivityTypeEnum.VIEW_CONTENT:
+            after_commit(self.db, lambda: unique_viewers.record(tip_id, user_id))
         
-        tip.likes_count += 1
-        await self.db.commit()
+        return {"id": tip_id, "category": row.category, field: row[2]}
     
-    async def increment_views(self, tip_id: int) -> None:
-        """Increment view count for tip"""
+    async def _record_engagement_buffered(
+        self,
+        user_id: int,
+        tip_id: int,
+        activity_type: str,
+        field: str
+    ) -> Optional[Dict[str, Any]]:
+        tip = await entity_cache.get_tip(tip_id)
+        if not tip:
+            return None
         
-        query = select(WellnessTip).where(WellnessTip.id == tip_id)
-        result = await self.db.execute(query)
-        tip = result.scalar_one()
+        await self.track_activity(
+            user_id=user_id,
+            activity_type=activity_type,
+            category=tip["category"],
+            content_id=str(tip_id)
+        )
+        counter_aggregator.add(tip_id, field)
+        if activity_type == ActivityTypeEnum.VIEW_CONTENT:
+            unique_viewers.record(tip_id, user_id)
         
-        tip.views_count += 1
-        await self.db.commit()
+        return {
+            "id": tip_id,
+            "category": tip["category"],
+            field: (tip[field] or 0) + counter_aggregator.pending_deltas(tip_id)[field]
+        }
     
     async def track_activity(
         self,
@@ -197,20 +521,39 @@ class WellnessService:
         content_id: Optional[str] = None,
         metadata: Optional[dict] = None,
         session_id: Optional[str] = None
-    ) -> UserActivity:
-        """Track user activity for analytics"""
+    ) -> bool:
+        """Queue user activity for analytics, returns False if the event was dropped"""
         
-        activity = UserActivity(
+        event = activity_pipeline.build_event(
             user_id=user_id,
-            activity_type=ActivityTypeEnum(activity_type),
+            activity_type=activity_type,
             category=category,
             content_id=content_id,
-            metadata=metadata or {},
+            metadata=metadata,
             session_id=session_id
         )
         
-        self.db.add(activity)
-        await self.db.commit()
-        await self.db.refresh(activity)
+        recommendation_cache.record_activity(user_id, event["category"])
+        
+        return await activity_pipeline.enqueue(event)
+    
+    async def track_activities(self, user_id: int, activities: Sequence[UserActivityCreate]) -> int:
+        """Queue a batch of one user's activity together; returns how many leading events were accepted"""
+        
+        events = [
+            activity_pipeline.build_event(
+                user_id=user_id,
+                activity_type=activity.activity_type,
+                category=activity.category,
+                content_id=activity.content_id,
+                metadata=activity.metadata,
+                session_id=activity.session_id
+            )
+            for activity in activities
+        ]
+        
+        accepted = await activity_pipeline.enqueue_many(events)
+        for event in events[:accepted]:
+            recommendation_cache.record_activity(user_id, event["category"])
         
-        return activity
\ No newline at end of file
+        return accepted
@@ -0,0 +1,81 @@
+"""
+Personalized top-K latency over the in-memory tip catalog
+
+Usage (from backend/):
+    python benchmarks/recommendation_benchmark.py --sizes 100000 1000000
+
+Builds a synthetic catalog directly (no database) and times TipCatalog.top_k
+for random user profiles, with and without a category filter.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+parser.add_argument("--profiles", type=int, default=200)
+parser.add_argument("--limit", type=int, default=6)
+args = parser.parse_args()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.wellness import WellnessCategoryEnum  # noqa: E402
+from app.services.tip_catalog import TipCatalog, GOAL_TAGS, DIFFICULTY_CODES  # noqa: E402
+
+CATEGORIES = list(WellnessCategoryEnum)
+DIFFICULTIES = list(DIFFICULTY_CODES)
+TAGS = sorted({tag for tags in GOAL_TAGS.values() for tag in tags}) + [f"tag-{i}" for i in range(500)]
+
+def make_rows(rng: random.Random, size: int):
+    for tip_id in range(1, size + 1):
+        yield (
+            tip_id,
+            rng.choice(CATEGORIES),
+            rng.sample(TAGS, rng.randint(0, 5)),
+            rng.choice(DIFFICULTIES),
+            rng.randrange(500),
+            rng.randrange(5000)
+        )
+
+def make_profile(rng: random.Random) -> dict:
+    return {
+        "interests": rng.sample([c.value for c in CATEGORIES] + TAGS[:40], 3),
+        "wellness_goals": rng.sample(list(GOAL_TAGS), 2),
+        "experience_level": rng.choice(DIFFICULTIES),
+        "activity_patterns": {category: rng.randrange(50) for category in rng.sample(CATEGORIES, 2)}
+    }
+
+def time_top_k(catalog: TipCatalog, profiles: list, category_filter: bool) -> tuple:
+    """p50/p95 latency in ms of top_k across the given profiles"""
+
+    rng = random.Random(7)
+    timings = []
+    for profile in profiles:
+        category = rng.choice(CATEGORIES) if category_filter else None
+        started = time.perf_counter()
+        catalog.top_k(profile, category, args.limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+def main() -> None:
+    rng = random.Random(42)
+    profiles = [make_profile(rng) for _ in range(args.profiles)]
+
+    for size in args.sizes:
+        catalog = TipCatalog()
+        load_started = time.perf_counter()
+        catalog.load_rows(make_rows(rng, size), expected=size)
+        print(f"\n=== {size:,} tips (catalog built in {time.perf_counter() - load_started:.1f}s) ===")
+
+        catalog.top_k(profiles[0], None, args.limit)  # warm up
+        for label, category_filter in (("all categories", False), ("one category", True)):
+            p50, p95 = time_top_k(catalog, profiles, category_filter)
+            print(f"{label:<20}p50 {p50:6.1f} ms   p95 {p95:6.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -3,37 +3,163 @@ Wellspire API - FastAPI Backend
 Enterprise-grade wellness platform with AI-powered recommendations
 """
 
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 import uvicorn
+import argparse
+import asyncio
+import json
 from typing import Optional
 import os
 from dotenv import load_dotenv
 
 from app.core.config import settings
-from app.core.database import engine, create_tables
+from app.core.database import engine, create_tables, AsyncSessionLocal
 from app.api.v1.api import api_router
-from app.core.security import verify_token
 from app.services.recommendation_engine import RecommendationEngine
+from app.services.counter_aggregator import counter_aggregator
+from app.services.activity_ingestion import activity_pipeline
+from app.services.tip_search import install_full_text_search, full_text_search_ddl
+from app.services.tip_excerpts import install_excerpts
+from app.services.tip_indexes import install_keyset_indexes
+from app.services.unique_viewers import install_unique_viewers, unique_viewers
+from app.services.recommendation_cache import recommendation_cache
+from app.services.tip_list_cache import tip_list_cache
+from app.services.auth_cache import auth_cache
+from app.core.password_hasher import password_hasher
+from app.core.server import serve
+from app.core.tiered_cache import cache_bus
+from app.core.readiness import readiness, FirstRequestTimer
+from app.core.schema import ensure_schema
+from app.services.category_rollups import CategoryRollupService
+from app.services.behavior_profiles import apply_activity_batch, profile_reconciler
+from app.services.tip_catalog import tip_catalog
+from app.services.similarity_index import similarity_index
+from app.services.trending import TrendingService, trending_job
+from app.services.co_engagement import co_engagement
+from app.services.warmup import warm_connection_pool, warm_tip_list_cache, warm_insights
 
 load_dotenv()
 
+readiness.record_imports(_import_started)
+
+async def prepare_database():
+    """Create tables, indexes and derived rows (idempotent; run once before forking workers)"""
+    await create_tables()
+    print("🚀 Database tables created")
+    
+    await install_excerpts()
+    await install_unique_viewers()
+    await install_keyset_indexes()
+    
+    await install_full_text_search()
+    print("🔎 Full-text search index ready")
+    
+    async with AsyncSessionLocal() as session:
+        rollups = CategoryRollupService(session)
+        if await rollups.is_empty():
+            await rollups.rebuild()
+            print("📊 Category insight rollups built")
+        await TrendingService(session).ensure_tip_rows()
+        await session.commit()
+
+async def setup_schema(mode: str = settings.SCHEMA_SETUP) -> bool:
+    """Prepare the database per SCHEMA_SETUP; False when the schema fingerprint was unchanged"""
+    return await ensure_schema(prepare_database, extra=full_text_search_ddl(), mode=mode)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
-    await create_tables()
-    print("🚀 Database tables created")
+    cache_bus.start()
+    
+    async with readiness.step("schema"):
+        if not await setup_schema():
+            print("🚀 Database schema unchanged; setup skipped")
+    
+    async with readiness.step("tip_catalog"):
+        await tip_catalog.load()
+        tip_catalog.start()
+        print(f"🗂️ Tip catalog loaded ({len(tip_catalog)} tips)")
+    
+    async with readiness.step("trending"):
+        await trending_job.run_once()
+        trending_job.start()
+        print("🔥 Trending scores refreshed")
+    
+    async with readiness.step("similar_tips"):
+        await similarity_index.load()
+        similarity_index.start()
+        print(f"🔗 Similar tips index ready ({len(similarity_index)} tips)")
+    
+    if settings.WARMUP_CACHES:
+        async with readiness.step("co_engagement"):
+            await co_engagement.catch_up()
+            co_engagement.start()
+            print("🤝 Co-engagement model loaded")
+    else:
+        co_engagement.start()
+        print("🤝 Co-engagement model loading in the background")
     
     # Initialize services
     app.state.recommendation_engine = RecommendationEngine()
     print("🤖 Recommendation engine initialized")
     
+    counter_aggregator.start()
+    print("📈 Engagement counter aggregator started")
+    
+    unique_viewers.start()
+    print("👀 Unique viewer sketches started")
+    
+    activity_pipeline.add_batch_listener(apply_activity_batch)
+    activity_pipeline.start()
+    print("📥 Activity ingestion pipeline started")
+    
+    profile_reconciler.start()
+    print("🧭 Behavior profile reconciler started")
+    
+    if settings.WARMUP_CACHES:
+        async with readiness.step("connection_pool"):
+            await warm_connection_pool()
+        async with readiness.step("tip_list_cache"):
+            pages = await warm_tip_list_cache()
+        async with readiness.step("category_insights"):
+            await warm_insights(app.state.recommendation_engine)
+        print(f"♨️ Caches warmed ({pages} tip pages)")
+    
+    readiness.mark_ready()
+    print(f"✅ Ready to serve ({readiness.ready_seconds}s after start, {readiness.import_seconds}s of imports)")
+    
+    app.state.recommendation_engine.start()
+    
     yield
     
-    # Shutdown
+    # Shutdown (uvicorn has already stopped accepting and drained in-flight requests)
+    readiness.mark_draining()
+    await profile_reconciler.stop()
+    await tip_catalog.stop()
+    await similarity_index.stop()
+    await trending_job.stop()
+    await co_engagement.stop()
+    await app.state.recommendation_engine.aclose()
+    password_hasher.stop()
+    
+    await activity_pipeline.stop()
+    print("💾 Queued activity events flushed")
+    
+    await counter_aggregator.stop()
+    print("💾 Pending engagement counters flushed")
+    
+    await unique_viewers.stop()
+    print("💾 Unique viewer sketches merged")
+    
+    await cache_bus.stop()
     print("🛑 Application shutdown")
 
 app = FastAPI(
@@ -52,8 +178,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+app.add_middleware(FirstRequestTimer, readiness=readiness)
+
 # Security
 security = HTTPBearer(auto_error=False)
 
@@ -63,7 +192,7 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
         return None
     
     try:
-        payload = verify_token(credentials.credentials)
+        payload = await auth_cache.payload(credentials.credentials)
         return payload.get("sub")
     except Exception:
         return None
@@ -73,11 +202,39 @@ app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness, plus this worker's warmup progress)"""
     return {
         "status": "healthy",
         "version": "1.0.0",
-        "service": "wellspire-api"
+        "service": "wellspire-api",
+        "readiness": readiness.report()
+    }
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 while the worker is warming up or draining"""
+    report = readiness.report()
+    if not readiness.ready:
+        return JSONResponse(report, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return report
+
+@app.get("/metrics")
+async def metrics():
+    """In-process cache and pipeline statistics for this worker"""
+    return {
+        "recommendation_cache": recommendation_cache.stats(),
+        "tip_list_cache": tip_list_cache.stats(),
+        "tiered_cache": cache_bus.stats(),
+        "auth_cache": auth_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "similar_tips": similarity_index.stats(),
+        "co_engagement": co_engagement.stats(),
+        "unique_viewers": unique_viewers.stats(),
+        "llm": app.state.recommendation_engine.llm_stats(),
+        "activity_ingestion": {
+            **activity_pipeline.stats,
+            "queue_depth": activity_pipeline.queue_depth()
+        }
     }
 
 @app.get("/")
@@ -89,11 +246,41 @@ async def root():
         "version": "1.0.0"
     }
 
+async def migrate():
+    """Apply the schema now, whatever SCHEMA_SETUP says"""
+    try:
+        await setup_schema(mode="always")
+        print("🚀 Database schema applied")
+    finally:
+        await engine.dispose()
+
+async def startup_report():
+    """Run the startup (and warmup) once without serving and print its timings as JSON"""
+    async with lifespan(app):
+        report = readiness.report()
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the Wellspire API")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "migrate", "startup-report"])
+    parser.add_argument("--production", action="store_true", help="prefork workers, no reload, graceful drain")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+    
+    if args.command == "migrate":
+        asyncio.run(migrate())
+    elif args.command == "startup-report":
+        asyncio.run(startup_report())
+    elif args.production:
+        serve("main:app", host=args.host, port=args.port, workers=args.workers, prepare=setup_schema)
+    else:
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info"
+        )
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Point the app at a throwaway SQLite database before any test imports it
+"""
+
+import os
+import tempfile
+
+import pytest_asyncio
+
+# Settings and engines are created at import time
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.setdefault("CACHE_L2_BACKEND", "memory")
+
+from app.core.database import Base, engine  # noqa: E402
+
+@pytest_asyncio.fixture
+async def database():
+    """Fresh tables for one test"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
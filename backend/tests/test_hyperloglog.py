@@ -0,0 +1,96 @@
+"""
+HyperLogLog sketches and the per-day unique viewer counts built on them
+"""
+
+import math
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+from app.models.user import User
+from app.models.wellness import WellnessCategoryEnum, WellnessTip
+from app.services.unique_viewers import UniqueViewerTracker
+
+STANDARD_ERROR = 1.04 / math.sqrt(1 << DEFAULT_PRECISION)
+
+def sketch_of(values) -> HyperLogLog:
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+@pytest.mark.parametrize("distinct", [1_000, 100_000])
+def test_count_is_within_three_standard_errors(distinct):
+    estimate = sketch_of(range(distinct)).count()
+
+    assert abs(estimate - distinct) <= 3 * STANDARD_ERROR * distinct
+
+def test_re_adding_values_changes_nothing():
+    sketch = sketch_of(range(5_000))
+    registers, estimate = sketch.to_bytes(), sketch.count()
+
+    assert not any([sketch.add(value) for value in range(5_000)])
+    assert sketch.to_bytes() == registers
+    assert sketch.count() == estimate
+
+def test_merge_and_union_match_one_combined_sketch():
+    first, second = sketch_of(range(0, 6_000)), sketch_of(range(4_000, 10_000))
+    combined = sketch_of(range(10_000))
+
+    union = HyperLogLog.union([first, second])
+    assert first.merge(second)
+    assert not first.merge(second)
+
+    assert first.to_bytes() == union.to_bytes() == combined.to_bytes()
+    assert first.count() == combined.count()
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(13))
+
+def test_bytes_round_trip():
+    sketch = sketch_of(f"user-{n}" for n in range(2_000))
+
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+
+    assert restored.precision == DEFAULT_PRECISION
+    assert restored.to_bytes() == sketch.to_bytes()
+    assert restored.count() == sketch.count()
+
+@pytest.mark.parametrize("length", [0, 100, (1 << DEFAULT_PRECISION) + 1, 8, 1 << 17])
+def test_from_bytes_rejects_bad_lengths(length):
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(bytes(length))
+
+@pytest.mark.asyncio
+async def test_tracker_counts_stored_and_pending_days(database):
+    async with database.begin() as conn:
+        await conn.execute(insert(User.__table__).values(
+            id=1, username="viewer", email="viewer@example.com", hashed_password="x"
+        ))
+        await conn.execute(insert(WellnessTip.__table__).values(
+            id=1, title="Walk", content="Walk after lunch", category=WellnessCategoryEnum.HEALTH, author_id=1
+        ))
+
+    tracker = UniqueViewerTracker()
+    monday = date(2026, 3, 2)
+    tuesday, wednesday = monday + timedelta(days=1), monday + timedelta(days=2)
+    for user_id in range(100):
+        tracker.record(1, user_id, monday)
+    for user_id in range(50, 150):
+        tracker.record(1, user_id, tuesday)
+    assert await tracker.flush() == 1
+
+    # Still buffered: a re-view, and new viewers on the next day
+    tracker.record(1, 149, wednesday)
+    for user_id in range(150, 200):
+        tracker.record(1, user_id, wednesday)
+
+    # Unions are exact, so each range estimates the same as one sketch of its viewers
+    assert await tracker.count(1, monday, monday) == sketch_of(range(100)).count()
+    assert await tracker.count(1, monday, tuesday) == sketch_of(range(150)).count()
+    assert await tracker.count(1, tuesday, wednesday) == sketch_of(range(50, 200)).count()
+    assert await tracker.count(1, monday, wednesday) == sketch_of(range(200)).count()
+    assert await tracker.count(1, wednesday + timedelta(days=1), wednesday + timedelta(days=7)) == 0
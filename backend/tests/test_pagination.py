@@ -0,0 +1,128 @@
+"""
+Keyset cursors: paging through ties and rejecting cursors that do not fit the query
+"""
+
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import insert, text
+
+from app.api.v1.endpoints import wellness
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.user import User
+from app.models.wellness import TipTrendingScore, WellnessCategoryEnum, WellnessTip
+from app.services.wellness_service import KEYSET_SORT_COLUMNS, WellnessService, _cursor_position
+
+TIP_COUNT = 12
+STARTED = datetime(2026, 1, 1, 8, 0, 0)
+
+def sort_values(tip_id: int) -> dict:
+    """Values that put every tip in a tie with at least one other"""
+    return {
+        "created_at": STARTED + timedelta(minutes=tip_id // 2),
+        "likes_count": tip_id % 3,
+        "views_count": tip_id % 4 * 10,
+        "trending": float(tip_id % 2)
+    }
+
+@pytest_asyncio.fixture
+async def tips(database):
+    async with database.begin() as conn:
+        await conn.execute(insert(User.__table__).values(
+            id=1, username="pager", email="pager@example.com", hashed_password="x"
+        ))
+        for tip_id in range(1, TIP_COUNT + 1):
+            values = sort_values(tip_id)
+            await conn.execute(insert(WellnessTip.__table__).values(
+                id=tip_id, title=f"Tip {tip_id}", content="Breathe slowly", author_id=1,
+                category=WellnessCategoryEnum.HEALTH,
+                likes_count=values["likes_count"], views_count=values["views_count"]
+            ))
+            # In the text format SQLite gives server-side timestamps
+            await conn.execute(
+                text("UPDATE wellness_tips SET created_at = :created_at WHERE id = :id"),
+                {"created_at": str(values["created_at"]), "id": tip_id}
+            )
+            await conn.execute(insert(TipTrendingScore.__table__).values(tip_id=tip_id, score=values["trending"]))
+
+@pytest_asyncio.fixture
+async def client(tips):
+    app = FastAPI()
+    app.include_router(wellness.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as http:
+        yield http
+
+def expected_ids(sort_by: str, order: str) -> list:
+    ids = sorted(range(1, TIP_COUNT + 1), key=lambda tip_id: (sort_values(tip_id)[sort_by], tip_id))
+    return ids[::-1] if order == "desc" else ids
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", KEYSET_SORT_COLUMNS)
+def test_cursor_round_trip(sort_by, order):
+    value = "2026-01-01T08:00:00+00:00" if sort_by == "created_at" else 7
+    cursor = encode_cursor({"sort_by": sort_by, "order": order, "value": value, "id": 42})
+
+    assert decode_cursor(cursor) == {"sort_by": sort_by, "order": order, "value": value, "id": 42}
+    position, last_id = _cursor_position(cursor, sort_by, order)
+    assert last_id == 42
+    if sort_by == "created_at":
+        # Compared against SQLite's text timestamps
+        assert position == "2026-01-01 08:00:00"
+    else:
+        assert position == 7
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", KEYSET_SORT_COLUMNS)
+async def test_pages_break_ties_on_id(tips, sort_by, order):
+    seen, cursor, pages = [], None, 0
+    async with AsyncSessionLocal() as session:
+        service = WellnessService(session)
+        while True:
+            rows, cursor = await service.get_tip_rows_page(
+                limit=5, sort_by=sort_by, order=order, cursor=cursor, fields=["id"]
+            )
+            seen.extend(row["id"] for row in rows)
+            pages += 1
+            if cursor is None:
+                break
+
+    assert seen == expected_ids(sort_by, order)
+    assert pages == 3
+
+@pytest.mark.asyncio
+async def test_cursor_follows_header(client):
+    first = await client.get("/tips", params={"sort_by": "likes_count", "limit": 5, "fields": "id"})
+    cursor = first.headers["X-Next-Cursor"]
+    second = await client.get("/tips", params={"sort_by": "likes_count", "limit": 5, "fields": "id", "cursor": cursor})
+
+    assert second.status_code == 200
+    ids = [tip["id"] for tip in first.json() + second.json()]
+    assert ids == expected_ids("likes_count", "desc")[:10]
+
+BAD_CURSORS = {
+    "not base64": ("likes_count", "desc", "%%%"),
+    "not json": ("likes_count", "desc", "bm90IGpzb24"),
+    "not an object": ("likes_count", "desc", encode_cursor([1, 2])),
+    "missing id": ("likes_count", "desc", encode_cursor({"sort_by": "likes_count", "order": "desc", "value": 3})),
+    "string id": ("likes_count", "desc", encode_cursor({"sort_by": "likes_count", "order": "desc", "value": 3, "id": "4"})),
+    "string count": ("likes_count", "desc", encode_cursor({"sort_by": "likes_count", "order": "desc", "value": "3", "id": 4})),
+    "bad timestamp": ("created_at", "desc", encode_cursor({"sort_by": "created_at", "order": "desc", "value": "yesterday", "id": 4})),
+    "boolean score": ("trending", "desc", encode_cursor({"sort_by": "trending", "order": "desc", "value": True, "id": 4})),
+    "other sort": ("views_count", "desc", encode_cursor({"sort_by": "likes_count", "order": "desc", "value": 3, "id": 4})),
+    "other order": ("likes_count", "asc", encode_cursor({"sort_by": "likes_count", "order": "desc", "value": 3, "id": 4})),
+    "unsupported sort": ("relevance", "desc", encode_cursor({"sort_by": "relevance", "order": "desc", "value": 3, "id": 4}))
+}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", BAD_CURSORS)
+async def test_bad_cursor_is_rejected(client, case):
+    sort_by, order, cursor = BAD_CURSORS[case]
+
+    response = await client.get("/tips", params={"sort_by": sort_by, "order": order, "cursor": cursor})
+
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+"""
+TieredCache across processes, simulated by two CacheBus instances sharing a MemoryL2
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.core.tiered_cache import CacheBus, MemoryL2, TieredCache
+
+async def settle() -> None:
+    """Let listeners pick up published messages"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest_asyncio.fixture
+async def buses():
+    l2 = MemoryL2()
+    pair = (CacheBus(l2), CacheBus(l2))
+    for bus in pair:
+        bus.start()
+    await settle()
+    yield pair
+    for bus in pair:
+        await bus.stop()
+
+@pytest.mark.asyncio
+async def test_set_is_shared_through_l2(buses):
+    first, second = (TieredCache("tips", 60, bus) for bus in buses)
+
+    await first.set(1, {"title": "Breathe"})
+
+    assert await second.get(1) == {"title": "Breathe"}
+    assert second.l2_hits == 1
+
+@pytest.mark.asyncio
+async def test_invalidate_reaches_other_bus(buses):
+    first, second = (TieredCache("tips", 60, bus) for bus in buses)
+    await first.set(1, "old")
+    assert await second.get(1) == "old"  # now in the second L1 too
+
+    await first.invalidate(1)
+    await settle()
+
+    assert await second.get(1) is None
+    assert buses[1].invalidations_received == 1
+    assert buses[0].invalidations_received == 0  # own messages are ignored
+
+@pytest.mark.asyncio
+async def test_invalidation_only_reaches_its_namespace(buses):
+    tips = TieredCache("tips", 60, buses[0])
+    users = TieredCache("users", 60, buses[1])
+    await users.set(1, "user")
+
+    await tips.invalidate(1)
+    await settle()
+
+    assert await users.get(1) == "user"
+
+@pytest.mark.asyncio
+async def test_load_overlapping_invalidation_is_not_stored(buses):
+    cache = TieredCache("tips", 60, buses[0])
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "stale"
+
+    load = asyncio.create_task(cache.get_or_load(1, loader))
+    await settle()
+    await cache.invalidate(1)
+    release.set()
+
+    assert await load == "stale"  # callers of the load still get its value
+    assert await cache.get(1) is None
+    assert await buses[0].l2.get(cache._l2_key("1")) is None
+
+@pytest.mark.asyncio
+async def test_load_overlapping_remote_invalidation_is_not_stored(buses):
+    loading = TieredCache("tips", 60, buses[0])
+    writer = TieredCache("tips", 60, buses[1])
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "stale"
+
+    load = asyncio.create_task(loading.get_or_load(1, loader))
+    await settle()
+    await writer.invalidate(1)
+    await settle()
+    release.set()
+
+    assert await load == "stale"
+    assert await loading.get(1) is None
+
+@pytest.mark.asyncio
+async def test_get_or_load_shares_one_load(buses):
+    cache = TieredCache("tips", 60, buses[0])
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_load(1, loader) for _ in range(10)))
+
+    assert results == ["value"] * 10
+    assert calls == 1